@@ -51,6 +51,9 @@ android {
 }
 
 dependencies {
+    // Frame preprocessing and output decoding (pure Kotlin/JVM)
+    implementation(project(":core"))
+
     // Android Core
     implementation("androidx.core:core-ktx:1.12.0")
     implementation("androidx.appcompat:appcompat:1.6.1")
@@ -6,6 +6,7 @@ import android.util.Log
 import kotlinx.coroutines.flow.MutableStateFlow
 import kotlinx.coroutines.flow.StateFlow
 import kotlinx.coroutines.flow.asStateFlow
+import java.nio.ByteBuffer
 
 /**
  * Drowsiness detection state
@@ -56,42 +57,75 @@ class DrowsinessDetector(context: Context) {
      * @return Detection result with state and confidence
      */
     fun processFrame(bitmap: Bitmap): DetectionResult {
-        try {
-            // Run classification
+        return try {
             val (label, confidence) = classifier.classify(bitmap)
-            
-            // Determine raw state from single frame
-            val isDrowsy = label == "Drowsy" && confidence >= DROWSY_THRESHOLD
-            val rawScore = if (label == "Drowsy") confidence else 1f - confidence
-            
-            // Apply consecutive frame smoothing
-            if (isDrowsy) {
-                consecutiveDrowsyFrames++
-                Log.d(TAG, "Drowsy frame detected ($consecutiveDrowsyFrames/$REQUIRED_CONSECUTIVE_FRAMES)")
-                
-                // Only trigger drowsy state after consecutive frames
-                if (consecutiveDrowsyFrames >= REQUIRED_CONSECUTIVE_FRAMES) {
-                    confirmedState = DrowsinessState.DROWSY
-                }
-            } else {
-                // Immediately clear drowsy state when awake detected
-                consecutiveDrowsyFrames = 0
-                confirmedState = DrowsinessState.AWAKE
-            }
-            
-            val result = DetectionResult(
-                state = confirmedState,
-                confidence = confidence,
-                rawScore = rawScore
+            update(label, confidence)
+        } catch (e: Exception) {
+            Log.e(TAG, "Detection error", e)
+            DetectionResult(DrowsinessState.UNKNOWN, 0f, 0f)
+        }
+    }
+
+    /**
+     * Process an RGBA_8888 camera plane without converting it to a Bitmap.
+     * 
+     * @param frame Plane buffer (ImageProxy.planes[0].buffer)
+     * @param width Frame width
+     * @param height Frame height
+     * @param rowStride Bytes per row, including padding
+     * @param pixelStride Bytes per pixel
+     * @param rotationDegrees Clockwise rotation to make the frame upright
+     * @param mirror Mirror horizontally after rotating (front camera)
+     * @return Detection result with state and confidence
+     */
+    fun processFrame(
+        frame: ByteBuffer,
+        width: Int,
+        height: Int,
+        rowStride: Int,
+        pixelStride: Int,
+        rotationDegrees: Int,
+        mirror: Boolean
+    ): DetectionResult {
+        return try {
+            val (label, confidence) = classifier.classify(
+                frame, width, height, rowStride, pixelStride, rotationDegrees, mirror
             )
-            
-            _state.value = result
-            return result
-            
+            update(label, confidence)
         } catch (e: Exception) {
             Log.e(TAG, "Detection error", e)
-            return DetectionResult(DrowsinessState.UNKNOWN, 0f, 0f)
+            DetectionResult(DrowsinessState.UNKNOWN, 0f, 0f)
+        }
+    }
+
+    private fun update(label: String, confidence: Float): DetectionResult {
+        // Determine raw state from single frame
+        val isDrowsy = label == "Drowsy" && confidence >= DROWSY_THRESHOLD
+        val rawScore = if (label == "Drowsy") confidence else 1f - confidence
+        
+        // Apply consecutive frame smoothing
+        if (isDrowsy) {
+            consecutiveDrowsyFrames++
+            Log.d(TAG, "Drowsy frame detected ($consecutiveDrowsyFrames/$REQUIRED_CONSECUTIVE_FRAMES)")
+            
+            // Only trigger drowsy state after consecutive frames
+            if (consecutiveDrowsyFrames >= REQUIRED_CONSECUTIVE_FRAMES) {
+                confirmedState = DrowsinessState.DROWSY
+            }
+        } else {
+            // Immediately clear drowsy state when awake detected
+            consecutiveDrowsyFrames = 0
+            confirmedState = DrowsinessState.AWAKE
         }
+        
+        val result = DetectionResult(
+            state = confirmedState,
+            confidence = confidence,
+            rawScore = rawScore
+        )
+        
+        _state.value = result
+        return result
     }
     
     /**
@@ -2,7 +2,6 @@ package com.y2m.drowsydetector
 
 import android.Manifest
 import android.content.pm.PackageManager
-import android.graphics.Bitmap
 import android.os.Bundle
 import android.util.Log
 import android.widget.Toast
@@ -142,17 +141,20 @@ class MainActivity : ComponentActivity() {
 
         scope.launch(Dispatchers.Default) {
             try {
-                val bitmap = imageProxyToBitmap(imageProxy)
-                
-                if (bitmap == null) {
-                    Log.e(TAG, "Failed to convert image to bitmap")
-                    isProcessing = false
-                    imageProxy.close()
-                    return@launch
-                }
-
-                // Run detection with smoothing
-                val result = detector.processFrame(bitmap)
+                // Run detection with smoothing, straight from the RGBA plane:
+                // resize, rotation and front-camera mirroring happen in one
+                // pass into the model input buffer
+                val plane = imageProxy.planes[0]
+                plane.buffer.rewind()
+                val result = detector.processFrame(
+                    plane.buffer,
+                    imageProxy.width,
+                    imageProxy.height,
+                    plane.rowStride,
+                    plane.pixelStride,
+                    imageProxy.imageInfo.rotationDegrees,
+                    mirror = true
+                )
                 
                 if (frameCount % 30 == 0) {
                     Log.d(TAG, "Frame $frameCount: ${result.state} (${result.confidence})")
@@ -187,35 +189,6 @@ class MainActivity : ComponentActivity() {
         }
     }
 
-    private fun imageProxyToBitmap(imageProxy: ImageProxy): Bitmap? {
-        return try {
-            val buffer = imageProxy.planes[0].buffer
-            val pixelStride = imageProxy.planes[0].pixelStride
-            val rowStride = imageProxy.planes[0].rowStride
-            val rowPadding = rowStride - pixelStride * imageProxy.width
-            
-            val bitmapWidth = imageProxy.width + rowPadding / pixelStride
-            val bitmap = Bitmap.createBitmap(bitmapWidth, imageProxy.height, Bitmap.Config.ARGB_8888)
-            
-            buffer.rewind()
-            bitmap.copyPixelsFromBuffer(buffer)
-            
-            // Crop to actual size
-            val croppedBitmap = Bitmap.createBitmap(bitmap, 0, 0, imageProxy.width, imageProxy.height)
-            
-            // Rotate and mirror for front camera
-            val matrix = android.graphics.Matrix().apply {
-                postRotate(imageProxy.imageInfo.rotationDegrees.toFloat())
-                postScale(-1f, 1f) // Mirror
-            }
-            
-            Bitmap.createBitmap(croppedBitmap, 0, 0, croppedBitmap.width, croppedBitmap.height, matrix, true)
-        } catch (e: Exception) {
-            Log.e(TAG, "Error converting image", e)
-            null
-        }
-    }
-
     override fun onDestroy() {
         super.onDestroy()
         scope.cancel()
@@ -0,0 +1,33 @@
+// Pure Kotlin/JVM module: frame preprocessing and output decoding with no
+// Android dependencies, so it builds, and benchmarks, on any JVM.
+//
+// Test and benchmark on a desktop JVM:
+//   ./gradlew :core:test :core:jmh
+plugins {
+    id("org.jetbrains.kotlin.jvm")
+    id("me.champeau.jmh")
+}
+
+java {
+    sourceCompatibility = JavaVersion.VERSION_1_8
+    targetCompatibility = JavaVersion.VERSION_1_8
+}
+
+tasks.withType<org.jetbrains.kotlin.gradle.tasks.KotlinCompile>().configureEach {
+    kotlinOptions {
+        jvmTarget = "1.8"
+    }
+}
+
+dependencies {
+    testImplementation("junit:junit:4.13.2")
+}
+
+jmh {
+    warmupIterations.set(3)
+    iterations.set(5)
+    fork.set(1)
+    // Reports gc.alloc.rate.norm (bytes per frame), which should stay ~0
+    profilers.add("gc")
+    resultFormat.set("JSON")
+}
@@ -0,0 +1,231 @@
+package com.y2m.drowsydetector.core
+
+import java.nio.ByteBuffer
+import java.nio.ByteOrder
+import java.nio.FloatBuffer
+
+/**
+ * Element type of the model input tensor.
+ */
+enum class InputType(val bytesPerValue: Int) {
+    FLOAT32(4),
+    UINT8(1)
+}
+
+/**
+ * Converts camera frames to the model input tensor.
+ *
+ * Resizes (bilinear), rotates and mirrors in one pass, straight from the
+ * camera's RGBA plane or from ARGB pixels into [buffer], so no intermediate
+ * Bitmaps are created. Buffers and resize tables are allocated once and
+ * reused; the tables are rebuilt only when the frame geometry changes.
+ * Each output row is assembled in an array and written with one bulk put.
+ *
+ * Float models get RGB values normalized to [0, 1]; uint8 models
+ * (exported with --uint8-input) get the RGB bytes as-is.
+ *
+ * Not thread-safe: use one instance per inference thread.
+ *
+ * @param width Model input width
+ * @param height Model input height
+ * @param inputType Input tensor element type
+ */
+class FramePreprocessor(
+    val width: Int,
+    val height: Int,
+    val inputType: InputType = InputType.FLOAT32
+) {
+
+    /** Input tensor (NHWC, batch 1), rewound and ready to pass to the interpreter. */
+    val buffer: ByteBuffer = ByteBuffer
+        .allocateDirect(width * height * CHANNELS * inputType.bytesPerValue)
+        .order(ByteOrder.nativeOrder())
+
+    private val floatView: FloatBuffer = buffer.asFloatBuffer()
+    private val floatRow = FloatArray(width * CHANNELS)
+    private val byteRow = ByteArray(width * CHANNELS)
+
+    // For each output column and row: the two neighbouring samples along the
+    // source axis it drives, and the 8-bit weight of the second sample
+    private val colIndex0 = IntArray(width)
+    private val colIndex1 = IntArray(width)
+    private val colWeight = IntArray(width)
+    private val rowIndex0 = IntArray(height)
+    private val rowIndex1 = IntArray(height)
+    private val rowWeight = IntArray(height)
+
+    // Output columns drive source rows (90 and 270 degree rotations)
+    private var transposed = false
+
+    // Geometry the tables were built for
+    private var sourceWidth = -1
+    private var sourceHeight = -1
+    private var rotation = -1
+    private var mirrored = false
+
+    /**
+     * Fill [buffer] from an RGBA_8888 plane (CameraX ImageAnalysis output).
+     *
+     * @param frame Plane buffer; read with absolute gets from its position
+     * @param frameWidth Frame width in pixels
+     * @param frameHeight Frame height in pixels
+     * @param rowStride Bytes per row, including padding
+     * @param pixelStride Bytes per pixel (4 for RGBA_8888)
+     * @param rotationDegrees Clockwise rotation to apply (0, 90, 180 or 270)
+     * @param mirror Mirror horizontally after rotating (front camera)
+     * @return [buffer]
+     */
+    fun fromRgba(
+        frame: ByteBuffer,
+        frameWidth: Int,
+        frameHeight: Int,
+        rowStride: Int,
+        pixelStride: Int = 4,
+        rotationDegrees: Int = 0,
+        mirror: Boolean = false
+    ): ByteBuffer {
+        val base = frame.position()
+        prepare(frameWidth, frameHeight, rotationDegrees, mirror)
+        fill(
+            { x, y -> base + y * rowStride + x * pixelStride },
+            { offset, channel -> frame.get(offset + channel).toInt() and 0xFF }
+        )
+        return buffer
+    }
+
+    /**
+     * Fill [buffer] from ARGB_8888 pixels (as returned by Bitmap.getPixels).
+     *
+     * @param pixels Packed ARGB pixels
+     * @param frameWidth Frame width in pixels
+     * @param frameHeight Frame height in pixels
+     * @param stride Pixels per row
+     * @param offset Index of the first pixel
+     * @param rotationDegrees Clockwise rotation to apply (0, 90, 180 or 270)
+     * @param mirror Mirror horizontally after rotating
+     * @return [buffer]
+     */
+    fun fromArgb(
+        pixels: IntArray,
+        frameWidth: Int,
+        frameHeight: Int,
+        stride: Int = frameWidth,
+        offset: Int = 0,
+        rotationDegrees: Int = 0,
+        mirror: Boolean = false
+    ): ByteBuffer {
+        prepare(frameWidth, frameHeight, rotationDegrees, mirror)
+        fill(
+            { x, y -> offset + y * stride + x },
+            { index, channel -> (pixels[index] shr (16 - 8 * channel)) and 0xFF }
+        )
+        return buffer
+    }
+
+    private inline fun fill(pixelOffset: (Int, Int) -> Int, sample: (Int, Int) -> Int) {
+        buffer.rewind()
+        floatView.rewind()
+        val uint8 = inputType == InputType.UINT8
+
+        for (oy in 0 until height) {
+            for (ox in 0 until width) {
+                val x0: Int
+                val x1: Int
+                val wx: Int
+                val y0: Int
+                val y1: Int
+                val wy: Int
+                if (transposed) {
+                    x0 = rowIndex0[oy]; x1 = rowIndex1[oy]; wx = rowWeight[oy]
+                    y0 = colIndex0[ox]; y1 = colIndex1[ox]; wy = colWeight[ox]
+                } else {
+                    x0 = colIndex0[ox]; x1 = colIndex1[ox]; wx = colWeight[ox]
+                    y0 = rowIndex0[oy]; y1 = rowIndex1[oy]; wy = rowWeight[oy]
+                }
+                val p00 = pixelOffset(x0, y0)
+                val p01 = pixelOffset(x1, y0)
+                val p10 = pixelOffset(x0, y1)
+                val p11 = pixelOffset(x1, y1)
+
+                val out = ox * CHANNELS
+                for (c in 0 until CHANNELS) {
+                    val top = sample(p00, c) * (WEIGHT_ONE - wx) + sample(p01, c) * wx
+                    val bottom = sample(p10, c) * (WEIGHT_ONE - wx) + sample(p11, c) * wx
+                    val value = (top * (WEIGHT_ONE - wy) + bottom * wy + ROUND) shr (2 * WEIGHT_BITS)
+                    if (uint8) {
+                        byteRow[out + c] = value.toByte()
+                    } else {
+                        floatRow[out + c] = UNIT_SCALE[value]
+                    }
+                }
+            }
+            if (uint8) buffer.put(byteRow) else floatView.put(floatRow)
+        }
+        buffer.rewind()
+    }
+
+    /**
+     * Rebuild the resize tables if the frame geometry changed.
+     */
+    private fun prepare(frameWidth: Int, frameHeight: Int, rotationDegrees: Int, mirror: Boolean) {
+        require(frameWidth > 0 && frameHeight > 0) { "Invalid frame size ${frameWidth}x$frameHeight" }
+        val degrees = ((rotationDegrees % 360) + 360) % 360
+        require(degrees % 90 == 0) { "Rotation must be a multiple of 90 degrees, got $rotationDegrees" }
+        if (frameWidth == sourceWidth && frameHeight == sourceHeight &&
+            degrees == rotation && mirror == mirrored
+        ) {
+            return
+        }
+
+        // Output x runs along the rotated image's x axis (reversed when
+        // mirrored), output y along its y axis; map both back to the source
+        transposed = degrees == 90 || degrees == 270
+        val colSource = if (transposed) frameHeight else frameWidth
+        val rowSource = if (transposed) frameWidth else frameHeight
+        val colReversed = when (degrees) {
+            0, 270 -> mirror
+            else -> !mirror
+        }
+        val rowReversed = degrees == 180 || degrees == 270
+        buildAxis(width, colSource, colReversed, colIndex0, colIndex1, colWeight)
+        buildAxis(height, rowSource, rowReversed, rowIndex0, rowIndex1, rowWeight)
+
+        sourceWidth = frameWidth
+        sourceHeight = frameHeight
+        rotation = degrees
+        mirrored = mirror
+    }
+
+    private fun buildAxis(
+        outSize: Int,
+        sourceSize: Int,
+        reversed: Boolean,
+        index0: IntArray,
+        index1: IntArray,
+        weight: IntArray
+    ) {
+        val scale = sourceSize.toFloat() / outSize
+        val last = sourceSize - 1
+        for (o in 0 until outSize) {
+            // Pixel-center alignment, as in Bitmap.createScaledBitmap(filter = true)
+            var position = (o + 0.5f) * scale - 0.5f
+            if (reversed) position = last - position
+            position = position.coerceIn(0f, last.toFloat())
+            val i0 = position.toInt()
+            index0[o] = i0
+            index1[o] = minOf(i0 + 1, last)
+            weight[o] = ((position - i0) * WEIGHT_ONE + 0.5f).toInt().coerceAtMost(WEIGHT_ONE)
+        }
+    }
+
+    companion object {
+        const val CHANNELS = 3
+
+        private const val WEIGHT_BITS = 8
+        private const val WEIGHT_ONE = 1 shl WEIGHT_BITS
+        private const val ROUND = 1 shl (2 * WEIGHT_BITS - 1)
+
+        // value / 255, so float conversion is a table lookup
+        private val UNIT_SCALE = FloatArray(256) { it / 255.0f }
+    }
+}
@@ -0,0 +1,188 @@
+package com.y2m.drowsydetector.core
+
+import java.nio.ByteBuffer
+import java.nio.ByteOrder
+import java.nio.FloatBuffer
+
+/**
+ * Layout of the model output tensor.
+ */
+enum class OutputFormat {
+    /** [1, num_boxes, 4 + classes]: x, y, w, h, class scores */
+    YOLO,
+
+    /** [1, 4 + classes, num_boxes]: channels first */
+    YOLO_TRANSPOSED,
+
+    /** [1, 2]: class scores */
+    CLASSIFICATION,
+
+    /** Anything else: scan rows of the last dimension for class scores */
+    GENERIC;
+
+    companion object {
+        /**
+         * Detect the format from the output tensor shape.
+         *
+         * YOLOv8 exports are channels first ([1, 6, 8400]); when both
+         * trailing dimensions could hold a box, the smaller one is taken
+         * as the channel dimension.
+         */
+        fun of(shape: IntArray): OutputFormat = when {
+            shape.size == 3 && shape[1] >= 6 && shape[1] < shape[2] -> YOLO_TRANSPOSED
+            shape.size == 3 && shape[2] >= 6 -> YOLO
+            shape.size == 2 && shape[1] == 2 -> CLASSIFICATION
+            shape.size == 3 && shape[1] >= 6 -> YOLO_TRANSPOSED
+            else -> GENERIC
+        }
+    }
+}
+
+/**
+ * Decoded frame prediction. Mutable so one instance can be reused per frame.
+ */
+class Prediction {
+    /** [CLASS_DROWSY] or [CLASS_NOT_DROWSY] */
+    var classIndex = CLASS_NOT_DROWSY
+
+    /** Score of the predicted class */
+    var confidence = 0f
+
+    /** Boxes above the confidence threshold (YOLO formats) */
+    var detections = 0
+
+    val isDrowsy: Boolean
+        get() = classIndex == CLASS_DROWSY
+
+    companion object {
+        const val CLASS_DROWSY = 0
+        const val CLASS_NOT_DROWSY = 1
+
+        // Reported when no box passes the threshold
+        const val DEFAULT_CONFIDENCE = 0.5f
+    }
+}
+
+/**
+ * Decodes the model output into a [Prediction] without per-frame allocation.
+ *
+ * The interpreter writes into [buffer]; [decode] copies it into a reused
+ * array with one bulk get and picks the best class. Classes: drowsy (0),
+ * notdrowsy (1).
+ *
+ * Not thread-safe: use one instance per inference thread.
+ *
+ * @param shape Output tensor shape
+ * @param threshold Minimum box score for YOLO formats
+ */
+class OutputDecoder(
+    shape: IntArray,
+    val threshold: Float = DEFAULT_THRESHOLD
+) {
+    val shape: IntArray = shape.copyOf()
+    val format = OutputFormat.of(shape)
+    val size = shape.fold(1) { acc, dim -> acc * dim }
+
+    /** Output tensor (float32), to pass to the interpreter. */
+    val buffer: ByteBuffer = ByteBuffer
+        .allocateDirect(size * 4)
+        .order(ByteOrder.nativeOrder())
+
+    private val floatView: FloatBuffer = buffer.asFloatBuffer()
+    private val values = FloatArray(size)
+
+    /**
+     * Decode the output the interpreter wrote into [buffer].
+     *
+     * @param into Prediction to fill
+     * @return [into]
+     */
+    fun decode(into: Prediction): Prediction {
+        floatView.rewind()
+        floatView.get(values)
+        buffer.rewind()
+        return decode(values, into)
+    }
+
+    /**
+     * Decode a flat output array laid out as [shape].
+     *
+     * @param output Output values, at least [size] long
+     * @param into Prediction to fill
+     * @return [into]
+     */
+    fun decode(output: FloatArray, into: Prediction): Prediction {
+        when (format) {
+            OutputFormat.YOLO -> decodeBoxes(output, shape[1], shape[2], 1, into)
+            OutputFormat.YOLO_TRANSPOSED -> decodeBoxes(output, shape[2], 1, shape[2], into)
+            OutputFormat.CLASSIFICATION -> decodeClassification(output, into)
+            OutputFormat.GENERIC -> decodeGeneric(output, into)
+        }
+        return into
+    }
+
+    /**
+     * Best box by max(drowsy, notdrowsy) score. Box i's channel c is at
+     * output[i * boxStride + c * channelStride].
+     */
+    private fun decodeBoxes(
+        output: FloatArray,
+        numBoxes: Int,
+        boxStride: Int,
+        channelStride: Int,
+        into: Prediction
+    ) {
+        val drowsyOffset = 4 * channelStride
+        val alertOffset = 5 * channelStride
+        var bestClass = Prediction.CLASS_NOT_DROWSY
+        var bestConfidence = 0f
+        var detections = 0
+
+        var base = 0
+        for (i in 0 until numBoxes) {
+            val drowsyConf = output[base + drowsyOffset]
+            val alertConf = output[base + alertOffset]
+            val maxConf = if (drowsyConf > alertConf) drowsyConf else alertConf
+            if (maxConf > threshold) {
+                detections++
+                if (maxConf > bestConfidence) {
+                    bestConfidence = maxConf
+                    bestClass = if (drowsyConf > alertConf) Prediction.CLASS_DROWSY else Prediction.CLASS_NOT_DROWSY
+                }
+            }
+            base += boxStride
+        }
+
+        into.classIndex = bestClass
+        into.confidence = if (bestConfidence > 0) bestConfidence else Prediction.DEFAULT_CONFIDENCE
+        into.detections = detections
+    }
+
+    private fun decodeClassification(output: FloatArray, into: Prediction) {
+        val index = if (output[0] > output[1]) Prediction.CLASS_DROWSY else Prediction.CLASS_NOT_DROWSY
+        into.classIndex = index
+        into.confidence = output[index]
+        into.detections = 0
+    }
+
+    private fun decodeGeneric(output: FloatArray, into: Prediction) {
+        val step = (shape.lastOrNull() ?: 6).coerceAtLeast(1)
+        var drowsyScore = 0f
+        var alertScore = 0f
+
+        var i = 0
+        while (i + 5 < size) {
+            if (output[i + 4] > drowsyScore) drowsyScore = output[i + 4]
+            if (output[i + 5] > alertScore) alertScore = output[i + 5]
+            i += step
+        }
+
+        into.classIndex = if (drowsyScore > alertScore) Prediction.CLASS_DROWSY else Prediction.CLASS_NOT_DROWSY
+        into.confidence = maxOf(drowsyScore, alertScore, Prediction.DEFAULT_CONFIDENCE)
+        into.detections = 0
+    }
+
+    companion object {
+        const val DEFAULT_THRESHOLD = 0.25f
+    }
+}
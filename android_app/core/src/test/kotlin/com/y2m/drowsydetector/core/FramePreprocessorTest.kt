@@ -0,0 +1,251 @@
+package com.y2m.drowsydetector.core
+
+import org.junit.Assert.assertEquals
+import org.junit.Assert.assertSame
+import org.junit.Assert.assertTrue
+import org.junit.Assume.assumeTrue
+import org.junit.Test
+import java.lang.management.ManagementFactory
+import java.nio.ByteBuffer
+import java.util.Random
+
+class FramePreprocessorTest {
+
+    // 3x2 frame:  a b c
+    //             d e f
+    private val a = 0x0A0B0C
+    private val b = 0x1A1B1C
+    private val c = 0x2A2B2C
+    private val d = 0x3A3B3C
+    private val e = 0x4A4B4C
+    private val f = 0x5A5B5C
+    private val small = intArrayOf(a, b, c, d, e, f).map { it or ALPHA }.toIntArray()
+
+    @Test
+    fun rotationsAndMirrorMatchHandWrittenFrames() {
+        // rotationDegrees, mirror -> expected output (width x height), row-major
+        val cases = listOf(
+            Triple(0, false, Frame(3, 2, a, b, c, d, e, f)),
+            Triple(0, true, Frame(3, 2, c, b, a, f, e, d)),
+            Triple(90, false, Frame(2, 3, d, a, e, b, f, c)),
+            Triple(90, true, Frame(2, 3, a, d, b, e, c, f)),
+            Triple(180, false, Frame(3, 2, f, e, d, c, b, a)),
+            Triple(180, true, Frame(3, 2, d, e, f, a, b, c)),
+            Triple(270, false, Frame(2, 3, c, f, b, e, a, d)),
+            Triple(270, true, Frame(2, 3, f, c, e, b, d, a))
+        )
+        for ((degrees, mirror, expected) in cases) {
+            val preprocessor = FramePreprocessor(expected.width, expected.height, InputType.UINT8)
+            val output = preprocessor.fromArgb(small, 3, 2, rotationDegrees = degrees, mirror = mirror)
+            assertEquals("rotation $degrees mirror $mirror", expected.rgbBytes().toList(), output.bytes().toList())
+        }
+    }
+
+    @Test
+    fun resizeMatchesReferenceBilinear() {
+        val sizes = listOf(
+            intArrayOf(37, 23, 16, 16),  // downscale
+            intArrayOf(5, 4, 13, 11),    // upscale
+            intArrayOf(640, 480, 64, 64)
+        )
+        for ((srcW, srcH, outW, outH) in sizes.map { it.toList() }) {
+            val pixels = randomPixels(srcW, srcH, Random(srcW.toLong()))
+            val output = FramePreprocessor(outW, outH, InputType.UINT8).fromArgb(pixels, srcW, srcH).bytes()
+            assertClose(referenceResize(pixels, srcW, srcH, outW, outH), output, "${srcW}x$srcH -> ${outW}x$outH")
+        }
+    }
+
+    @Test
+    fun rotatedResizeMatchesReference() {
+        val srcW = 48
+        val srcH = 30
+        val pixels = randomPixels(srcW, srcH, Random(7))
+        for (degrees in intArrayOf(0, 90, 180, 270)) {
+            for (mirror in booleanArrayOf(false, true)) {
+                val oriented = orient(pixels, srcW, srcH, degrees, mirror)
+                val expected = referenceResize(oriented.pixels, oriented.width, oriented.height, 20, 24)
+                val output = FramePreprocessor(20, 24, InputType.UINT8)
+                    .fromArgb(pixels, srcW, srcH, rotationDegrees = degrees, mirror = mirror)
+                    .bytes()
+                assertClose(expected, output, "rotation $degrees mirror $mirror")
+            }
+        }
+    }
+
+    @Test
+    fun rgbaPlaneWithRowPaddingMatchesArgbPixels() {
+        val width = 29
+        val height = 17
+        val pixels = randomPixels(width, height, Random(3))
+        val rowStride = width * 4 + 12
+        val plane = ByteBuffer.allocateDirect(rowStride * height)
+        for (y in 0 until height) {
+            for (x in 0 until rowStride) {
+                plane.put(y * rowStride + x, 0x7F)  // padding must never be read
+            }
+            for (x in 0 until width) {
+                val pixel = pixels[y * width + x]
+                val offset = y * rowStride + x * 4
+                plane.put(offset, (pixel shr 16).toByte())
+                plane.put(offset + 1, (pixel shr 8).toByte())
+                plane.put(offset + 2, pixel.toByte())
+                plane.put(offset + 3, 0xFF.toByte())
+            }
+        }
+
+        for (degrees in intArrayOf(0, 90, 180, 270)) {
+            val fromArgb = FramePreprocessor(12, 10, InputType.UINT8)
+                .fromArgb(pixels, width, height, rotationDegrees = degrees, mirror = true)
+                .bytes()
+            val fromRgba = FramePreprocessor(12, 10, InputType.UINT8)
+                .fromRgba(plane, width, height, rowStride, 4, degrees, mirror = true)
+                .bytes()
+            assertEquals("rotation $degrees", fromArgb.toList(), fromRgba.toList())
+        }
+    }
+
+    @Test
+    fun floatOutputIsUint8OutputOver255() {
+        val pixels = randomPixels(40, 30, Random(11))
+        val bytes = FramePreprocessor(16, 16, InputType.UINT8).fromArgb(pixels, 40, 30).bytes()
+        val floats = FramePreprocessor(16, 16, InputType.FLOAT32).fromArgb(pixels, 40, 30).asFloatBuffer()
+
+        assertEquals(16 * 16 * 3, floats.remaining())
+        for (i in bytes.indices) {
+            assertEquals((bytes[i].toInt() and 0xFF) / 255.0f, floats.get(i), 0f)
+        }
+    }
+
+    @Test
+    fun buffersAreReusedAcrossCalls() {
+        val preprocessor = FramePreprocessor(32, 32, InputType.FLOAT32)
+        val buffer = preprocessor.buffer
+        val first = randomPixels(64, 48, Random(1))
+        val second = randomPixels(50, 70, Random(2))
+
+        assertSame(buffer, preprocessor.fromArgb(first, 64, 48))
+        assertSame(buffer, preprocessor.fromArgb(second, 50, 70, rotationDegrees = 90, mirror = true))
+        assertSame(buffer, preprocessor.fromArgb(first, 64, 48))
+        assertEquals(0, buffer.position())
+        assertEquals(32 * 32 * 3 * 4, buffer.capacity())
+
+        // Same input, same output after the tables were rebuilt in between
+        val again = FramePreprocessor(32, 32, InputType.FLOAT32).fromArgb(first, 64, 48)
+        assertEquals(again, buffer)
+    }
+
+    @Test
+    fun steadyStateCallsDoNotAllocate() {
+        val bean = ManagementFactory.getThreadMXBean()
+        assumeTrue(
+            "per-thread allocation counter unavailable",
+            bean is com.sun.management.ThreadMXBean && bean.isThreadAllocatedMemorySupported
+        )
+        bean as com.sun.management.ThreadMXBean
+        val threadId = Thread.currentThread().id
+
+        val pixels = randomPixels(160, 120, Random(5))
+        val plane = ByteBuffer.allocateDirect(160 * 4 * 120)
+        val preprocessor = FramePreprocessor(64, 64, InputType.FLOAT32)
+        repeat(50) {
+            preprocessor.fromArgb(pixels, 160, 120, rotationDegrees = 270, mirror = true)
+            preprocessor.fromRgba(plane, 160, 120, 160 * 4, 4, 270, true)
+        }
+
+        val calls = 100
+        val before = bean.getThreadAllocatedBytes(threadId)
+        repeat(calls / 2) {
+            preprocessor.fromArgb(pixels, 160, 120, rotationDegrees = 270, mirror = true)
+            preprocessor.fromRgba(plane, 160, 120, 160 * 4, 4, 270, true)
+        }
+        val perCall = (bean.getThreadAllocatedBytes(threadId) - before) / calls
+        // A single 64x64 float row array alone would be 768 bytes
+        assertTrue("allocated $perCall bytes per call", perCall < 64)
+    }
+
+    private class Frame(val width: Int, val height: Int, vararg val pixels: Int) {
+        fun rgbBytes(): ByteArray {
+            val bytes = ByteArray(pixels.size * 3)
+            for ((i, pixel) in pixels.withIndex()) {
+                bytes[i * 3] = (pixel shr 16).toByte()
+                bytes[i * 3 + 1] = (pixel shr 8).toByte()
+                bytes[i * 3 + 2] = pixel.toByte()
+            }
+            return bytes
+        }
+    }
+
+    private class Oriented(val pixels: IntArray, val width: Int, val height: Int)
+
+    companion object {
+        private const val ALPHA = 0xFF shl 24
+
+        private fun randomPixels(width: Int, height: Int, random: Random) =
+            IntArray(width * height) { random.nextInt() or ALPHA }
+
+        private fun ByteBuffer.bytes(): ByteArray {
+            val copy = ByteArray(remaining())
+            duplicate().get(copy)
+            return copy
+        }
+
+        /** Rotate clockwise in 90 degree steps, then mirror horizontally. */
+        private fun orient(pixels: IntArray, width: Int, height: Int, degrees: Int, mirror: Boolean): Oriented {
+            var current = Oriented(pixels, width, height)
+            repeat(degrees / 90) {
+                val w = current.width
+                val h = current.height
+                // Clockwise: output (u, v) comes from source (v, h - 1 - u)
+                val rotated = IntArray(w * h)
+                for (v in 0 until w) {
+                    for (u in 0 until h) {
+                        rotated[v * h + u] = current.pixels[(h - 1 - u) * w + v]
+                    }
+                }
+                current = Oriented(rotated, h, w)
+            }
+            if (mirror) {
+                val w = current.width
+                val mirrored = IntArray(current.pixels.size) { i ->
+                    current.pixels[i / w * w + (w - 1 - i % w)]
+                }
+                current = Oriented(mirrored, w, current.height)
+            }
+            return current
+        }
+
+        /** Pixel-center aligned bilinear resize in double precision, RGB bytes out. */
+        private fun referenceResize(pixels: IntArray, srcW: Int, srcH: Int, outW: Int, outH: Int): IntArray {
+            val out = IntArray(outW * outH * 3)
+            for (oy in 0 until outH) {
+                val sy = ((oy + 0.5) * srcH / outH - 0.5).coerceIn(0.0, srcH - 1.0)
+                val y0 = sy.toInt()
+                val y1 = minOf(y0 + 1, srcH - 1)
+                val fy = sy - y0
+                for (ox in 0 until outW) {
+                    val sx = ((ox + 0.5) * srcW / outW - 0.5).coerceIn(0.0, srcW - 1.0)
+                    val x0 = sx.toInt()
+                    val x1 = minOf(x0 + 1, srcW - 1)
+                    val fx = sx - x0
+                    for (c in 0 until 3) {
+                        val shift = 16 - 8 * c
+                        fun at(x: Int, y: Int) = ((pixels[y * srcW + x] shr shift) and 0xFF).toDouble()
+                        val top = at(x0, y0) * (1 - fx) + at(x1, y0) * fx
+                        val bottom = at(x0, y1) * (1 - fx) + at(x1, y1) * fx
+                        out[(oy * outW + ox) * 3 + c] = Math.round(top * (1 - fy) + bottom * fy).toInt()
+                    }
+                }
+            }
+            return out
+        }
+
+        /** Fixed-point weights may round differently by one step. */
+        private fun assertClose(expected: IntArray, actual: ByteArray, message: String) {
+            assertEquals(message, expected.size, actual.size)
+            for (i in expected.indices) {
+                val diff = Math.abs(expected[i] - (actual[i].toInt() and 0xFF))
+                assertTrue("$message: value $i differs by $diff", diff <= 1)
+            }
+        }
+    }
+}
@@ -0,0 +1,109 @@
+package com.y2m.drowsydetector.core
+
+import org.junit.Assert.assertEquals
+import org.junit.Assert.assertSame
+import org.junit.Test
+
+class OutputDecoderTest {
+
+    @Test
+    fun detectsFormatFromShape() {
+        assertEquals(OutputFormat.YOLO, OutputFormat.of(intArrayOf(1, 8400, 6)))
+        assertEquals(OutputFormat.YOLO_TRANSPOSED, OutputFormat.of(intArrayOf(1, 6, 8400)))
+        assertEquals(OutputFormat.YOLO_TRANSPOSED, OutputFormat.of(intArrayOf(1, 84, 8400)))
+        assertEquals(OutputFormat.YOLO_TRANSPOSED, OutputFormat.of(intArrayOf(1, 6, 4)))
+        assertEquals(OutputFormat.CLASSIFICATION, OutputFormat.of(intArrayOf(1, 2)))
+        assertEquals(OutputFormat.GENERIC, OutputFormat.of(intArrayOf(1, 5)))
+        assertEquals(OutputFormat.GENERIC, OutputFormat.of(intArrayOf(1, 5, 5)))
+    }
+
+    @Test
+    fun decodesYoloBoxes() {
+        val decoder = OutputDecoder(intArrayOf(1, 4, 6))
+        assertEquals(OutputFormat.YOLO, decoder.format)
+        val output = floatArrayOf(
+            0f, 0f, 0f, 0f, 0.10f, 0.20f,  // below threshold
+            0f, 0f, 0f, 0f, 0.30f, 0.60f,
+            0f, 0f, 0f, 0f, 0.90f, 0.05f,  // best: drowsy
+            0f, 0f, 0f, 0f, 0.40f, 0.50f
+        )
+        val prediction = decoder.decode(output, Prediction())
+
+        assertEquals(Prediction.CLASS_DROWSY, prediction.classIndex)
+        assertEquals(0.90f, prediction.confidence, 0f)
+        assertEquals(3, prediction.detections)
+    }
+
+    @Test
+    fun decodesTransposedYoloFromBuffer() {
+        // Channels first, as YOLOv8 exports: [1, 6, numBoxes]
+        val numBoxes = 8400
+        val decoder = OutputDecoder(intArrayOf(1, 6, numBoxes))
+        assertEquals(OutputFormat.YOLO_TRANSPOSED, decoder.format)
+
+        val floats = decoder.buffer.asFloatBuffer()
+        floats.put(4 * numBoxes + 17, 0.3f)
+        floats.put(5 * numBoxes + 17, 0.2f)
+        floats.put(4 * numBoxes + 8000, 0.1f)
+        floats.put(5 * numBoxes + 8000, 0.8f)  // best: not drowsy
+
+        val prediction = Prediction()
+        assertSame(prediction, decoder.decode(prediction))
+        assertEquals(Prediction.CLASS_NOT_DROWSY, prediction.classIndex)
+        assertEquals(0.8f, prediction.confidence, 0f)
+        assertEquals(2, prediction.detections)
+        assertEquals(0, decoder.buffer.position())
+    }
+
+    @Test
+    fun reportsDefaultConfidenceWithoutDetections() {
+        val decoder = OutputDecoder(intArrayOf(1, 6, 100))
+        val prediction = decoder.decode(FloatArray(600) { 0.1f }, Prediction())
+
+        assertEquals(Prediction.CLASS_NOT_DROWSY, prediction.classIndex)
+        assertEquals(Prediction.DEFAULT_CONFIDENCE, prediction.confidence, 0f)
+        assertEquals(0, prediction.detections)
+    }
+
+    @Test
+    fun decodesClassification() {
+        val decoder = OutputDecoder(intArrayOf(1, 2))
+        assertEquals(OutputFormat.CLASSIFICATION, decoder.format)
+
+        val drowsy = decoder.decode(floatArrayOf(0.7f, 0.3f), Prediction())
+        assertEquals(Prediction.CLASS_DROWSY, drowsy.classIndex)
+        assertEquals(0.7f, drowsy.confidence, 0f)
+
+        val alert = decoder.decode(floatArrayOf(0.2f, 0.8f), Prediction())
+        assertEquals(Prediction.CLASS_NOT_DROWSY, alert.classIndex)
+        assertEquals(0.8f, alert.confidence, 0f)
+    }
+
+    @Test
+    fun decodesGenericRows() {
+        // [1, 2, 5]: neither YOLO layout; rows of 5 scanned at offsets 4 and 5
+        val decoder = OutputDecoder(intArrayOf(1, 2, 5))
+        assertEquals(OutputFormat.GENERIC, decoder.format)
+
+        val prediction = decoder.decode(floatArrayOf(0f, 0f, 0f, 0f, 0.9f, 0.6f, 0f, 0f, 0f, 0f), Prediction())
+        assertEquals(Prediction.CLASS_DROWSY, prediction.classIndex)
+        assertEquals(0.9f, prediction.confidence, 0f)
+    }
+
+    @Test
+    fun reusesBuffersAndPrediction() {
+        val decoder = OutputDecoder(intArrayOf(1, 2))
+        val buffer = decoder.buffer
+        val prediction = Prediction()
+
+        buffer.asFloatBuffer().put(floatArrayOf(0.9f, 0.1f))
+        assertSame(prediction, decoder.decode(prediction))
+        assertEquals(Prediction.CLASS_DROWSY, prediction.classIndex)
+
+        buffer.asFloatBuffer().put(floatArrayOf(0.4f, 0.6f))
+        assertSame(prediction, decoder.decode(prediction))
+        assertEquals(Prediction.CLASS_NOT_DROWSY, prediction.classIndex)
+        assertSame(buffer, decoder.buffer)
+        assertEquals(8, buffer.capacity())
+    }
+}
@@ -15,4 +15,4 @@ dependencyResolutionManagement {
 }
 
 rootProject.name = "DrowsyDetector"
-include(":app")
+include(":app", ":core")
@@ -8,6 +8,7 @@ This script loads the YOLO model (best.pt) and runs inference on:
 Usage:
     python test_inference.py              # Run with webcam
     python test_inference.py --image path/to/image.jpg  # Run on image
+    python test_inference.py --source clip.mp4 --no-display  # Headless replay
 """
 
 import argparse
@@ -15,6 +16,9 @@ import cv2
 import numpy as np
 from pathlib import Path
 
+from y2m.runtime.smoothing import MajorityVote, STATE_NAMES, score_from_detection
+from y2m.runtime.sources import open_source
+
 try:
     from ultralytics import YOLO
 except ImportError:
@@ -23,30 +27,39 @@ except ImportError:
     exit(1)
 
 
-def test_webcam(model):
-    """Run real-time drowsiness detection on webcam with rolling average."""
+def test_webcam(model, source=None, pace='fast', display=True):
+    """
+    Run real-time drowsiness detection on webcam with rolling average.
+    
+    Args:
+        model: Ultralytics YOLO model
+        source: Camera index or a recording (video, image directory, .npy)
+        pace: Replay pace for recordings ('fast' or 'realtime')
+        display: Show the annotated frames
+    """
     print("\n" + "=" * 50)
     print("   WEBCAM INFERENCE TEST")
     print("=" * 50)
-    print("Press 'q' to quit\n")
+    if display:
+        print("Press 'q' to quit\n")
 
-    cap = cv2.VideoCapture(0)
+    cap = open_source(source, pace=pace, negotiate=False, threaded=False, buffer_size=0)
     
-    if not cap.isOpened():
-        print("ERROR: Could not open webcam")
+    if not cap.open():
+        print(f"ERROR: Could not open source: {source or 'webcam'}")
         return False
 
     inference_count = 0
     
     # Rolling average tracking (last 5 inferences)
-    from collections import deque
-    detection_history = deque(maxlen=5)  # Store tuples of (class_name, confidence)
+    smoother = MajorityVote(window=5, report_every=5)
     last_reported_state = None
     
     while True:
-        ret, frame = cap.read()
+        ret, frame, _ = cap.read()
         if not ret:
-            print("ERROR: Failed to read from webcam")
+            if not cap.finished:
+                print("ERROR: Failed to read from webcam")
             break
 
         # Run inference
@@ -71,41 +84,33 @@ def test_webcam(model):
                     if current_detection is None or conf > current_detection[1]:
                         current_detection = (class_name, conf)
         
-        # Add to history
-        if current_detection:
-            detection_history.append(current_detection)
+        # Add to history; the majority vote is re-evaluated every 5 frames
+        state = smoother.update(score_from_detection(current_detection))
         
-        # Calculate rolling average state (every 5 frames or when we have enough data)
-        if len(detection_history) >= 1 and inference_count % 5 == 0:
-            # Count drowsy vs not drowsy in history
-            drowsy_count = sum(1 for d in detection_history if d[0] == 'drowsy')
-            notdrowsy_count = sum(1 for d in detection_history if d[0] == 'notdrowsy')
-            avg_conf = sum(d[1] for d in detection_history) / len(detection_history)
-            
-            # Determine current state based on majority
-            if drowsy_count > notdrowsy_count:
-                current_state = "DROWSY"
-            elif notdrowsy_count > drowsy_count:
-                current_state = "ALERT"
-            else:
-                current_state = "UNCERTAIN"
+        if smoother.count >= 1 and inference_count % 5 == 0:
+            drowsy_count = smoother.drowsy_count
+            notdrowsy_count = smoother.count - drowsy_count
+            avg_conf = smoother.mean_confidence
+            current_state = STATE_NAMES[state]
             
             # Report if state changed or every 30 frames
             if current_state != last_reported_state or inference_count % 30 == 0:
                 print(f"[Frame {inference_count}] State: {current_state} (avg conf: {avg_conf:.2f}, history: {drowsy_count}D/{notdrowsy_count}A)")
                 last_reported_state = current_state
         
-        elif len(detection_history) == 0 and inference_count % 30 == 0:
+        elif smoother.count == 0 and inference_count % 30 == 0:
             print(f"[Frame {inference_count}] No detections in recent frames")
 
         # Display
-        cv2.imshow("Drowsiness Detection - Press 'q' to quit", annotated_frame)
+        if display:
+            cv2.imshow("Drowsiness Detection - Press 'q' to quit", annotated_frame)
 
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
 
     cap.release()
-    cv2.destroyAllWindows()
+    if display:
+        cv2.destroyAllWindows()
     print(f"\n[SUCCESS] Ran {inference_count} inferences successfully!")
     return True
 
@@ -150,6 +155,11 @@ def main():
     parser = argparse.ArgumentParser(description="Test Drowsiness Detection Model Inference")
     parser.add_argument("--image", "-i", type=str, help="Path to an image to test (uses webcam if not provided)")
     parser.add_argument("--model", "-m", type=str, default="best.pt", help="Path to the model file (default: best.pt)")
+    parser.add_argument("--source", type=str, default=None,
+                        help="Camera index, video file, image directory or .npy stack (default: webcam 0)")
+    parser.add_argument("--pace", choices=["fast", "realtime"], default="fast",
+                        help="Replay pace for recorded sources (default: fast)")
+    parser.add_argument("--no-display", action="store_true", help="Do not open a window (headless runs)")
     args = parser.parse_args()
 
     # Find model
@@ -176,7 +186,7 @@ def main():
     if args.image:
         success = test_image(model, args.image)
     else:
-        success = test_webcam(model)
+        success = test_webcam(model, args.source, args.pace, display=not args.no_display)
 
     return 0 if success else 1
 
@@ -6,135 +6,97 @@ Uses rolling average of past 5 inferences for stable state determination.
 
 Usage:
     python test_tflite_inference.py
+    python test_tflite_inference.py --socket /tmp/y2m-inference.sock  # use a running y2m daemon
+    python test_tflite_inference.py --raw-capture  # default camera mode, for latency comparison
+    python test_tflite_inference.py --source clip.mp4 --no-display  # headless replay
 """
 
+import time
+import argparse
 import cv2
 import numpy as np
 from pathlib import Path
-from collections import deque
-
-# Try TensorFlow Lite runtime
-try:
-    import tensorflow as tf
-    interpreter_class = tf.lite.Interpreter
-    print("Using TensorFlow Lite")
-except ImportError:
-    try:
-        import tflite_runtime.interpreter as tflite
-        interpreter_class = tflite.Interpreter
-        print("Using TFLite Runtime")
-    except ImportError:
-        print("ERROR: Neither tensorflow nor tflite-runtime installed.")
-        print("Install with: pip install tensorflow")
-        exit(1)
-
-
-class TFLiteDetector:
-    """TFLite model wrapper for drowsiness detection."""
-    
-    def __init__(self, model_path: str):
-        self.interpreter = interpreter_class(model_path=model_path)
-        self.interpreter.allocate_tensors()
-        
-        # Get input/output details
-        self.input_details = self.interpreter.get_input_details()
-        self.output_details = self.interpreter.get_output_details()
-        
-        # Get input shape
-        self.input_shape = self.input_details[0]['shape']
-        self.input_height = self.input_shape[1]
-        self.input_width = self.input_shape[2]
-        
-        # Class names
-        self.class_names = ['drowsy', 'notdrowsy']
-        
-        print(f"Model loaded: {model_path}")
-        print(f"Input shape: {self.input_shape}")
-        print(f"Classes: {self.class_names}")
-    
-    def preprocess(self, frame):
-        """Preprocess frame for inference."""
-        # Resize to model input size
-        resized = cv2.resize(frame, (self.input_width, self.input_height))
-        # Convert BGR to RGB
-        rgb = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
-        # Normalize to 0-1 and add batch dimension
-        normalized = rgb.astype(np.float32) / 255.0
-        batched = np.expand_dims(normalized, axis=0)
-        return batched
-    
-    def detect(self, frame):
-        """Run detection on a frame. Returns list of (class_name, confidence, bbox)."""
-        # Preprocess
-        input_data = self.preprocess(frame)
-        
-        # Run inference
-        self.interpreter.set_tensor(self.input_details[0]['index'], input_data)
-        self.interpreter.invoke()
-        
-        # Get output
-        output_data = self.interpreter.get_tensor(self.output_details[0]['index'])
-        
-        detections = []
-        
-        # Parse YOLO output format (typically [batch, num_detections, 4+num_classes] or similar)
-        # The exact format depends on how the model was exported
-        if len(output_data.shape) == 3:
-            # Shape: [1, num_boxes, 4 + num_classes] - standard YOLO format
-            predictions = output_data[0]  # Remove batch dim
-            
-            # YOLO output: [x_center, y_center, width, height, class1_conf, class2_conf, ...]
-            for pred in predictions:
-                if len(pred) >= 6:  # x, y, w, h, class1, class2
-                    x, y, w, h = pred[:4]
-                    class_scores = pred[4:]
-                    
-                    # Get best class
-                    class_id = np.argmax(class_scores)
-                    confidence = class_scores[class_id]
-                    
-                    if confidence > 0.25:  # Confidence threshold
-                        class_name = self.class_names[class_id] if class_id < len(self.class_names) else f"class_{class_id}"
-                        detections.append((class_name, float(confidence), (x, y, w, h)))
-        
-        elif len(output_data.shape) == 2:
-            # Possible classification output [batch, num_classes]
-            scores = output_data[0]
-            class_id = np.argmax(scores)
-            confidence = scores[class_id]
-            if confidence > 0.25:
-                class_name = self.class_names[class_id] if class_id < len(self.class_names) else f"class_{class_id}"
-                detections.append((class_name, float(confidence), None))
-        
-        return detections
-
 
-def test_webcam(detector):
-    """Run real-time drowsiness detection on webcam with rolling average."""
+from y2m.cascade import DEFAULT_BAND, CascadeDetector
+from y2m.trace import TraceWriter
+from y2m.runtime.capture import CameraCapture
+from y2m.runtime.detector import TFLiteDetector
+from y2m.runtime.sources import open_source
+from y2m.runtime.smoothing import (
+    MajorityVote,
+    STATE_NAMES,
+    STATE_ALERT,
+    STATE_DROWSY,
+    STATE_UNCERTAIN,
+    score_from_detection,
+)
+
+# Stages recorded with --trace
+TRACE_STAGES = ('capture', 'inference', 'total')
+
+STATE_COLORS = {
+    STATE_DROWSY: (0, 0, 255),  # Red
+    STATE_ALERT: (0, 255, 0),  # Green
+    STATE_UNCERTAIN: (0, 255, 255),  # Yellow
+}
+
+
+def test_webcam(detector, input_size=None, raw_capture=False, trace_dir=None,
+                source=None, pace='fast', display=True):
+    """
+    Run real-time drowsiness detection on webcam with rolling average.
+    
+    Args:
+        detector: TFLiteDetector or y2m DaemonClient
+        input_size: Model input (height, width) used to negotiate the camera mode
+        raw_capture: Use default camera properties and blocking reads
+        trace_dir: Record a per-frame trace under this directory
+        source: Camera index or a recording (video, image directory, .npy)
+        pace: Replay pace for recordings ('fast' or 'realtime')
+        display: Show the annotated frames
+    """
     print("\n" + "=" * 50)
     print("   WEBCAM INFERENCE TEST (TFLite)")
     print("=" * 50)
-    print("Press 'q' to quit\n")
-
-    cap = cv2.VideoCapture(0)
+    if display:
+        print("Press 'q' to quit\n")
+
+    cap = open_source(
+        source,
+        target_size=input_size,
+        pace=pace,
+        negotiate=not raw_capture,
+        threaded=not raw_capture,
+        buffer_size=0 if raw_capture else 1
+    )
     
-    if not cap.isOpened():
-        print("ERROR: Could not open webcam")
+    if not cap.open():
+        print(f"ERROR: Could not open source: {source or 'webcam'}")
         return False
+    if isinstance(cap, CameraCapture):
+        print(f"Camera mode: {cap.mode['width']}x{cap.mode['height']} {cap.mode['fourcc']} "
+              f"({'raw' if raw_capture else 'negotiated, threaded'})")
 
     inference_count = 0
-    detection_history = deque(maxlen=5)
+    latencies_ms = []
+    start_time = time.perf_counter()
+    smoother = MajorityVote(window=5, report_every=5)
     last_reported_state = None
+    tracer = TraceWriter(trace_dir, stages=TRACE_STAGES) if trace_dir else None
     
     while True:
-        ret, frame = cap.read()
+        ret, frame, captured_at = cap.read()
         if not ret:
-            print("ERROR: Failed to read from webcam")
+            if not cap.finished:
+                print("ERROR: Failed to read from webcam")
             break
 
         # Run inference
+        started_at = time.perf_counter()
         detections = detector.detect(frame)
+        finished_at = time.perf_counter()
         inference_count += 1
+        latencies_ms.append((finished_at - captured_at) * 1000)
 
         # Draw detections on frame
         display_frame = frame.copy()
@@ -150,25 +112,25 @@ def test_webcam(detector):
             color = (0, 0, 255) if class_name == 'drowsy' else (0, 255, 0)
             cv2.putText(display_frame, label, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, color, 2)
         
-        # Add to history
-        if current_detection:
-            detection_history.append(current_detection)
+        # Add to history; the vote is re-evaluated every 5 frames
+        score = score_from_detection(current_detection)
+        state = smoother.update(score)
         
-        # Calculate rolling average state (every 5 frames)
-        if len(detection_history) >= 1 and inference_count % 5 == 0:
-            drowsy_count = sum(1 for d in detection_history if d[0] == 'drowsy')
-            notdrowsy_count = sum(1 for d in detection_history if d[0] == 'notdrowsy')
-            avg_conf = sum(d[1] for d in detection_history) / len(detection_history)
-            
-            if drowsy_count > notdrowsy_count:
-                current_state = "DROWSY"
-                state_color = (0, 0, 255)  # Red
-            elif notdrowsy_count > drowsy_count:
-                current_state = "ALERT"
-                state_color = (0, 255, 0)  # Green
-            else:
-                current_state = "UNCERTAIN"
-                state_color = (0, 255, 255)  # Yellow
+        if tracer:
+            tracer.record(
+                (score, 1.0 - score),
+                state,
+                ((started_at - captured_at) * 1000,
+                 (finished_at - started_at) * 1000,
+                 (finished_at - captured_at) * 1000)
+            )
+        
+        if smoother.count >= 1 and inference_count % 5 == 0:
+            drowsy_count = smoother.drowsy_count
+            notdrowsy_count = smoother.count - drowsy_count
+            avg_conf = smoother.mean_confidence
+            current_state = STATE_NAMES[state]
+            state_color = STATE_COLORS[state]
             
             # Draw state on frame
             cv2.putText(display_frame, f"State: {current_state}", (10, 70), 
@@ -179,43 +141,104 @@ def test_webcam(detector):
                 print(f"[Frame {inference_count}] State: {current_state} (avg conf: {avg_conf:.2f}, history: {drowsy_count}D/{notdrowsy_count}A)")
                 last_reported_state = current_state
         
-        elif len(detection_history) == 0 and inference_count % 30 == 0:
+        elif smoother.count == 0 and inference_count % 30 == 0:
             print(f"[Frame {inference_count}] No detections in recent frames")
             cv2.putText(display_frame, "No Detection", (10, 30), 
                        cv2.FONT_HERSHEY_SIMPLEX, 1, (128, 128, 128), 2)
 
         # Display
-        cv2.imshow("Drowsiness Detection (TFLite) - Press 'q' to quit", display_frame)
+        if display:
+            cv2.imshow("Drowsiness Detection (TFLite) - Press 'q' to quit", display_frame)
 
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
 
+    elapsed = time.perf_counter() - start_time
+    if tracer:
+        tracer.close()
+        print(f"Trace: {tracer.records_written} frames recorded under {trace_dir}")
     cap.release()
-    cv2.destroyAllWindows()
+    if display:
+        cv2.destroyAllWindows()
     print(f"\n[SUCCESS] Ran {inference_count} inferences successfully!")
+    if latencies_ms:
+        print(f"Capture-to-result latency: p50 {np.percentile(latencies_ms, 50):.1f} ms, "
+              f"p95 {np.percentile(latencies_ms, 95):.1f} ms, {inference_count / elapsed:.1f} FPS")
     return True
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Test TFLite Drowsiness Detection Model Inference")
+    parser.add_argument("--model", "-m", type=str, default=None,
+                        help="Path to the TFLite model (default: converted_models/best_float32.tflite)")
+    parser.add_argument("--socket", type=str, default=None,
+                        help="Run inference through a y2m daemon listening on this socket")
+    parser.add_argument("--source", type=str, default=None,
+                        help="Camera index, video file, image directory or .npy stack (default: webcam 0)")
+    parser.add_argument("--pace", choices=["fast", "realtime"], default="fast",
+                        help="Replay pace for recorded sources (default: fast)")
+    parser.add_argument("--no-display", action="store_true",
+                        help="Do not open a window (headless runs)")
+    parser.add_argument("--raw-capture", action="store_true",
+                        help="Open the camera with default properties (for latency comparison)")
+    parser.add_argument("--trace", type=str, default=None, metavar="DIR",
+                        help="Record a per-frame trace (scores, state, latencies) under DIR")
+    parser.add_argument("--screen", type=str, default=None,
+                        help="Low-resolution screen model; only uncertain frames run --model")
+    parser.add_argument("--band", type=float, nargs=2, default=list(DEFAULT_BAND), metavar=("LOW", "HIGH"),
+                        help="Drowsy-score band escalated to the full model (default: 0.2 0.8)")
+    args = parser.parse_args()
+
     print("\n" + "=" * 50)
     print("   DROWSINESS DETECTION - TFLite INFERENCE TEST")
     print("=" * 50)
 
-    # Find TFLite model
-    script_dir = Path(__file__).parent
-    model_path = script_dir / "converted_models" / "best_float32.tflite"
-    
-    if not model_path.exists():
-        print(f"ERROR: Model not found: {model_path}")
-        return 1
-
-    print(f"\nLoading model: {model_path}")
-
-    # Create detector
-    detector = TFLiteDetector(str(model_path))
+    if args.socket:
+        from y2m.client import DaemonClient
+        print(f"\nUsing inference daemon: {args.socket}")
+        detector = DaemonClient(args.socket)
+        try:
+            models = detector.models()
+        except OSError as e:
+            print(f"ERROR: Could not reach daemon: {e}")
+            return 1
+        print(f"Daemon models: {list(models)}")
+        default = next(m for m in models.values() if m['default'])
+        input_size = tuple(default['input_shape'][1:3])
+    else:
+        # Find TFLite model
+        script_dir = Path(__file__).parent
+        model_path = Path(args.model) if args.model else script_dir / "converted_models" / "best_float32.tflite"
+        
+        if not model_path.exists():
+            print(f"ERROR: Model not found: {model_path}")
+            return 1
+
+        print(f"\nLoading model: {model_path}")
+
+        # Create detector
+        try:
+            detector = TFLiteDetector(str(model_path))
+        except ImportError as e:
+            print(f"ERROR: {e}")
+            return 1
+        print(f"Input shape: {detector.input_shape}")
+        print(f"Classes: {detector.class_names}")
+        input_size = (int(detector.input_height), int(detector.input_width))
+
+        if args.screen:
+            screen = TFLiteDetector(args.screen, detector.class_names)
+            detector = CascadeDetector(screen, detector, band=tuple(args.band))
+            print(f"Cascade: screen {screen.input_shape[1:3]}, escalating scores in {detector.band}")
     
     # Run test
-    success = test_webcam(detector)
+    success = test_webcam(detector, input_size, raw_capture=args.raw_capture, trace_dir=args.trace,
+                          source=args.source, pace=args.pace, display=not args.no_display)
+
+    if isinstance(detector, CascadeDetector):
+        stats = detector.stats()
+        print(f"Cascade: {stats['escalation_rate']:.1%} of frames escalated, "
+              f"{stats['effective_ms']:.1f} ms/frame effective (screen {stats['screen_ms']:.1f} ms)")
     
     return 0 if success else 1
 
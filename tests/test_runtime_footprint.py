@@ -0,0 +1,43 @@
+"""
+Runtime footprint budget: importing y2m.runtime (and loading a model)
+must stay within the import-time and memory budget of
+y2m.runtime.footprint and must not pull in any conversion dependency.
+"""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from y2m.runtime.footprint import FORBIDDEN_MODULES, check_footprint, measure_footprint
+
+pytestmark = pytest.mark.skipif(
+    not any(importlib.util.find_spec(name) for name in ('tflite_runtime', 'ai_edge_litert')),
+    reason='requires a TFLite interpreter package (ai-edge-litert or tflite-runtime)'
+)
+
+MODEL = Path(__file__).resolve().parent.parent / 'best_saved_model' / 'best_float16.tflite'
+
+
+def test_import_within_budget():
+    report = measure_footprint()
+    assert check_footprint(report) == []
+    assert report['forbidden_modules'] == []
+    assert report['interpreter'].split('.')[0] in ('tflite_runtime', 'ai_edge_litert')
+
+
+@pytest.mark.skipif(not MODEL.exists(), reason=f'{MODEL.name} not available')
+def test_model_load_within_budget():
+    report = measure_footprint(model_path=str(MODEL))
+    assert check_footprint(report) == []
+    assert report['forbidden_modules'] == []
+    assert report['load_rss_mb'] >= report['import_rss_mb']
+
+
+@pytest.mark.skipif(importlib.util.find_spec('polars') is None, reason='polars not installed')
+def test_forbidden_module_is_reported():
+    # The probe must flag a conversion-side module once something imports it
+    report = measure_footprint(modules=('y2m.runtime.detector', 'polars'), runs=1)
+    assert 'polars' in FORBIDDEN_MODULES
+    assert report['forbidden_modules'] == ['polars']
+    assert any('forbidden' in violation for violation in check_footprint(report))
@@ -1,20 +1,37 @@
 """
 Y2M - YOLO to Mobile Conversion Pipeline
 
-A modular CLI utility that converts YOLO .pt models to optimized 
+A modular CLI utility that converts YOLO .pt models to optimized
 TensorFlow Lite format for mobile deployment.
+
+Inference-only deployments use y2m.runtime; the conversion exports below
+are imported on first access so importing y2m.runtime stays light.
 """
 
+import importlib
+
 __version__ = "1.0.0"
 __author__ = "Y2M Pipeline"
 
-from .converter import YOLOConverter
-from .optimizer import ModelOptimizer
-from .utils import validate_model_path, create_metadata
+_EXPORTS = {
+    "YOLOConverter": "converter",
+    "ModelOptimizer": "optimizer",
+    "validate_model_path": "utils",
+    "create_metadata": "utils",
+}
 
 __all__ = [
     "YOLOConverter",
-    "ModelOptimizer", 
+    "ModelOptimizer",
     "validate_model_path",
     "create_metadata",
 ]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,382 @@
+"""
+Y2M Bench Module
+
+Runs the capture -> inference -> smoothing loop headless against a
+frame source and reports throughput and latency, so loops can be
+benchmarked on build machines and compared across commits.
+
+Repeated runs carry bootstrap confidence intervals, and compare_reports()
+gates a run against a saved baseline: a metric only counts as regressed
+when it is worse by more than the tolerance AND its interval no longer
+overlaps the baseline's, so run-to-run noise does not fail a build.
+"""
+
+import os
+import time
+import logging
+import platform
+from datetime import datetime
+from importlib import metadata as importlib_metadata
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .runtime.sources import FrameSource
+from .runtime.smoothing import MajorityVote, SmoothingPolicy, score_from_detection
+from .runtime.stats import latency_stats
+
+logger = logging.getLogger(__name__)
+
+# Relative slowdown / growth allowed before a metric can regress
+DEFAULT_TOLERANCES = {
+    'latency': 0.10,
+    'load': 0.25,
+    'size': 0.01,
+}
+
+DEFAULT_CONFIDENCE = 0.95
+BOOTSTRAP_RESAMPLES = 2000
+
+STATUS_OK = 'ok'
+STATUS_REGRESSED = 'regressed'
+STATUS_IMPROVED = 'improved'
+STATUS_SKIPPED = 'skipped'
+
+# Packages whose version changes are worth pointing out in a comparison
+TRACKED_PACKAGES = ('numpy', 'opencv-python', 'tensorflow', 'tflite-runtime', 'ai-edge-litert', 'ultralytics')
+
+
+def _host_info() -> Dict[str, Any]:
+    versions = {}
+    for package in TRACKED_PACKAGES:
+        try:
+            versions[package] = importlib_metadata.version(package)
+        except importlib_metadata.PackageNotFoundError:
+            continue
+    return {
+        'machine': platform.machine(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'packages': versions,
+    }
+
+
+def _measure(
+    detector,
+    source: FrameSource,
+    warmup_frames: int,
+    smoother: Optional[SmoothingPolicy]
+) -> Dict[str, Any]:
+    """Run the loop once; returns raw per-frame samples and the duration."""
+    smoother = smoother or MajorityVote(window=5, report_every=5)
+    latencies = []
+    inference = []
+    frames = 0
+    start = time.perf_counter()
+
+    while True:
+        ok, frame, captured_at = source.read()
+        if not ok:
+            break
+
+        started_at = time.perf_counter()
+        detections = detector.detect(frame)
+        best = max(detections, key=lambda d: d[1]) if detections else None
+        smoother.update(score_from_detection(best))
+        finished_at = time.perf_counter()
+
+        frames += 1
+        if frames == warmup_frames:
+            start = finished_at
+        if frames <= warmup_frames:
+            continue
+
+        latencies.append((finished_at - captured_at) * 1000)
+        inference.append((finished_at - started_at) * 1000)
+
+    if not latencies:
+        raise ValueError(f"Source produced {frames} frames, fewer than warmup + 1")
+
+    return {
+        'latencies': np.asarray(latencies),
+        'inference': np.asarray(inference),
+        'duration': time.perf_counter() - start,
+        'dropped': int(getattr(source, 'dropped', 0)),
+    }
+
+
+def bootstrap_ci(
+    groups: Sequence[Sequence[float]],
+    percentile: float,
+    confidence: float = DEFAULT_CONFIDENCE,
+    resamples: int = BOOTSTRAP_RESAMPLES,
+    seed: int = 0
+) -> List[float]:
+    """
+    Percentile bootstrap confidence interval for a percentile of grouped samples.
+
+    Each resample draws the groups (repetitions) with replacement and then
+    the samples within each drawn group, so both run-to-run and
+    frame-to-frame variation widen the interval.
+
+    Args:
+        groups: Samples per repetition
+        percentile: Statistic to bound (50 for the median, 95 for p95)
+        confidence: Interval coverage
+        resamples: Bootstrap resamples
+        seed: RNG seed, so the same samples give the same interval
+
+    Returns:
+        [low, high]
+    """
+    groups = [np.asarray(g, dtype=np.float64) for g in groups if len(g)]
+    if not groups:
+        raise ValueError("No samples to bootstrap")
+
+    rng = np.random.default_rng(seed)
+    statistics = np.empty(resamples)
+    for i in range(resamples):
+        drawn = rng.integers(0, len(groups), len(groups))
+        pooled = np.concatenate([
+            groups[g][rng.integers(0, len(groups[g]), len(groups[g]))] for g in drawn
+        ])
+        statistics[i] = np.percentile(pooled, percentile)
+
+    alpha = (1 - confidence) / 2 * 100
+    low, high = np.percentile(statistics, [alpha, 100 - alpha])
+    return [round(float(low), 3), round(float(high), 3)]
+
+
+def run_repeated(
+    load_detector: Callable[[], Any],
+    open_source: Callable[[], FrameSource],
+    repetitions: int = 5,
+    warmup_frames: int = 5,
+    confidence: float = DEFAULT_CONFIDENCE,
+    smoother_factory: Optional[Callable[[], SmoothingPolicy]] = None
+) -> Dict[str, Any]:
+    """
+    Benchmark a fresh detector and source several times.
+
+    Every repetition loads the model again, so load time (construction,
+    tensor allocation and the first invocation) is measured as often as
+    the loop is.
+
+    Args:
+        load_detector: Returns a new detector
+        open_source: Returns a new, unopened frame source
+        repetitions: Number of runs
+        warmup_frames: Unmeasured frames at the start of each run
+        confidence: Coverage of the reported intervals
+        smoother_factory: Returns a smoothing policy per run (default
+            MajorityVote)
+
+    Returns:
+        Report with frames, dropped frames, duration, FPS, capture-to-result
+        and inference latency (ms) pooled over runs, confidence intervals
+        on p50/p95, load time and per-run summaries
+    """
+    if repetitions < 1:
+        raise ValueError("repetitions must be at least 1")
+
+    runs = []
+    load_ms = []
+    source = None
+    for index in range(repetitions):
+        start = time.perf_counter()
+        detector = load_detector()
+        detector.warmup(1)
+        load_ms.append((time.perf_counter() - start) * 1000)
+
+        source = open_source()
+        if not source.open():
+            raise OSError(f"Could not open frame source: {source}")
+        try:
+            run = _measure(detector, source, warmup_frames, smoother_factory() if smoother_factory else None)
+        finally:
+            source.release()
+
+        run['fps'] = len(run['latencies']) / run['duration'] if run['duration'] else 0.0
+        runs.append(run)
+        logger.info(f"Run {index + 1}/{repetitions}: {len(run['latencies'])} frames, "
+                    f"{run['fps']:.1f} FPS, p50 {np.percentile(run['latencies'], 50):.2f} ms")
+
+    groups = [run['latencies'] for run in runs]
+    pooled = np.concatenate(groups)
+    latency = latency_stats(pooled)
+    latency['ci'] = {
+        'p50': bootstrap_ci(groups, 50, confidence),
+        'p95': bootstrap_ci(groups, 95, confidence),
+    }
+
+    load = latency_stats(load_ms)
+    load['samples'] = [round(v, 3) for v in load_ms]
+    load['ci'] = {'p50': bootstrap_ci([[v] for v in load_ms], 50, confidence)}
+
+    duration = sum(run['duration'] for run in runs)
+    return {
+        'source': getattr(source, 'mode', {}),
+        'repetitions': repetitions,
+        'confidence': confidence,
+        'frames': len(pooled),
+        'warmup_frames': warmup_frames,
+        'dropped': sum(run['dropped'] for run in runs),
+        'duration_s': round(duration, 3),
+        'fps': round(len(pooled) / duration, 2) if duration else None,
+        'latency_ms': latency,
+        'inference_ms': latency_stats(np.concatenate([run['inference'] for run in runs])),
+        'latency_max_ms': round(float(np.max(pooled)), 3),
+        'load_ms': load,
+        'runs': [
+            {
+                'frames': len(run['latencies']),
+                'fps': round(run['fps'], 2),
+                'latency_ms': latency_stats(run['latencies']),
+                'load_ms': round(load_ms[i], 3),
+            }
+            for i, run in enumerate(runs)
+        ],
+        'timestamp': datetime.now().isoformat(),
+        'host': _host_info(),
+    }
+
+
+def _compare_metric(
+    name: str,
+    unit: str,
+    baseline: Optional[float],
+    current: Optional[float],
+    tolerance: float,
+    baseline_ci: Optional[Sequence[float]] = None,
+    current_ci: Optional[Sequence[float]] = None
+) -> Dict[str, Any]:
+    row = {
+        'metric': name,
+        'unit': unit,
+        'baseline': baseline,
+        'current': current,
+        'baseline_ci': baseline_ci,
+        'current_ci': current_ci,
+        'tolerance': tolerance,
+        'change': None,
+        'status': STATUS_SKIPPED,
+    }
+    if baseline is None or current is None or baseline <= 0:
+        return row
+
+    change = current / baseline - 1
+    row['change'] = round(change, 4)
+
+    # Intervals are only used when both sides have one (older reports may not)
+    separated_up = separated_down = True
+    if baseline_ci and current_ci:
+        separated_up = current_ci[0] > baseline_ci[1]
+        separated_down = current_ci[1] < baseline_ci[0]
+
+    if change > tolerance and separated_up:
+        row['status'] = STATUS_REGRESSED
+    elif change < -tolerance and separated_down:
+        row['status'] = STATUS_IMPROVED
+    else:
+        row['status'] = STATUS_OK
+    return row
+
+
+def compare_reports(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    tolerances: Optional[Dict[str, float]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Compare a benchmark report against a baseline report.
+
+    Latency p50/p95 and load time regress when they are slower by more
+    than their tolerance and the confidence intervals do not overlap;
+    model size (deterministic) regresses on tolerance alone.
+
+    Args:
+        baseline: Saved report (bench --json)
+        current: New report
+        tolerances: Relative tolerances keyed 'latency', 'load', 'size'
+            (DEFAULT_TOLERANCES for missing keys)
+
+    Returns:
+        One row per metric with baseline, current, change and status
+    """
+    tol = {**DEFAULT_TOLERANCES, **(tolerances or {})}
+
+    def ci(report, section, key):
+        return (report.get(section, {}).get('ci') or {}).get(key)
+
+    rows = []
+    for key in ('p50', 'p95'):
+        rows.append(_compare_metric(
+            f"latency {key}", 'ms',
+            baseline.get('latency_ms', {}).get(key), current.get('latency_ms', {}).get(key),
+            tol['latency'], ci(baseline, 'latency_ms', key), ci(current, 'latency_ms', key)
+        ))
+    rows.append(_compare_metric(
+        'load time p50', 'ms',
+        baseline.get('load_ms', {}).get('p50'), current.get('load_ms', {}).get('p50'),
+        tol['load'], ci(baseline, 'load_ms', 'p50'), ci(current, 'load_ms', 'p50')
+    ))
+    rows.append(_compare_metric(
+        'model size', 'bytes',
+        baseline.get('model', {}).get('size_bytes'), current.get('model', {}).get('size_bytes'),
+        tol['size']
+    ))
+    return rows
+
+
+def comparison_notes(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """Differences in setup (host, model, source, packages) that may explain a change."""
+    notes = []
+    base_host = baseline.get('host', {})
+    host = current.get('host', {})
+    for key in ('machine', 'python', 'cpu_count'):
+        if base_host.get(key) != host.get(key):
+            notes.append(f"host {key}: {base_host.get(key)} -> {host.get(key)}")
+
+    base_packages = base_host.get('packages', {})
+    packages = host.get('packages', {})
+    for package in sorted(set(base_packages) | set(packages)):
+        if base_packages.get(package) != packages.get(package):
+            notes.append(f"{package}: {base_packages.get(package, '-')} -> {packages.get(package, '-')}")
+
+    base_model = baseline.get('model', {})
+    model = current.get('model', {})
+    for key in ('path', 'input_shape', 'num_threads', 'delegate'):
+        if base_model.get(key) != model.get(key):
+            notes.append(f"model {key}: {base_model.get(key)} -> {model.get(key)}")
+
+    base_source = baseline.get('source', {})
+    source = current.get('source', {})
+    for key in ('source', 'pace', 'fps'):
+        if base_source.get(key) != source.get(key):
+            notes.append(f"source {key}: {base_source.get(key)} -> {source.get(key)}")
+    return notes
+
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    """Render compare_reports() rows as a text table."""
+
+    def value(v, interval, unit):
+        if v is None:
+            return '-'
+        if unit == 'bytes':
+            return f"{v / (1024 * 1024):.2f} MB"
+        text = f"{v:.2f}"
+        if interval:
+            text += f" [{interval[0]:.2f}, {interval[1]:.2f}]"
+        return text
+
+    lines = [f"{'Metric':<16} {'Baseline':>24} {'Current':>24} {'Change':>8}  Status"]
+    for row in rows:
+        change = '-' if row['change'] is None else f"{row['change']:+.1%}"
+        lines.append(
+            f"{row['metric'] + (' ms' if row['unit'] == 'ms' else ''):<16} "
+            f"{value(row['baseline'], row['baseline_ci'], row['unit']):>24} "
+            f"{value(row['current'], row['current_ci'], row['unit']):>24} "
+            f"{change:>8}  {row['status'].upper()}"
+        )
+    return '\n'.join(lines)
@@ -0,0 +1,321 @@
+"""
+Y2M Calibration Module
+
+Builds calibration datasets from image folders and videos, streaming
+frames to a memory-mapped .npy so the set can be any size, and exposes
+a lazy generator adapter for quantization.
+
+Layout of a source directory:
+    source/
+        drowsy/       # each subfolder is a class
+        notdrowsy/
+A directory without subfolders (or a single file) is treated as one
+unlabeled class.
+"""
+
+import json
+import logging
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from .npy_stream import NpyStreamWriter
+from .runtime.sources import IMAGE_EXTENSIONS, sample_to_frame
+
+logger = logging.getLogger(__name__)
+
+VIDEO_EXTENSIONS = {'.mp4', '.avi', '.mov', '.mkv', '.webm'}
+
+# Label written for frames that did not come from a class folder
+UNLABELED = -1
+
+
+def _is_media(path: Path) -> bool:
+    return path.suffix.lower() in IMAGE_EXTENSIONS | VIDEO_EXTENSIONS
+
+
+def iter_media_frames(path: Path, frame_stride: int = 1) -> Iterator[np.ndarray]:
+    """
+    Yield BGR frames from an image or video file.
+
+    Args:
+        path: Image or video file
+        frame_stride: Keep every Nth video frame
+    """
+    path = Path(path)
+    if path.suffix.lower() in IMAGE_EXTENSIONS:
+        frame = cv2.imread(str(path))
+        if frame is None:
+            logger.warning(f"Could not read image: {path.name}")
+        else:
+            yield frame
+        return
+
+    cap = cv2.VideoCapture(str(path))
+    if not cap.isOpened():
+        logger.warning(f"Could not open video: {path.name}")
+        return
+
+    index = 0
+    try:
+        while True:
+            # grab() skips decoding for frames we drop
+            if not cap.grab():
+                break
+            if index % frame_stride == 0:
+                ok, frame = cap.retrieve()
+                if ok:
+                    yield frame
+            index += 1
+    finally:
+        cap.release()
+
+
+def discover_sources(sources: Sequence[str]) -> Dict[str, List[Path]]:
+    """
+    Group media files by class.
+
+    Args:
+        sources: Directories and/or media files
+
+    Returns:
+        Mapping of class name ('' for unlabeled) to sorted media files
+    """
+    classes: Dict[str, List[Path]] = {}
+    for source in sources:
+        source = Path(source)
+        if source.is_file():
+            classes.setdefault('', []).append(source)
+            continue
+        if not source.is_dir():
+            logger.warning(f"Skipping missing source: {source}")
+            continue
+
+        class_dirs = sorted(d for d in source.iterdir() if d.is_dir())
+        if class_dirs:
+            for class_dir in class_dirs:
+                files = sorted(f for f in class_dir.rglob('*') if f.is_file() and _is_media(f))
+                classes.setdefault(class_dir.name, []).extend(files)
+        else:
+            files = sorted(f for f in source.iterdir() if f.is_file() and _is_media(f))
+            classes.setdefault('', []).extend(files)
+
+    return {name: files for name, files in classes.items() if files}
+
+
+def frame_hash(frame: np.ndarray, hash_size: int = 8) -> int:
+    """Difference hash of a frame; near-identical frames differ in few bits."""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def _hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def preprocess_frame(frame: np.ndarray, input_size: Tuple[int, int], dtype=np.float32) -> np.ndarray:
+    """
+    Resize a BGR frame to the export size in model layout.
+
+    Matches TFLiteDetector.preprocess: RGB, HWC, scaled to [0, 1] for
+    float dtypes and left as raw pixels for uint8 (sample_to_frame is the
+    inverse).
+    """
+    height, width = input_size
+    resized = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+    rgb = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
+    if np.dtype(dtype) == np.uint8:
+        return rgb
+    return rgb.astype(dtype) / 255.0
+
+
+class CalibrationBuilder:
+    """
+    Streams frames from media sources into a calibration .npy.
+
+    Classes are sampled round-robin so each contributes equally until it
+    runs out; near-duplicate frames are dropped per class.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        input_size: Tuple[int, int] = (640, 640),
+        max_samples: int = 1000,
+        dedupe_distance: int = 4,
+        frame_stride: int = 1,
+        dtype: str = 'float32',
+        history: int = 64
+    ):
+        """
+        Initialize the builder.
+
+        Args:
+            output_path: Output .npy path
+            input_size: Export size (height, width)
+            max_samples: Maximum number of frames to write
+            dedupe_distance: Max hash distance to count as a duplicate
+                (negative disables deduplication)
+            frame_stride: Keep every Nth video frame
+            dtype: 'float32' ([0, 1] like the existing calibration set) or 'uint8'
+            history: Recent hashes per class compared for duplicates
+        """
+        self.output_path = Path(output_path)
+        self.input_size = tuple(input_size)
+        self.max_samples = max_samples
+        self.dedupe_distance = dedupe_distance
+        self.frame_stride = max(1, frame_stride)
+        self.dtype = np.dtype(dtype)
+        self.history = history
+
+    @property
+    def labels_path(self) -> Path:
+        return self.output_path.with_name(f"{self.output_path.stem}_labels.npy")
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.output_path.with_suffix('.json')
+
+    def _class_stream(self, files: List[Path], stats: dict) -> Iterator[np.ndarray]:
+        recent = deque(maxlen=self.history)
+        for path in files:
+            for frame in iter_media_frames(path, self.frame_stride):
+                stats['seen'] += 1
+                if self.dedupe_distance >= 0:
+                    h = frame_hash(frame)
+                    if any(_hamming(h, prev) <= self.dedupe_distance for prev in recent):
+                        stats['duplicates'] += 1
+                        continue
+                    recent.append(h)
+                yield frame
+
+    def build(self, sources: Sequence[str]) -> dict:
+        """
+        Build the dataset.
+
+        Args:
+            sources: Directories and/or media files
+
+        Returns:
+            Manifest dictionary (also written next to the .npy)
+        """
+        classes = discover_sources(sources)
+        if not classes:
+            raise ValueError("No images or videos found in sources")
+
+        class_names = [name for name in classes if name]
+        label_of = {name: class_names.index(name) if name else UNLABELED for name in classes}
+        stats = {name: {'seen': 0, 'duplicates': 0, 'kept': 0} for name in classes}
+        streams = {name: self._class_stream(files, stats[name]) for name, files in classes.items()}
+
+        logger.info(f"Building calibration set: {self.output_path.name}")
+        logger.info(f"  Classes: {class_names or ['(unlabeled)']}")
+        logger.info(f"  Size: {self.input_size}, dtype: {self.dtype.name}, max: {self.max_samples}")
+
+        labels = []
+        row_shape = self.input_size + (3,)
+        with NpyStreamWriter(self.output_path, row_shape, self.dtype) as writer:
+            # Round-robin over classes; exhausted classes drop out
+            while streams and writer.count < self.max_samples:
+                for name in list(streams):
+                    if writer.count >= self.max_samples:
+                        break
+                    frame = next(streams[name], None)
+                    if frame is None:
+                        del streams[name]
+                        continue
+                    writer.append(preprocess_frame(frame, self.input_size, self.dtype))
+                    labels.append(label_of[name])
+                    stats[name]['kept'] += 1
+                    if writer.count % 500 == 0:
+                        logger.info(f"  {writer.count} frames written...")
+
+        np.save(self.labels_path, np.asarray(labels, dtype=np.int16))
+
+        manifest = {
+            'data': self.output_path.name,
+            'labels': self.labels_path.name,
+            'num_samples': len(labels),
+            'input_size': list(self.input_size),
+            'dtype': self.dtype.name,
+            'class_names': class_names,
+            'classes': {name or '(unlabeled)': counts for name, counts in stats.items()},
+            'dedupe_distance': self.dedupe_distance,
+            'frame_stride': self.frame_stride,
+        }
+        with open(self.manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        logger.info(f"[OK] Calibration set saved: {self.output_path} ({len(labels)} frames)")
+        return manifest
+
+
+def load_calibration_set(path: str) -> Tuple[np.ndarray, Optional[np.ndarray], List[str]]:
+    """
+    Open a calibration set without loading it into memory.
+
+    Returns:
+        Tuple of (memory-mapped frames, labels or None, class names)
+    """
+    path = Path(path)
+    data = np.load(path, mmap_mode='r')
+
+    labels = None
+    labels_path = path.with_name(f"{path.stem}_labels.npy")
+    if labels_path.exists():
+        labels = np.load(labels_path)
+
+    class_names = []
+    manifest_path = path.with_suffix('.json')
+    if manifest_path.exists():
+        with open(manifest_path) as f:
+            class_names = json.load(f).get('class_names', [])
+
+    return data, labels, class_names
+
+
+def calibration_generator(
+    path: str,
+    num_samples: Optional[int] = None,
+    input_shape: Optional[tuple] = None,
+    shuffle: bool = False,
+    seed: int = 0
+) -> Callable:
+    """
+    Create a representative dataset generator backed by a calibration .npy.
+
+    Frames are read lazily from the memory map, so the set can be larger
+    than RAM. Compatible with TFLiteConverter.representative_dataset.
+
+    Args:
+        path: Calibration .npy (float [0, 1] or uint8 NHWC)
+        num_samples: Limit on samples yielded (all if None)
+        input_shape: Model input shape (NHWC); frames are resized if the
+            spatial size differs
+        shuffle: Visit samples in random order
+        seed: Shuffle seed
+
+    Returns:
+        Generator function yielding [sample] with shape (1, H, W, 3) float32
+    """
+    def generator():
+        data = np.load(path, mmap_mode='r')
+        count = len(data) if num_samples is None else min(num_samples, len(data))
+        indices = np.arange(len(data))
+        if shuffle:
+            np.random.default_rng(seed).shuffle(indices)
+
+        for i in indices[:count]:
+            sample = np.asarray(data[i], dtype=np.float32)
+            if data.dtype == np.uint8:
+                sample /= 255.0
+            if input_shape is not None and sample.shape[:2] != tuple(input_shape[1:3]):
+                sample = cv2.resize(sample, (int(input_shape[2]), int(input_shape[1])))
+            yield [sample[np.newaxis]]
+
+    return generator
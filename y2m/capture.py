@@ -0,0 +1,7 @@
+"""Compatibility alias: the capture module moved to y2m.runtime.capture."""
+
+import sys
+
+from .runtime import capture
+
+sys.modules[__name__] = capture
@@ -0,0 +1,212 @@
+"""
+Y2M Cascade Module
+
+Two-stage inference: a small low-resolution model screens every frame
+and only frames whose drowsy score falls inside an uncertainty band are
+escalated to the full model. Most frames are confidently "notdrowsy", so
+the full model runs on a fraction of them.
+"""
+
+import json
+import time
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .runtime.decoding import CONFIDENCE_THRESHOLD
+from .runtime.detector import TFLiteDetector
+from .runtime.stats import latency_stats
+
+logger = logging.getLogger(__name__)
+
+# Drowsy scores in [low, high] are escalated to the full model
+DEFAULT_BAND = (0.2, 0.8)
+
+
+def drowsy_index(class_names: Sequence[str]) -> int:
+    """Index of the drowsy class (0 if the names do not include it)."""
+    return list(class_names).index('drowsy') if 'drowsy' in class_names else 0
+
+
+class CascadeDetector:
+    """
+    Screen model + full model with escalation on uncertain frames.
+
+    Exposes the same detect()/predict() interface as TFLiteDetector, so
+    it can replace one in capture loops, and keeps running counts of
+    escalations and per-stage time.
+    """
+
+    def __init__(
+        self,
+        screen: TFLiteDetector,
+        full: TFLiteDetector,
+        band: Tuple[float, float] = DEFAULT_BAND
+    ):
+        """
+        Initialize the cascade.
+
+        Args:
+            screen: Low-resolution model run on every frame
+            full: Full model run on escalated frames
+            band: (low, high) drowsy-score range that escalates
+        """
+        low, high = band
+        if low > high:
+            raise ValueError(f"Invalid band: {band}")
+
+        self.screen = screen
+        self.full = full
+        self.band = (float(low), float(high))
+        self.class_names = full.class_names
+        self.drowsy_index = drowsy_index(screen.class_names)
+        self.reset_stats()
+
+    @classmethod
+    def from_metadata(cls, model_dir: str) -> 'CascadeDetector':
+        """Create the cascade recorded by `y2m cascade --save` in model_dir/metadata.json."""
+        model_dir = Path(model_dir)
+        with open(model_dir / "metadata.json") as f:
+            metadata = json.load(f)
+
+        cascade = metadata.get('cascade')
+        if not cascade:
+            raise ValueError(f"No cascade section in {model_dir / 'metadata.json'}")
+
+        class_names = metadata.get('class_names')
+        return cls(
+            TFLiteDetector(str(model_dir / cascade['screen_model']), class_names),
+            TFLiteDetector(str(model_dir / cascade['full_model']), class_names),
+            band=tuple(cascade['band'])
+        )
+
+    def reset_stats(self) -> None:
+        """Clear the running counters."""
+        self.frames = 0
+        self.escalations = 0
+        self.screen_seconds = 0.0
+        self.full_seconds = 0.0
+
+    def should_escalate(self, score: float) -> bool:
+        """True if a screen score falls inside the band."""
+        return self.band[0] <= score <= self.band[1]
+
+    def _run(self, frame: np.ndarray) -> Tuple[np.ndarray, TFLiteDetector]:
+        """Raw output and the model that decided the frame."""
+        start = time.perf_counter()
+        output = self.screen.predict(frame)
+        screened = time.perf_counter()
+        self.screen_seconds += screened - start
+        self.frames += 1
+
+        if self.should_escalate(float(self.screen.class_scores(output)[self.drowsy_index])):
+            output = self.full.predict(frame)
+            self.full_seconds += time.perf_counter() - screened
+            self.escalations += 1
+            return output, self.full
+
+        return output, self.screen
+
+    def predict(self, frame: np.ndarray) -> np.ndarray:
+        """Raw output of whichever model decided the frame."""
+        return self._run(frame)[0]
+
+    def detect(self, frame: np.ndarray, threshold: float = CONFIDENCE_THRESHOLD) -> list:
+        """Run detection on a frame. Returns list of (class_name, confidence, bbox)."""
+        output, model = self._run(frame)
+        return model.decode(output, threshold)
+
+    def warmup(self, runs: int = 3) -> None:
+        """Warm up both models."""
+        self.screen.warmup(runs)
+        self.full.warmup(runs)
+
+    def stats(self) -> Dict[str, float]:
+        """Escalation rate and mean per-frame latency since the last reset."""
+        frames = max(self.frames, 1)
+        return {
+            'frames': self.frames,
+            'escalations': self.escalations,
+            'escalation_rate': self.escalations / frames,
+            'screen_ms': self.screen_seconds * 1000 / frames,
+            'effective_ms': (self.screen_seconds + self.full_seconds) * 1000 / frames,
+        }
+
+
+def _run_model(detector: TFLiteDetector, frames: Sequence[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-frame class scores and latency (ms) of one model."""
+    scores = []
+    timings = []
+    for frame in frames:
+        start = time.perf_counter()
+        output = detector.predict(frame)
+        timings.append((time.perf_counter() - start) * 1000)
+        scores.append(detector.class_scores(output))
+    return np.asarray(scores, dtype=np.float64), np.asarray(timings)
+
+
+def evaluate_bands(
+    screen: TFLiteDetector,
+    full: TFLiteDetector,
+    frames: Sequence[np.ndarray],
+    bands: Sequence[Tuple[float, float]],
+    labels: Optional[np.ndarray] = None
+) -> Dict[str, object]:
+    """
+    Score escalation bands on a sample set.
+
+    Both models run once on every frame; each band is then replayed from
+    the cached scores and timings, so adding bands costs no inference.
+
+    Args:
+        screen: Low-resolution model
+        full: Full model
+        frames: BGR frames
+        bands: Candidate (low, high) bands
+        labels: Optional per-frame class ids for accuracy
+
+    Returns:
+        Dictionary with the full-model baseline and one entry per band:
+        escalation rate, effective latency, agreement with the full model
+        and accuracy (if labeled)
+    """
+    screen.warmup()
+    full.warmup()
+    screen_scores, screen_ms = _run_model(screen, frames)
+    full_scores, full_ms = _run_model(full, frames)
+
+    drowsy = screen_scores[:, drowsy_index(screen.class_names)]
+    screen_top = screen_scores.argmax(axis=1)
+    full_top = full_scores.argmax(axis=1)
+
+    baseline = {'latency_ms': latency_stats(full_ms)}
+    if labels is not None:
+        baseline['accuracy'] = round(float((full_top == labels).mean()), 4)
+
+    results = []
+    for low, high in bands:
+        escalate = (drowsy >= low) & (drowsy <= high)
+        final = np.where(escalate, full_top, screen_top)
+        per_frame_ms = screen_ms + np.where(escalate, full_ms, 0.0)
+
+        result = {
+            'band': [low, high],
+            'escalation_rate': round(float(escalate.mean()), 4),
+            'latency_ms': latency_stats(per_frame_ms),
+            'agreement': round(float((final == full_top).mean()), 4),
+        }
+        if labels is not None:
+            result['accuracy'] = round(float((final == labels).mean()), 4)
+        results.append(result)
+
+    return {'samples': len(frames), 'full': baseline, 'bands': results}
+
+
+def choose_band(results: List[dict], min_agreement: float) -> Optional[dict]:
+    """Fastest band (by mean latency) whose agreement meets min_agreement."""
+    eligible = [r for r in results if r['agreement'] >= min_agreement]
+    if not eligible:
+        return None
+    return min(eligible, key=lambda r: r['latency_ms']['mean'])
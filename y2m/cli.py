@@ -19,7 +19,9 @@ from .utils import (
     ERR_FILE_EMPTY,
 )
 from .converter import YOLOConverter
-from .optimizer import quantize_with_ultralytics
+from .isolation import ExportPipeline
+from .profiling import StageProfiler
+from .protocol import DEFAULT_SOCKET_PATH
 
 # Configure logging
 logging.basicConfig(
@@ -34,6 +36,7 @@ EXIT_SUCCESS = 0
 EXIT_VALIDATION_ERROR = 1
 EXIT_CONVERSION_ERROR = 2
 EXIT_QUANTIZATION_ERROR = 3
+EXIT_REGRESSION = 4
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -41,7 +44,9 @@ def create_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         prog='y2m',
         description='Y2M: YOLO to Mobile Conversion Pipeline',
-        epilog='Example: python -m y2m.cli --weights best.pt --output ./converted_models --quantize'
+        epilog='Example: python -m y2m.cli --weights best.pt --output ./converted_models --quantize\n'
+               'Subcommands: ' + ', '.join(SUBCOMMANDS),
+        formatter_class=argparse.RawDescriptionHelpFormatter
     )
     
     parser.add_argument(
@@ -65,18 +70,1525 @@ def create_parser() -> argparse.ArgumentParser:
     )
     
     parser.add_argument(
+        '--int8-io',
+        action='store_true',
+        help='With --quantize, keep int8 input/output tensors (full-integer model)'
+    )
+    
+    parser.add_argument(
+        '--calibration',
+        type=str,
+        default=None,
+        metavar='PATH',
+        help='With --quantize, calibrate on this set (built with "y2m calib build") '
+             'instead of Ultralytics\' default calibration images'
+    )
+    
+    parser.add_argument(
+        '--calibration-samples',
+        type=int,
+        default=100,
+        help='Samples from --calibration used to calibrate (default: 100)'
+    )
+    
+    parser.add_argument(
+        '--input-size', '-s',
+        type=int,
+        nargs=2,
+        default=[640, 640],
+        metavar=('HEIGHT', 'WIDTH'),
+        help='Input image size (default: 640 640)'
+    )
+    
+    parser.add_argument(
+        '--dynamic',
+        action='store_true',
+        help='Export with dynamic batch and input size (the runtime resizes and caches per shape)'
+    )
+    
+    parser.add_argument(
+        '--uint8-input',
+        action='store_true',
+        help='Also export a model that takes uint8 pixels, with /255 normalization fused into the graph'
+    )
+    
+    parser.add_argument(
+        '--prune',
+        type=float,
+        default=None,
+        metavar='SPARSITY',
+        help='Also export a magnitude-pruned sparse model (<stem>_sparse.tflite): this fraction (0-1) '
+             'of 4x1 weight blocks of 1x1 convolutions is zeroed (XNNPACK sparse layout)'
+    )
+    
+    parser.add_argument(
+        '--finetune',
+        type=str,
+        default=None,
+        metavar='DATA',
+        help='Fine-tune the pruned model on this dataset (Ultralytics layout: folder with train/ and val/)'
+    )
+    
+    parser.add_argument(
+        '--finetune-epochs',
+        type=int,
+        default=3,
+        help='Fine-tuning epochs (default: 3)'
+    )
+    
+    parser.add_argument(
+        '--prune-samples',
+        type=str,
+        default=None,
+        metavar='PATH',
+        help='Labeled calibration set (.npy) for the dense vs. sparse accuracy report'
+    )
+    
+    parser.add_argument(
+        '--cleanup',
+        action='store_true',
+        help='Remove intermediate files (.onnx) after conversion'
+    )
+    
+    parser.add_argument(
+        '--onnx',
+        action='store_true',
+        help='Also export a standalone .onnx (its own stage; the SavedModel export does not use it)'
+    )
+    
+    parser.add_argument(
+        '--isolate',
+        action='store_true',
+        help='Run each export stage in a child process so its memory is released'
+    )
+    
+    parser.add_argument(
+        '--max-rss',
+        type=int,
+        default=None,
+        metavar='MB',
+        help='Kill an isolated stage whose resident memory exceeds MB'
+    )
+    
+    parser.add_argument(
+        '--max-address-space',
+        type=int,
+        default=None,
+        metavar='MB',
+        help='Address space limit per isolated stage (TensorFlow reserves far more than it touches)'
+    )
+    
+    parser.add_argument(
+        '--stage-timeout',
+        type=float,
+        default=None,
+        metavar='SECONDS',
+        help='Kill an isolated stage after SECONDS'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Write profile.json with wall/CPU time, peak RSS and artifact sizes per step'
+    )
+    
+    parser.add_argument(
+        '--profile-python',
+        action='store_true',
+        help='Also capture a cProfile of the main process (profile.prof; implies --profile)'
+    )
+    
+    parser.add_argument(
+        '--verbose', '-v',
+        action='store_true',
+        help='Enable verbose output'
+    )
+    
+    return parser
+
+
+def create_daemon_parser() -> argparse.ArgumentParser:
+    """Create the argument parser for the daemon subcommand."""
+    parser = argparse.ArgumentParser(
+        prog='y2m daemon',
+        description='Keep TFLite models warm and serve inference over a Unix socket',
+        epilog='Example: python -m y2m.cli daemon --model converted_models/best_float32.tflite\n'
+               '         python -m y2m.cli daemon --watch converted_models --canary calibration.npy',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+
+    parser.add_argument(
+        '--model', '-m',
+        type=str,
+        action='append',
+        default=[],
+        metavar='[NAME=]PATH',
+        help='TFLite model to serve (repeatable; the first is the default)'
+    )
+
+    parser.add_argument(
+        '--watch', '-w',
+        type=str,
+        action='append',
+        default=[],
+        metavar='[NAME=]DIR',
+        help='Converted model directory to serve and hot-swap when its metadata.json changes (repeatable)'
+    )
+
+    parser.add_argument(
+        '--poll-interval',
+        type=float,
+        default=2.0,
+        help='Seconds between metadata.json checks for --watch (default: 2.0)'
+    )
+
+    parser.add_argument(
+        '--canary',
+        type=str,
+        default=None,
+        metavar='PATH',
+        help='Calibration set (.npy) whose frames every new version must agree on before it is swapped in'
+    )
+
+    parser.add_argument(
+        '--min-agreement',
+        type=float,
+        default=0.8,
+        help='Canary top-1 agreement with the live version required to swap (default: 0.8)'
+    )
+
+    parser.add_argument(
+        '--socket',
+        type=str,
+        default=DEFAULT_SOCKET_PATH,
+        help=f'Unix socket path (default: {DEFAULT_SOCKET_PATH})'
+    )
+
+    parser.add_argument(
+        '--threads',
+        type=int,
+        default=None,
+        help='Interpreter threads per --model (default: runtime default; '
+             '--watch models use the metadata.json deployment settings)'
+    )
+
+    parser.add_argument(
+        '--warmup',
+        type=int,
+        default=3,
+        help='Warmup invocations per model (default: 3)'
+    )
+
+    return parser
+
+
+def run_daemon(parsed_args) -> int:
+    """Run the inference daemon until interrupted."""
+    from .daemon import InferenceDaemon
+    from .model_manager import ModelManager
+
+    if not parsed_args.model and not parsed_args.watch:
+        print("\n[ERROR] At least one --model or --watch is required")
+        return EXIT_VALIDATION_ERROR
+
+    model_paths = {}
+    for spec in parsed_args.model:
+        name, sep, path = spec.partition('=')
+        if not sep:
+            path, name = spec, Path(spec).stem
+        if not Path(path).exists():
+            print(f"\n[ERROR] Model not found: {path}")
+            return EXIT_VALIDATION_ERROR
+        model_paths[name] = path
+
+    canary_frames = None
+    if parsed_args.canary:
+        from .calibration import load_calibration_set, sample_to_frame
+        if not Path(parsed_args.canary).exists():
+            print(f"\n[ERROR] Canary set not found: {parsed_args.canary}")
+            return EXIT_VALIDATION_ERROR
+        data, _, _ = load_calibration_set(parsed_args.canary)
+        canary_frames = [sample_to_frame(sample) for sample in data]
+
+    managers = {}
+    for spec in parsed_args.watch:
+        name, sep, path = spec.partition('=')
+        if not sep:
+            path, name = spec, Path(spec).resolve().name
+        if not (Path(path) / 'metadata.json').exists():
+            print(f"\n[ERROR] No metadata.json in {path}")
+            return EXIT_VALIDATION_ERROR
+        managers[name] = ModelManager(
+            path,
+            poll_interval=parsed_args.poll_interval,
+            warmup_runs=parsed_args.warmup,
+            canary_frames=canary_frames,
+            min_agreement=parsed_args.min_agreement
+        )
+
+    daemon = InferenceDaemon(
+        model_paths,
+        socket_path=parsed_args.socket,
+        num_threads=parsed_args.threads,
+        warmup_runs=parsed_args.warmup,
+        managers=managers
+    )
+
+    try:
+        daemon.load_models()
+    except Exception as e:
+        print(f"\n[ERROR] Failed to load models: {e}")
+        return EXIT_CONVERSION_ERROR
+
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Daemon stopped")
+
+    return EXIT_SUCCESS
+
+
+def create_calib_parser() -> argparse.ArgumentParser:
+    """Create the argument parser for the calib subcommand."""
+    parser = argparse.ArgumentParser(
+        prog='y2m calib',
+        description='Manage quantization calibration datasets'
+    )
+    actions = parser.add_subparsers(dest='action', required=True)
+    
+    build = actions.add_parser(
+        'build',
+        help='Stream frames from image folders and videos into a calibration .npy',
+        epilog='Example: python -m y2m.cli calib build dataset/ clips/drive.mp4 --output calib.npy'
+    )
+    
+    build.add_argument(
+        'sources',
+        type=str,
+        nargs='+',
+        help='Image folders (class subfolders are stratified), images or videos'
+    )
+    
+    build.add_argument(
+        '--output', '-o',
+        type=str,
+        default='./calibration.npy',
+        help='Output .npy path (default: ./calibration.npy)'
+    )
+    
+    build.add_argument(
         '--input-size', '-s',
         type=int,
-        nargs=2,
-        default=[640, 640],
-        metavar=('HEIGHT', 'WIDTH'),
-        help='Input image size (default: 640 640)'
+        nargs=2,
+        default=[640, 640],
+        metavar=('HEIGHT', 'WIDTH'),
+        help='Export input size to resize frames to (default: 640 640)'
+    )
+    
+    build.add_argument(
+        '--max-samples', '-n',
+        type=int,
+        default=1000,
+        help='Maximum number of frames (default: 1000)'
+    )
+    
+    build.add_argument(
+        '--dedupe-distance',
+        type=int,
+        default=4,
+        help='Drop frames within this hash distance of a recent frame; -1 disables (default: 4)'
+    )
+    
+    build.add_argument(
+        '--frame-stride',
+        type=int,
+        default=1,
+        help='Keep every Nth video frame (default: 1)'
+    )
+    
+    build.add_argument(
+        '--dtype',
+        choices=['float32', 'uint8'],
+        default='float32',
+        help='Stored pixel format (default: float32 in [0, 1])'
+    )
+    
+    build.add_argument(
+        '--verbose', '-v',
+        action='store_true',
+        help='Enable verbose output'
+    )
+    
+    return parser
+
+
+def run_calib(parsed_args) -> int:
+    """Run a calib action."""
+    from .calibration import CalibrationBuilder
+    
+    builder = CalibrationBuilder(
+        parsed_args.output,
+        input_size=tuple(parsed_args.input_size),
+        max_samples=parsed_args.max_samples,
+        dedupe_distance=parsed_args.dedupe_distance,
+        frame_stride=parsed_args.frame_stride,
+        dtype=parsed_args.dtype
+    )
+    
+    try:
+        manifest = builder.build(parsed_args.sources)
+    except ValueError as e:
+        print(f"\n[ERROR] {e}")
+        return EXIT_VALIDATION_ERROR
+    
+    print(f"\nCalibration set: {builder.output_path} ({manifest['num_samples']} frames)")
+    for name, counts in manifest['classes'].items():
+        print(f"   +-- {name}: {counts['kept']} kept, {counts['duplicates']} duplicates dropped")
+    print()
+    
+    return EXIT_SUCCESS
+
+
+def _parse_size(value: str) -> tuple:
+    """Parse '320' or '320x240' (HEIGHTxWIDTH) into a (height, width) tuple."""
+    try:
+        parts = [int(p) for p in value.lower().split('x')]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid size: {value}")
+    if len(parts) == 1:
+        parts *= 2
+    if len(parts) != 2:
+        raise argparse.ArgumentTypeError(f"Invalid size: {value}")
+    return tuple(parts)
+
+
+def create_tune_parser() -> argparse.ArgumentParser:
+    """Create the argument parser for the tune subcommand."""
+    parser = argparse.ArgumentParser(
+        prog='y2m tune',
+        description='Find the fastest deployment configuration within an accuracy budget',
+        epilog='Example: python -m y2m.cli tune --weights best.pt --samples calibration.npy '
+               '--input-sizes 640 320 224 --precisions float32 int8 --threads 1 2 4'
+    )
+    
+    parser.add_argument(
+        '--weights', '-w',
+        type=str,
+        required=True,
+        help='Reference YOLO .pt model'
+    )
+    
+    parser.add_argument(
+        '--samples',
+        type=str,
+        required=True,
+        help='Labeled sample set built with "y2m calib build"'
+    )
+    
+    parser.add_argument(
+        '--output', '-o',
+        type=str,
+        default='./converted_models',
+        help='Directory whose metadata.json receives the result (default: ./converted_models)'
+    )
+    
+    parser.add_argument(
+        '--input-sizes',
+        type=_parse_size,
+        nargs='+',
+        default=[(640, 640)],
+        metavar='SIZE',
+        help='Candidate input sizes, e.g. 640 320 or 480x640 (default: 640)'
+    )
+    
+    parser.add_argument(
+        '--precisions',
+        choices=['float32', 'float16', 'int8'],
+        nargs='+',
+        default=['float32'],
+        help='Candidate precisions (default: float32)'
+    )
+    
+    parser.add_argument(
+        '--threads',
+        type=int,
+        nargs='+',
+        default=[1, 2, 4],
+        help='Candidate interpreter thread counts (default: 1 2 4)'
+    )
+    
+    parser.add_argument(
+        '--delegates',
+        type=str,
+        nargs='+',
+        default=['xnnpack', 'none'],
+        help='Candidate delegates: xnnpack, none, or a delegate library path (default: xnnpack none)'
+    )
+    
+    parser.add_argument(
+        '--max-drop',
+        type=float,
+        default=0.01,
+        help='Allowed accuracy drop vs the .pt reference (default: 0.01)'
+    )
+    
+    parser.add_argument(
+        '--runs',
+        type=int,
+        default=30,
+        help='Timed inferences per configuration (default: 30)'
+    )
+    
+    parser.add_argument(
+        '--model', '-m',
+        type=str,
+        action='append',
+        default=[],
+        help='Existing .tflite artifact to include as a candidate (repeatable)'
+    )
+    
+    parser.add_argument(
+        '--verbose', '-v',
+        action='store_true',
+        help='Enable verbose output'
+    )
+    
+    return parser
+
+
+def run_tune(parsed_args) -> int:
+    """Run the deployment autotuner."""
+    from .tuner import DeploymentTuner
+    
+    is_valid, error_code = validate_model_path(parsed_args.weights)
+    if not is_valid:
+        print(f"\n[ERROR] Validation failed: {error_code}")
+        return EXIT_VALIDATION_ERROR
+    
+    if not Path(parsed_args.samples).exists():
+        print(f"\n[ERROR] Sample set not found: {parsed_args.samples}")
+        return EXIT_VALIDATION_ERROR
+    
+    tuner = DeploymentTuner(
+        parsed_args.weights,
+        parsed_args.samples,
+        parsed_args.output,
+        input_sizes=parsed_args.input_sizes,
+        precisions=parsed_args.precisions,
+        threads=parsed_args.threads,
+        delegates=parsed_args.delegates,
+        max_accuracy_drop=parsed_args.max_drop,
+        latency_runs=parsed_args.runs,
+        extra_models=parsed_args.model
+    )
+    
+    try:
+        best = tuner.tune()
+    except Exception as e:
+        print(f"\n[ERROR] Tuning failed: {e}")
+        return EXIT_CONVERSION_ERROR
+    
+    if best is None:
+        print("\n[ERROR] No configuration met the accuracy budget (see tune_report.json)")
+        return EXIT_CONVERSION_ERROR
+    
+    print("\n" + "="*50)
+    print("   [SUCCESS] Tuning Complete!")
+    print("="*50)
+    print(f"\nModel:      {best['model']}")
+    print(f"Precision:  {best['precision']} {best['input_size']}")
+    print(f"Threads:    {best['num_threads']}, delegate: {best['delegate']}")
+    print(f"Latency:    p50 {best['latency_ms']['p50']:.2f} ms, p95 {best['latency_ms']['p95']:.2f} ms")
+    print(f"Accuracy:   {best['accuracy']:.4f} (drop {best['accuracy_drop']:+.4f})")
+    print()
+    
+    return EXIT_SUCCESS
+
+
+def _parse_band(value: str) -> tuple:
+    """Parse 'LOW:HIGH' into a (low, high) tuple of floats."""
+    try:
+        low, high = (float(p) for p in value.split(':'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid band: {value} (expected LOW:HIGH)")
+    if low > high:
+        raise argparse.ArgumentTypeError(f"Invalid band: {value} (LOW > HIGH)")
+    return (low, high)
+
+
+def create_cascade_parser() -> argparse.ArgumentParser:
+    """Create the argument parser for the cascade subcommand."""
+    parser = argparse.ArgumentParser(
+        prog='y2m cascade',
+        description='Evaluate a low-resolution screen model that escalates uncertain frames to the full model',
+        epilog='Example: python -m y2m.cli cascade --full converted_models/best_float32.tflite '
+               '--weights best.pt --screen-size 160 --samples calibration.npy --bands 0.2:0.8 0.1:0.9 --save'
+    )
+    
+    parser.add_argument(
+        '--full',
+        type=str,
+        required=True,
+        help='Full .tflite model (its directory receives the metadata with --save)'
+    )
+    
+    parser.add_argument(
+        '--screen',
+        type=str,
+        default=None,
+        help='Screen .tflite model; exported from --weights at --screen-size if omitted'
+    )
+    
+    parser.add_argument(
+        '--weights', '-w',
+        type=str,
+        default=None,
+        help='YOLO .pt model to export the screen model from'
+    )
+    
+    parser.add_argument(
+        '--screen-size',
+        type=_parse_size,
+        default=(160, 160),
+        metavar='SIZE',
+        help='Screen model input size, e.g. 160 or 120x160 (default: 160)'
+    )
+    
+    parser.add_argument(
+        '--samples',
+        type=str,
+        required=True,
+        help='Sample set built with "y2m calib build" (labels enable accuracy)'
+    )
+    
+    parser.add_argument(
+        '--bands',
+        type=_parse_band,
+        nargs='+',
+        default=[(0.2, 0.8), (0.1, 0.9), (0.05, 0.95)],
+        metavar='LOW:HIGH',
+        help='Drowsy-score bands that escalate (default: 0.2:0.8 0.1:0.9 0.05:0.95)'
+    )
+    
+    parser.add_argument(
+        '--min-agreement',
+        type=float,
+        default=0.99,
+        help='Minimum agreement with the full model for a band to be chosen (default: 0.99)'
+    )
+    
+    parser.add_argument(
+        '--save',
+        action='store_true',
+        help='Record the chosen band in metadata.json next to the full model'
+    )
+    
+    parser.add_argument(
+        '--verbose', '-v',
+        action='store_true',
+        help='Enable verbose output'
+    )
+    
+    return parser
+
+
+def run_cascade(parsed_args) -> int:
+    """Evaluate cascade escalation bands."""
+    import numpy as np
+    from .cascade import choose_band, evaluate_bands
+    from .calibration import load_calibration_set, sample_to_frame
+    from .runtime.detector import TFLiteDetector
+    from .utils import update_metadata
+    
+    full_path = Path(parsed_args.full)
+    if not full_path.exists():
+        print(f"\n[ERROR] Full model not found: {full_path}")
+        return EXIT_VALIDATION_ERROR
+    if not Path(parsed_args.samples).exists():
+        print(f"\n[ERROR] Sample set not found: {parsed_args.samples}")
+        return EXIT_VALIDATION_ERROR
+    
+    screen_path = parsed_args.screen
+    if screen_path is None:
+        if parsed_args.weights is None:
+            print("\n[ERROR] Either --screen or --weights is required")
+            return EXIT_VALIDATION_ERROR
+        is_valid, error_code = validate_model_path(parsed_args.weights)
+        if not is_valid:
+            print(f"\n[ERROR] Validation failed: {error_code}")
+            return EXIT_VALIDATION_ERROR
+        
+        height, width = parsed_args.screen_size
+        converter = YOLOConverter(parsed_args.weights, str(full_path.parent / 'cascade' / f"{height}x{width}"))
+        if not converter.load_model():
+            print("\n[ERROR] Failed to load model")
+            return EXIT_CONVERSION_ERROR
+        screen_path = converter.export_to_tflite(input_size=(height, width))
+        if screen_path is None:
+            print("\n[ERROR] Screen model export failed")
+            return EXIT_CONVERSION_ERROR
+    screen_path = Path(screen_path)
+    
+    full = TFLiteDetector(str(full_path))
+    screen = TFLiteDetector(str(screen_path), full.class_names)
+    
+    data, labels, _ = load_calibration_set(parsed_args.samples)
+    frames = [sample_to_frame(sample) for sample in data]
+    if labels is not None and not (len(labels) == len(frames) and (labels >= 0).all()):
+        labels = None
+    
+    report = evaluate_bands(
+        screen, full, frames, parsed_args.bands,
+        labels=np.asarray(labels, dtype=np.int64) if labels is not None else None
+    )
+    best = choose_band(report['bands'], parsed_args.min_agreement)
+    
+    full_latency = report['full']['latency_ms']
+    screen_size = [int(v) for v in screen.input_shape[1:3]]
+    print(f"\nScreen: {screen_path.name} {screen_size}   "
+          f"Full: {full_path.name} {[int(v) for v in full.input_shape[1:3]]}   Samples: {report['samples']}")
+    print(f"Full model alone: {full_latency['mean']:.2f} ms mean, {full_latency['p95']:.2f} ms p95"
+          + (f", accuracy {report['full']['accuracy']:.4f}" if 'accuracy' in report['full'] else ''))
+    print(f"\n   {'band':<13} {'escalated':>9} {'mean ms':>8} {'p95 ms':>8} {'agreement':>9} {'accuracy':>8}")
+    for result in report['bands']:
+        low, high = result['band']
+        accuracy = f"{result['accuracy']:.4f}" if 'accuracy' in result else '-'
+        marker = '*' if result is best else ' '
+        print(f" {marker} {low:.2f}-{high:.2f}     {result['escalation_rate']:>9.1%} "
+              f"{result['latency_ms']['mean']:>8.2f} {result['latency_ms']['p95']:>8.2f} "
+              f"{result['agreement']:>9.4f} {accuracy:>8}")
+    
+    if best is None:
+        print(f"\n[ERROR] No band reached {parsed_args.min_agreement:.4f} agreement with the full model")
+        return EXIT_CONVERSION_ERROR
+    
+    speedup = full_latency['mean'] / best['latency_ms']['mean'] if best['latency_ms']['mean'] else 0.0
+    print(f"\nChosen band {best['band'][0]:.2f}-{best['band'][1]:.2f}: {speedup:.2f}x vs full model")
+    
+    if parsed_args.save:
+        model_dir = full_path.parent.resolve()
+        try:
+            screen_file = str(screen_path.resolve().relative_to(model_dir))
+        except ValueError:
+            screen_file = str(screen_path.resolve())
+        update_metadata(model_dir, {'cascade': {
+            'screen_model': screen_file,
+            'full_model': full_path.name,
+            'screen_input_size': screen_size,
+            'band': best['band'],
+            **{k: v for k, v in best.items() if k != 'band'},
+            'full_latency_ms': full_latency,
+        }})
+    print()
+    
+    return EXIT_SUCCESS
+
+
+def create_bench_parser() -> argparse.ArgumentParser:
+    """Create the argument parser for the bench subcommand."""
+    from .bench import DEFAULT_CONFIDENCE, DEFAULT_TOLERANCES
+    
+    parser = argparse.ArgumentParser(
+        prog='y2m bench',
+        description='Benchmark the capture/inference loop headless against a camera or a recording',
+        epilog='Example: python -m y2m.cli bench --model converted_models/best_float32.tflite '
+               '--source clips/drive.mp4 --frames 300 --json bench.json'
+    )
+    
+    parser.add_argument(
+        '--model', '-m',
+        type=str,
+        required=True,
+        help='.tflite model, or a directory whose metadata.json has a deployment section'
+    )
+    
+    parser.add_argument(
+        '--source',
+        type=str,
+        default='0',
+        help='Camera index, video file, image directory or .npy stack (default: 0)'
+    )
+    
+    parser.add_argument(
+        '--pace',
+        choices=['fast', 'realtime'],
+        default='fast',
+        help='Replay as fast as possible or at the recording frame rate (default: fast)'
+    )
+    
+    parser.add_argument(
+        '--fps',
+        type=float,
+        default=None,
+        help='Replay frame rate for --pace realtime (default: from the video, else 30)'
+    )
+    
+    parser.add_argument(
+        '--frames',
+        type=int,
+        default=None,
+        help='Stop after this many frames (default: end of the recording)'
+    )
+    
+    parser.add_argument(
+        '--loop',
+        action='store_true',
+        help='Loop the recording (requires --frames)'
+    )
+    
+    parser.add_argument(
+        '--warmup',
+        type=int,
+        default=5,
+        help='Unmeasured frames at the start (default: 5)'
+    )
+    
+    parser.add_argument(
+        '--threads',
+        type=int,
+        default=None,
+        help='Interpreter thread count (default: runtime default)'
+    )
+    
+    parser.add_argument(
+        '--delegate',
+        type=str,
+        default='xnnpack',
+        help='xnnpack, none, or a delegate library path (default: xnnpack)'
+    )
+    
+    parser.add_argument(
+        '--json',
+        type=str,
+        default=None,
+        metavar='PATH',
+        help='Write the report as JSON (usable as a --compare baseline)'
+    )
+    
+    parser.add_argument(
+        '--repetitions',
+        type=int,
+        default=None,
+        help='Benchmark runs, each reloading the model (default: 1, or 5 with --compare)'
+    )
+    
+    parser.add_argument(
+        '--compare',
+        type=str,
+        default=None,
+        metavar='BASELINE',
+        help='Compare against a saved report and exit with code 4 on a regression'
+    )
+    
+    parser.add_argument(
+        '--latency-tolerance',
+        type=float,
+        default=DEFAULT_TOLERANCES['latency'],
+        help=f"Allowed relative p50/p95 slowdown (default: {DEFAULT_TOLERANCES['latency']})"
+    )
+    
+    parser.add_argument(
+        '--load-tolerance',
+        type=float,
+        default=DEFAULT_TOLERANCES['load'],
+        help=f"Allowed relative load time increase (default: {DEFAULT_TOLERANCES['load']})"
+    )
+    
+    parser.add_argument(
+        '--size-tolerance',
+        type=float,
+        default=DEFAULT_TOLERANCES['size'],
+        help=f"Allowed relative model size increase (default: {DEFAULT_TOLERANCES['size']})"
+    )
+    
+    parser.add_argument(
+        '--confidence',
+        type=float,
+        default=DEFAULT_CONFIDENCE,
+        help=f"Bootstrap confidence interval coverage (default: {DEFAULT_CONFIDENCE})"
+    )
+    
+    parser.add_argument(
+        '--verbose', '-v',
+        action='store_true',
+        help='Enable verbose output'
+    )
+    
+    return parser
+
+
+def run_bench(parsed_args) -> int:
+    """Run the loop benchmark, optionally gated against a baseline report."""
+    import json
+    from .bench import compare_reports, comparison_notes, format_comparison, run_repeated, STATUS_REGRESSED
+    from .runtime.detector import TFLiteDetector
+    from .runtime.sources import open_source
+    
+    if parsed_args.loop and parsed_args.frames is None:
+        print("\n[ERROR] --loop requires --frames")
+        return EXIT_VALIDATION_ERROR
+    
+    model = Path(parsed_args.model)
+    if not model.exists():
+        print(f"\n[ERROR] Model not found: {model}")
+        return EXIT_VALIDATION_ERROR
+    
+    baseline = None
+    if parsed_args.compare:
+        try:
+            with open(parsed_args.compare) as f:
+                baseline = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"\n[ERROR] Could not read baseline {parsed_args.compare}: {e}")
+            return EXIT_VALIDATION_ERROR
+    
+    repetitions = parsed_args.repetitions or (5 if baseline else 1)
+    loaded = []
+    
+    def load_detector():
+        if model.is_dir():
+            detector = TFLiteDetector.from_metadata(str(model))
+        else:
+            detector = TFLiteDetector(str(model), num_threads=parsed_args.threads, delegate=parsed_args.delegate)
+        loaded[:] = [detector]
+        return detector
+    
+    def make_source():
+        detector = loaded[0]
+        return open_source(
+            parsed_args.source,
+            target_size=(int(detector.input_height), int(detector.input_width)),
+            pace=parsed_args.pace,
+            fps=parsed_args.fps,
+            loop=parsed_args.loop,
+            max_frames=parsed_args.frames
+        )
+    
+    try:
+        report = run_repeated(
+            load_detector, make_source,
+            repetitions=repetitions,
+            warmup_frames=parsed_args.warmup,
+            confidence=parsed_args.confidence
+        )
+    except (OSError, ValueError) as e:
+        print(f"\n[ERROR] {e}")
+        return EXIT_VALIDATION_ERROR
+    
+    detector = loaded[0]
+    report['model'] = {
+        'path': detector.model_path,
+        'size_bytes': Path(detector.model_path).stat().st_size,
+        'input_shape': [int(v) for v in detector.input_shape],
+        'num_threads': detector.num_threads,
+        'delegate': detector.delegate,
+    }
+    
+    latency = report['latency_ms']
+    print(f"\nFrames:     {report['frames']} measured ({report['dropped']} dropped) "
+          f"in {report['duration_s']:.2f}s over {repetitions} run(s)")
+    print(f"Throughput: {report['fps']:.1f} FPS")
+    print(f"Latency:    p50 {latency['p50']:.2f} ms, p95 {latency['p95']:.2f} ms (capture to result)")
+    if repetitions > 1:
+        print(f"            {report['confidence']:.0%} CI p50 [{latency['ci']['p50'][0]:.2f}, {latency['ci']['p50'][1]:.2f}], "
+              f"p95 [{latency['ci']['p95'][0]:.2f}, {latency['ci']['p95'][1]:.2f}]")
+    print(f"Inference:  p50 {report['inference_ms']['p50']:.2f} ms, p95 {report['inference_ms']['p95']:.2f} ms")
+    print(f"Load:       p50 {report['load_ms']['p50']:.2f} ms, model {report['model']['size_bytes'] / (1024 * 1024):.2f} MB")
+    
+    exit_code = EXIT_SUCCESS
+    if baseline is not None:
+        rows = compare_reports(baseline, report, {
+            'latency': parsed_args.latency_tolerance,
+            'load': parsed_args.load_tolerance,
+            'size': parsed_args.size_tolerance,
+        })
+        report['comparison'] = {'baseline': parsed_args.compare, 'metrics': rows}
+        
+        print(f"\nComparison with {parsed_args.compare}:\n")
+        print(format_comparison(rows))
+        notes = comparison_notes(baseline, report)
+        if notes:
+            print("\nSetup differences:")
+            for note in notes:
+                print(f"  {note}")
+        
+        regressed = [row['metric'] for row in rows if row['status'] == STATUS_REGRESSED]
+        if regressed:
+            print(f"\n[ERROR] Regression: {', '.join(regressed)}")
+            exit_code = EXIT_REGRESSION
+        else:
+            print("\n[OK] No regression beyond tolerance")
+    
+    if parsed_args.json:
+        with open(parsed_args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report:     {parsed_args.json}")
+    print()
+    
+    return exit_code
+
+
+def create_serve_parser() -> argparse.ArgumentParser:
+    """Create the argument parser for the serve subcommand."""
+    from .server import DEFAULT_HOST, DEFAULT_PORT
+    
+    parser = argparse.ArgumentParser(
+        prog='y2m serve',
+        description='Serve a TFLite model over HTTP (POST /v1/infer with a JPEG or raw frame body)',
+        epilog='Example: python -m y2m.cli serve --model converted_models/best_float32.tflite --workers 2'
+    )
+    
+    parser.add_argument(
+        '--model', '-m',
+        type=str,
+        required=True,
+        help='Path to the .tflite model'
+    )
+    
+    parser.add_argument(
+        '--host',
+        type=str,
+        default=DEFAULT_HOST,
+        help=f'Bind address (default: {DEFAULT_HOST})'
+    )
+    
+    parser.add_argument(
+        '--port', '-p',
+        type=int,
+        default=DEFAULT_PORT,
+        help=f'Bind port (default: {DEFAULT_PORT})'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=2,
+        help='Concurrent inferences, one interpreter each (default: 2)'
+    )
+    
+    parser.add_argument(
+        '--max-queue',
+        type=int,
+        default=4,
+        help='Requests allowed to wait for a worker before 503 (default: 4)'
+    )
+    
+    parser.add_argument(
+        '--threads',
+        type=int,
+        default=1,
+        help='Interpreter thread count per worker (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--delegate',
+        type=str,
+        default='xnnpack',
+        help='xnnpack, none, or a delegate library path (default: xnnpack)'
+    )
+    
+    parser.add_argument(
+        '--verbose', '-v',
+        action='store_true',
+        help='Enable verbose output'
+    )
+    
+    return parser
+
+
+def run_serve(parsed_args) -> int:
+    """Run the HTTP inference service."""
+    import asyncio
+    from .server import InferenceServer
+    
+    if not Path(parsed_args.model).exists():
+        print(f"\n[ERROR] Model not found: {parsed_args.model}")
+        return EXIT_VALIDATION_ERROR
+    
+    server = InferenceServer(
+        parsed_args.model,
+        host=parsed_args.host,
+        port=parsed_args.port,
+        workers=parsed_args.workers,
+        max_queue=parsed_args.max_queue,
+        num_threads=parsed_args.threads,
+        delegate=parsed_args.delegate
+    )
+    
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        logger.info("Server stopped")
+    except OSError as e:
+        print(f"\n[ERROR] {e}")
+        return EXIT_VALIDATION_ERROR
+    
+    return EXIT_SUCCESS
+
+
+def create_loadgen_parser() -> argparse.ArgumentParser:
+    """Create the argument parser for the loadgen subcommand."""
+    parser = argparse.ArgumentParser(
+        prog='y2m loadgen',
+        description='Measure throughput and tail latency of "y2m serve" at rising concurrency',
+        epilog='Example: python -m y2m.cli loadgen --url http://127.0.0.1:8080 '
+               '--source clips/drive.mp4 --concurrency 1 2 4 8 16 --duration 10'
+    )
+    
+    parser.add_argument(
+        '--url',
+        type=str,
+        default='http://127.0.0.1:8080',
+        help='Service base URL (default: http://127.0.0.1:8080)'
+    )
+    
+    parser.add_argument(
+        '--source',
+        type=str,
+        default=None,
+        help='Video, image directory or .npy stack to send (default: random frames)'
+    )
+    
+    parser.add_argument(
+        '--frames',
+        type=int,
+        default=16,
+        help='Distinct frames to send round-robin (default: 16)'
     )
     
     parser.add_argument(
-        '--cleanup',
+        '--size',
+        type=_parse_size,
+        default=(480, 640),
+        metavar='SIZE',
+        help='Size of random frames, HEIGHTxWIDTH (default: 480x640)'
+    )
+    
+    parser.add_argument(
+        '--raw',
         action='store_true',
-        help='Remove intermediate files (.onnx) after conversion'
+        help='Send raw BGR bodies instead of JPEG'
+    )
+    
+    parser.add_argument(
+        '--concurrency', '-c',
+        type=int,
+        nargs='+',
+        default=[1, 2, 4, 8, 16],
+        help='Concurrency levels (default: 1 2 4 8 16)'
+    )
+    
+    parser.add_argument(
+        '--duration', '-d',
+        type=float,
+        default=10.0,
+        help='Seconds per level (default: 10)'
+    )
+    
+    parser.add_argument(
+        '--json',
+        type=str,
+        default=None,
+        metavar='PATH',
+        help='Write the reports as JSON'
+    )
+    
+    parser.add_argument(
+        '--verbose', '-v',
+        action='store_true',
+        help='Enable verbose output'
+    )
+    
+    return parser
+
+
+def run_loadgen_command(parsed_args) -> int:
+    """Run the load generator."""
+    import json
+    import asyncio
+    import numpy as np
+    from .loadgen import run_loadgen
+    from .runtime.sources import ReplaySource
+    
+    if parsed_args.source:
+        source = ReplaySource(parsed_args.source, max_frames=parsed_args.frames)
+        if not source.open():
+            print(f"\n[ERROR] Could not open source: {parsed_args.source}")
+            return EXIT_VALIDATION_ERROR
+        frames = [frame for frame, _ in source]
+        source.release()
+    else:
+        height, width = parsed_args.size
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(parsed_args.frames)]
+    
+    try:
+        reports = asyncio.run(run_loadgen(
+            parsed_args.url, frames, parsed_args.concurrency, parsed_args.duration, raw=parsed_args.raw
+        ))
+    except OSError as e:
+        print(f"\n[ERROR] Could not reach {parsed_args.url}: {e}")
+        return EXIT_VALIDATION_ERROR
+    
+    print(f"\n   {'conc':>4} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'503':>7} {'errors':>6}")
+    for report in reports:
+        latency = report.get('latency_ms', {})
+        print(f"   {report['concurrency']:>4} {report['throughput_rps']:>8.1f} "
+              f"{latency.get('p50', float('nan')):>8.1f} {latency.get('p95', float('nan')):>8.1f} "
+              f"{latency.get('p99', float('nan')):>8.1f} {report['rejected_rate']:>7.1%} {report['errors']:>6}")
+    
+    if parsed_args.json:
+        with open(parsed_args.json, 'w') as f:
+            json.dump(reports, f, indent=2)
+        print(f"\nReport: {parsed_args.json}")
+    print()
+    
+    return EXIT_SUCCESS
+
+
+def create_quant_debug_parser() -> argparse.ArgumentParser:
+    """Create the argument parser for the quant-debug subcommand."""
+    parser = argparse.ArgumentParser(
+        prog='y2m quant-debug',
+        description='Find quantization-sensitive layers and build the fastest mixed int8/float model '
+                    'within an accuracy budget',
+        epilog='Example: python -m y2m.cli quant-debug --model best_saved_model/best_float32.tflite '
+               '--samples calibration.npy --max-drop 0.01'
+    )
+    
+    parser.add_argument(
+        '--model', '-m',
+        type=str,
+        required=True,
+        help='Float32 .tflite (its SavedModel is found in or next to its directory)'
+    )
+    
+    parser.add_argument(
+        '--samples',
+        type=str,
+        required=True,
+        help='Calibration set built with "y2m calib build" (labels enable accuracy)'
+    )
+    
+    parser.add_argument(
+        '--saved-model',
+        type=str,
+        default=None,
+        help='SavedModel directory to quantize (default: found next to --model)'
+    )
+    
+    parser.add_argument(
+        '--output', '-o',
+        type=str,
+        default='./converted_models',
+        help='Output directory (default: ./converted_models)'
+    )
+    
+    parser.add_argument(
+        '--max-drop',
+        type=float,
+        default=0.01,
+        help='Allowed accuracy drop vs the float model (default: 0.01)'
+    )
+    
+    parser.add_argument(
+        '--steps',
+        type=int,
+        nargs='+',
+        default=[0, 1, 2, 4, 8, 16],
+        help='Numbers of worst layers to keep in float (default: 0 1 2 4 8 16)'
+    )
+    
+    parser.add_argument(
+        '--debug-samples',
+        type=int,
+        default=32,
+        help='Samples for the per-layer error analysis (default: 32)'
+    )
+    
+    parser.add_argument(
+        '--calibration-samples',
+        type=int,
+        default=100,
+        help='Samples used to calibrate each candidate (default: 100)'
+    )
+    
+    parser.add_argument(
+        '--runs',
+        type=int,
+        default=30,
+        help='Timed inferences per candidate (default: 30)'
+    )
+    
+    parser.add_argument(
+        '--verbose', '-v',
+        action='store_true',
+        help='Enable verbose output'
+    )
+    
+    return parser
+
+
+def run_quant_debug(parsed_args) -> int:
+    """Run the per-layer quantization analysis and mixed-precision search."""
+    import json
+    from .optimizer import ModelOptimizer
+    from .utils import update_metadata
+    
+    for path, what in ((parsed_args.model, 'Model'), (parsed_args.samples, 'Sample set')):
+        if not Path(path).exists():
+            print(f"\n[ERROR] {what} not found: {path}")
+            return EXIT_VALIDATION_ERROR
+    
+    output_dir = create_output_directory(parsed_args.output)
+    optimizer = ModelOptimizer(parsed_args.model, str(output_dir), calibration_data=parsed_args.samples)
+    report = optimizer.quantize_mixed_precision(
+        max_accuracy_drop=parsed_args.max_drop,
+        denylist_steps=parsed_args.steps,
+        num_debug_samples=parsed_args.debug_samples,
+        num_calibration_samples=parsed_args.calibration_samples,
+        latency_runs=parsed_args.runs,
+        saved_model_dir=parsed_args.saved_model
+    )
+    if report is None:
+        print("\n[ERROR] Quantization analysis failed")
+        return EXIT_QUANTIZATION_ERROR
+    
+    report_path = output_dir / 'quant_debug.json'
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    
+    print(f"\nMost sensitive layers (rmse/scale, ~0.29 is rounding noise):")
+    for layer in report['layers'][:5]:
+        print(f"   {layer['rmse_per_scale']:>7.3f}  {layer['op_name']:<18} {layer['tensor_name']}")
+    
+    print(f"\n   {'candidate':<14} {'size MB':>8} {'p50 ms':>8} {'p95 ms':>8} {'accuracy':>9} {'drop':>8}")
+    for candidate in report['candidates']:
+        marker = '*' if report['best'] and candidate['name'] == report['best']['name'] else ' '
+        print(f" {marker} {candidate['name']:<14} {candidate['size_mb']:>8.2f} "
+              f"{candidate['latency_ms']['p50']:>8.2f} {candidate['latency_ms']['p95']:>8.2f} "
+              f"{candidate['accuracy']:>9.4f} {candidate['accuracy_drop']:>+8.4f}")
+    print(f"\nReport: {report_path}")
+    
+    best = report['best']
+    if best is None:
+        print(f"\n[ERROR] No int8 candidate stayed within {parsed_args.max_drop} of the float model")
+        return EXIT_QUANTIZATION_ERROR
+    
+    update_metadata(output_dir, {'mixed_precision': {
+        'model_file': Path(best['model']).name,
+        'float_layers': best['denylisted'],
+        'accuracy': best['accuracy'],
+        'accuracy_drop': best['accuracy_drop'],
+        'latency_ms': best['latency_ms'],
+        'max_accuracy_drop': parsed_args.max_drop,
+    }})
+    print(f"Model:  {best['model']} ({len(best['denylisted'])} layer(s) kept in float)\n")
+    
+    return EXIT_SUCCESS
+
+
+def create_inspect_parser() -> argparse.ArgumentParser:
+    """Create the argument parser for the inspect subcommand."""
+    parser = argparse.ArgumentParser(
+        prog='y2m inspect',
+        description='Static analysis of .tflite artifacts (no TensorFlow or interpreter needed)',
+        epilog='Example: python -m y2m.cli inspect converted_models/best_float32.tflite\n'
+               '         python -m y2m.cli inspect converted_models/ --json > inventory.json',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    
+    parser.add_argument(
+        'models',
+        type=str,
+        nargs='+',
+        metavar='MODEL',
+        help='.tflite files or directories (searched recursively)'
+    )
+    
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Print the full reports as JSON'
+    )
+    
+    parser.add_argument(
+        '--gmacs',
+        type=float,
+        default=None,
+        metavar='GMAC/S',
+        help='Device throughput for the latency estimate (default: 25, a rough single-core figure)'
+    )
+    
+    parser.add_argument(
+        '--top',
+        type=int,
+        default=10,
+        help='Largest weight tensors to list per model (default: 10)'
+    )
+    
+    parser.add_argument(
+        '--verbose', '-v',
+        action='store_true',
+        help='Enable verbose output'
+    )
+    
+    return parser
+
+
+def run_inspect(parsed_args) -> int:
+    """Print shapes, quantization, op histogram, weight bytes and MACs of .tflite files."""
+    import json
+    from .tflite_inspect import DEFAULT_GMACS_PER_S, find_models, format_report, format_table, inspect_model
+    
+    models = find_models(parsed_args.models)
+    if not models:
+        print("\n[ERROR] No .tflite models found")
+        return EXIT_VALIDATION_ERROR
+    
+    gmacs = parsed_args.gmacs or DEFAULT_GMACS_PER_S
+    reports = []
+    for path in models:
+        try:
+            report = inspect_model(path, gmacs_per_s=gmacs, top=parsed_args.top)
+        except (OSError, ValueError, IndexError) as e:
+            report = {'model': path.name, 'error': str(e)}
+        report['path'] = str(path)
+        reports.append(report)
+    
+    if parsed_args.json:
+        print(json.dumps(reports if len(reports) > 1 else reports[0], indent=2))
+    elif len(reports) == 1 and 'error' not in reports[0]:
+        print(format_report(reports[0]))
+    else:
+        print(format_table(reports))
+    
+    failed = [r for r in reports if 'error' in r]
+    for report in failed:
+        logger.error(f"{report['path']}: {report['error']}")
+    return EXIT_VALIDATION_ERROR if failed else EXIT_SUCCESS
+
+
+def create_distill_parser() -> argparse.ArgumentParser:
+    """Create the argument parser for the distill subcommand."""
+    parser = argparse.ArgumentParser(
+        prog='y2m distill',
+        description='Distill the .pt model into a small low-resolution student on unlabeled frames',
+        epilog='Example: python -m y2m.cli distill --weights best.pt calibration.npy --input-size 128 '
+               '--reference converted_models/best_float32.tflite'
+    )
+    
+    parser.add_argument(
+        'sources',
+        type=str,
+        nargs='+',
+        metavar='SOURCE',
+        help='Calibration .npy, or image directories and video files (labels are not needed)'
+    )
+    
+    parser.add_argument(
+        '--weights', '-w',
+        type=str,
+        required=True,
+        help='Teacher YOLO .pt classification model'
+    )
+    
+    parser.add_argument(
+        '--output', '-o',
+        type=str,
+        default='./converted_models/distill',
+        help='Output directory for the student (default: ./converted_models/distill)'
+    )
+    
+    parser.add_argument(
+        '--input-size',
+        type=_parse_size,
+        default=(128, 128),
+        metavar='SIZE',
+        help='Student input size, e.g. 128 or 96x128 (default: 128)'
+    )
+    
+    parser.add_argument(
+        '--width',
+        type=float,
+        default=0.125,
+        help='Student width multiple (YOLOv8n-cls: 0.25; default: 0.125)'
+    )
+    
+    parser.add_argument(
+        '--depth',
+        type=float,
+        default=0.33,
+        help='Student depth multiple (YOLOv8n-cls: 0.33; default: 0.33)'
+    )
+    
+    parser.add_argument(
+        '--epochs',
+        type=int,
+        default=30,
+        help='Training epochs (default: 30)'
+    )
+    
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=64,
+        help='Batch size (default: 64)'
+    )
+    
+    parser.add_argument(
+        '--lr',
+        type=float,
+        default=1e-3,
+        help='Learning rate (default: 0.001)'
+    )
+    
+    parser.add_argument(
+        '--temperature',
+        type=float,
+        default=4.0,
+        help='Distillation temperature (default: 4)'
+    )
+    
+    parser.add_argument(
+        '--max-frames',
+        type=int,
+        default=None,
+        help='Limit on frames loaded from the sources'
+    )
+    
+    parser.add_argument(
+        '--frame-stride',
+        type=int,
+        default=1,
+        help='Keep every Nth video frame (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--no-flip',
+        action='store_true',
+        help='Disable horizontal flip augmentation'
+    )
+    
+    parser.add_argument(
+        '--reference',
+        type=str,
+        default=None,
+        help='.tflite to time against the student (e.g. the exported teacher)'
+    )
+    
+    parser.add_argument(
+        '--runs',
+        type=int,
+        default=50,
+        help='Timed single-thread inferences per model (default: 50)'
+    )
+    
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=0,
+        help='Random seed (default: 0)'
     )
     
     parser.add_argument(
@@ -88,6 +1600,87 @@ def create_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def run_distill(parsed_args) -> int:
+    """Train, export and evaluate a distilled student model."""
+    from .distill import distill
+    
+    is_valid, error_code = validate_model_path(parsed_args.weights)
+    if not is_valid:
+        print(f"\n[ERROR] Validation failed: {error_code}")
+        return EXIT_VALIDATION_ERROR
+    
+    for source in parsed_args.sources:
+        if not Path(source).exists():
+            print(f"\n[ERROR] Source not found: {source}")
+            return EXIT_VALIDATION_ERROR
+    if parsed_args.reference and not Path(parsed_args.reference).exists():
+        print(f"\n[ERROR] Reference model not found: {parsed_args.reference}")
+        return EXIT_VALIDATION_ERROR
+    if parsed_args.epochs < 1 or parsed_args.batch_size < 1 or parsed_args.temperature <= 0:
+        print("\n[ERROR] --epochs and --batch-size must be at least 1 and --temperature positive")
+        return EXIT_VALIDATION_ERROR
+    
+    report = distill(
+        parsed_args.weights,
+        parsed_args.sources,
+        parsed_args.output,
+        input_size=parsed_args.input_size,
+        depth=parsed_args.depth,
+        width=parsed_args.width,
+        epochs=parsed_args.epochs,
+        batch_size=parsed_args.batch_size,
+        learning_rate=parsed_args.lr,
+        temperature=parsed_args.temperature,
+        max_frames=parsed_args.max_frames,
+        frame_stride=parsed_args.frame_stride,
+        flip=not parsed_args.no_flip,
+        reference=parsed_args.reference,
+        latency_runs=parsed_args.runs,
+        seed=parsed_args.seed
+    )
+    if report is None:
+        print("\n[ERROR] Distillation failed")
+        return EXIT_CONVERSION_ERROR
+    
+    latency = report['latency_ms']
+    print("\n" + "="*50)
+    print("   [SUCCESS] Distillation Complete!")
+    print("="*50)
+    print(f"\nStudent:    {report['student']} {report['input_size']}, "
+          f"{report['parameters']:,} parameters, {report['size_mb']:.2f} MB")
+    print(f"Training:   {len(report['training']['epochs'])} epochs on {report['frames']} frames "
+          f"in {report['training']['seconds']:.0f}s (best epoch {report['training']['best_epoch']})")
+    print(f"Agreement:  {report['agreement']:.4f} with {report['teacher']} "
+          f"(holdout {report['holdout_agreement']:.4f} on {report['holdout_frames']} frames)")
+    if 'accuracy' in report:
+        print(f"Accuracy:   {report['accuracy']:.4f} (teacher {report['teacher_accuracy']:.4f})")
+    print(f"Latency:    {latency['p50']:.2f} ms p50, {latency['p95']:.2f} ms p95 on one thread "
+          f"(~{report['streams_per_core']} streams/core)")
+    if 'reference' in report:
+        reference = report['reference']
+        print(f"Reference:  {reference['model']} {reference['latency_ms']['p50']:.2f} ms p50 "
+              f"({report['speedup']:.2f}x slower, agreement {reference['agreement']:.4f})")
+    print(f"Output:     {Path(parsed_args.output) / report['student']}")
+    print()
+    
+    return EXIT_SUCCESS
+
+
+# Subcommands: name -> (parser factory, handler)
+SUBCOMMANDS = {
+    'daemon': (create_daemon_parser, run_daemon),
+    'calib': (create_calib_parser, run_calib),
+    'tune': (create_tune_parser, run_tune),
+    'cascade': (create_cascade_parser, run_cascade),
+    'bench': (create_bench_parser, run_bench),
+    'serve': (create_serve_parser, run_serve),
+    'loadgen': (create_loadgen_parser, run_loadgen_command),
+    'quant-debug': (create_quant_debug_parser, run_quant_debug),
+    'inspect': (create_inspect_parser, run_inspect),
+    'distill': (create_distill_parser, run_distill),
+}
+
+
 def main(args=None) -> int:
     """
     Main entry point for the Y2M CLI.
@@ -98,8 +1691,18 @@ def main(args=None) -> int:
     Returns:
         Exit code (0 for success, non-zero for errors)
     """
+    argv = sys.argv[1:] if args is None else list(args)
+    
+    # Dispatch subcommands; bare options run the conversion pipeline
+    if argv and argv[0] in SUBCOMMANDS:
+        create_subparser, handler = SUBCOMMANDS[argv[0]]
+        sub_args = create_subparser().parse_args(argv[1:])
+        if getattr(sub_args, 'verbose', False):
+            logging.getLogger().setLevel(logging.DEBUG)
+        return handler(sub_args)
+    
     parser = create_parser()
-    parsed_args = parser.parse_args(args)
+    parsed_args = parser.parse_args(argv)
     
     # Set logging level
     if parsed_args.verbose:
@@ -110,39 +1713,149 @@ def main(args=None) -> int:
     print("   Y2M - YOLO to Mobile Conversion Pipeline")
     print("="*50 + "\n")
     
+    profiler = StageProfiler(python_profile=parsed_args.profile_python)
+    try:
+        return run_conversion(parsed_args, profiler)
+    finally:
+        if parsed_args.profile or parsed_args.profile_python:
+            profile_path = profiler.write(parsed_args.output)
+            print("Profile:")
+            print(profiler.summary())
+            print(f"   -> {profile_path}\n")
+
+
+def _pruning_report(dense_path: Path, sparse_path: Path, pipeline: ExportPipeline, samples: str = None) -> dict:
+    """Metadata 'pruning' section: sparsity stats plus the dense vs. sparse comparison."""
+    import numpy as np
+    from .pruning import compare_models
+    
+    report = {'model_file': sparse_path.name, **pipeline.outputs['prune'].get('pruning', {})}
+    labels = None
+    if samples:
+        from .calibration import load_calibration_set, sample_to_frame
+        data, labels, _ = load_calibration_set(samples)
+        frames = [sample_to_frame(sample) for sample in data]
+        if labels is not None and not (len(labels) == len(frames) and (labels >= 0).all()):
+            labels = None
+    else:
+        # Latency only: synthetic frames at the model input size
+        height, width = pipeline.input_size
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(8)]
+    
+    try:
+        report['comparison'] = compare_models(dense_path, sparse_path, frames, labels)
+    except (ImportError, ValueError, RuntimeError) as e:
+        logger.warning(f"Dense vs. sparse comparison failed: {e}")
+        return report
+    
+    comparison = report['comparison']
+    print(f"\n   Pruning ({report.get('pattern')}, {report.get('pruned_sparsity', 0):.0%} of prunable weights zero):")
+    for key in ('dense', 'sparse'):
+        entry = comparison[key]
+        accuracy = f", accuracy {entry['accuracy']:.1%}" if 'accuracy' in entry else ''
+        print(f"   {key:<7} {entry['size_mb']:>7.2f} MB  p50 {entry['latency_ms']['p50']:>7.2f} ms{accuracy}")
+    print(f"   speedup {comparison['speedup']:.2f}x, top-1 agreement {comparison['agreement']:.1%}")
+    return report
+
+
+def run_conversion(parsed_args, profiler: StageProfiler) -> int:
+    """Run the conversion pipeline, timing each step with profiler."""
     # Step 1: Validate input
     logger.info("Step 1/4: Validating input...")
-    is_valid, error_code = validate_model_path(parsed_args.weights)
+    with profiler.stage('validation') as record:
+        is_valid, error_code = validate_model_path(parsed_args.weights)
+        record['artifacts'] = [parsed_args.weights]
     
     if not is_valid:
         print(f"\n[ERROR] Validation failed: {error_code}")
         return EXIT_VALIDATION_ERROR
     
+    if parsed_args.calibration:
+        if not Path(parsed_args.calibration).exists():
+            print(f"\n[ERROR] Calibration set not found: {parsed_args.calibration}")
+            return EXIT_VALIDATION_ERROR
+        if not parsed_args.quantize:
+            logger.warning("--calibration only applies with --quantize")
+    
+    if parsed_args.prune is not None and not 0.0 < parsed_args.prune < 1.0:
+        print(f"\n[ERROR] --prune must be between 0 and 1, got {parsed_args.prune}")
+        return EXIT_VALIDATION_ERROR
+    
     # Step 2: Setup output directory
     logger.info("Step 2/4: Setting up output directory...")
-    output_dir = create_output_directory(parsed_args.output)
+    with profiler.stage('setup'):
+        output_dir = create_output_directory(parsed_args.output)
     
     # Step 3: Convert to TFLite
     logger.info("Step 3/4: Converting model...")
     input_size = tuple(parsed_args.input_size)
     
-    converter = YOLOConverter(parsed_args.weights, parsed_args.output)
+    has_limits = parsed_args.max_rss or parsed_args.max_address_space or parsed_args.stage_timeout
+    if has_limits and not parsed_args.isolate:
+        logger.warning("Memory and time limits only apply with --isolate")
     
-    if not converter.load_model():
-        print("\n[ERROR] Failed to load model")
-        return EXIT_CONVERSION_ERROR
+    pipeline = ExportPipeline(
+        parsed_args.weights,
+        parsed_args.output,
+        input_size=input_size,
+        isolate=parsed_args.isolate,
+        address_space_mb=parsed_args.max_address_space,
+        rss_limit_mb=parsed_args.max_rss,
+        stage_timeout=parsed_args.stage_timeout,
+        dynamic=parsed_args.dynamic,
+        onnx=parsed_args.onnx
+    )
     
-    tflite_path = converter.export_to_tflite(input_size=input_size)
+    with profiler.stage('export') as record:
+        tflite_path, saved_model_dir = pipeline.run()
+        profiler.add_stage_records(record, pipeline.stages)
+        record['artifacts'] = [tflite_path, saved_model_dir]
     
     if tflite_path is None:
         print("\n[ERROR] TFLite conversion failed")
         return EXIT_CONVERSION_ERROR
     
+    uint8_path = None
+    if parsed_args.uint8_input:
+        with profiler.stage('uint8_input') as record:
+            uint8_path = pipeline.run_uint8(saved_model_dir)
+            profiler.add_stage_records(record, pipeline.stages[-1:])
+            record['artifacts'] = [uint8_path]
+        if uint8_path is None:
+            logger.warning("uint8 input export failed, continuing with float32 input only")
+    
+    sparse_path = None
+    pruning = None
+    if parsed_args.prune is not None:
+        # Separate export from best.pt: the dense model above is the baseline
+        with profiler.stage('pruning') as record:
+            sparse_path = pipeline.run_prune(
+                parsed_args.prune,
+                finetune_data=parsed_args.finetune,
+                finetune_epochs=parsed_args.finetune_epochs
+            )
+            profiler.add_stage_records(record, pipeline.stages[-1:])
+            record['artifacts'] = [sparse_path]
+        if sparse_path is None:
+            logger.warning("Pruned export failed, continuing with the dense model only")
+        else:
+            pruning = _pruning_report(tflite_path, sparse_path, pipeline, parsed_args.prune_samples)
+    
     # Step 4: Quantization (optional)
     int8_path = None
     if parsed_args.quantize:
         logger.info("Step 4/4: Applying Int8 quantization...")
-        int8_path = quantize_with_ultralytics(parsed_args.weights, parsed_args.output)
+        with profiler.stage('quantization') as record:
+            int8_path = pipeline.run_int8(
+                integer_io=parsed_args.int8_io,
+                calibration=parsed_args.calibration,
+                num_calibration_samples=parsed_args.calibration_samples,
+                tflite_path=tflite_path,
+                saved_model_dir=saved_model_dir
+            )
+            profiler.add_stage_records(record, pipeline.stages[-1:])
+            record['artifacts'] = [int8_path]
         
         if int8_path is None:
             logger.warning("Int8 quantization failed, continuing with float32 only")
@@ -150,20 +1863,35 @@ def main(args=None) -> int:
         logger.info("Step 4/4: Skipping quantization (use --quantize to enable)")
     
     # Generate metadata
-    create_metadata(
-        model_name=Path(parsed_args.weights).name,
-        output_dir=output_dir,
-        class_names=converter.get_class_names(),
-        input_size=input_size,
-        quantized=int8_path is not None
-    )
+    with profiler.stage('metadata') as record:
+        extra_info = {'export_stages': pipeline.report()}
+        if parsed_args.dynamic:
+            extra_info['dynamic_shapes'] = True
+        if pruning:
+            extra_info['pruning'] = pruning
+        record['artifacts'] = [create_metadata(
+            model_name=Path(parsed_args.weights).name,
+            output_dir=output_dir,
+            class_names=pipeline.model_info.get('class_names'),
+            input_size=input_size,
+            quantized=int8_path is not None,
+            extra_info=extra_info,
+            uint8_input=uint8_path is not None
+        )]
+    
+    for stage in pipeline.stages:
+        peak = f"{stage['peak_rss_mb']:.0f} MB" if stage['peak_rss_mb'] else "n/a"
+        print(f"   {stage['stage']:<12} {stage['status']:<13} {stage['wall_time_s']:>8.1f}s  peak RSS {peak}")
     
     # Cleanup intermediate files
     if parsed_args.cleanup:
         logger.info("Cleaning up intermediate files...")
-        # Clean from both source and output directories
-        cleanup_intermediate_files(Path(parsed_args.weights).parent)
-        cleanup_intermediate_files(output_dir)
+        with profiler.stage('cleanup') as record:
+            # Clean from both source and output directories
+            record['deleted_files'] = (
+                cleanup_intermediate_files(Path(parsed_args.weights).parent)
+                + cleanup_intermediate_files(output_dir)
+            )
     
     # Print summary
     print("\n" + "="*50)
@@ -173,6 +1901,10 @@ def main(args=None) -> int:
     print(f"   +-- {tflite_path.name}")
     if int8_path:
         print(f"   +-- {int8_path.name}")
+    if uint8_path:
+        print(f"   +-- {uint8_path.name}")
+    if sparse_path:
+        print(f"   +-- {sparse_path.name}")
     print(f"   +-- metadata.json")
     print()
     
@@ -0,0 +1,124 @@
+"""
+Y2M Client Module
+
+Thin client for the inference daemon. Imports only the standard library
+and NumPy so short-lived tools skip TensorFlow startup entirely.
+
+Example:
+    with DaemonClient() as client:
+        detections = client.detect(frame)
+"""
+
+import time
+import socket
+from typing import Optional
+
+import numpy as np
+
+from .runtime.decoding import CONFIDENCE_THRESHOLD, DEFAULT_CLASS_NAMES, decode_output
+from .protocol import (
+    DEFAULT_SOCKET_PATH,
+    OP_PING,
+    OP_INFER,
+    OP_MODELS,
+    STATUS_OK,
+    ProtocolError,
+    send_frame,
+    recv_frame,
+)
+
+
+class DaemonError(Exception):
+    """Raised when the daemon reports a failed request."""
+
+
+class DaemonClient:
+    """Keep-alive connection to a running inference daemon."""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, timeout: Optional[float] = 10.0):
+        """
+        Initialize the client. The connection is opened on first use.
+
+        Args:
+            socket_path: Path of the daemon's Unix socket
+            timeout: Socket timeout in seconds (None blocks forever)
+        """
+        self.socket_path = str(socket_path)
+        self.timeout = timeout
+        self._sock = None
+        self._models = None
+
+    def connect(self) -> None:
+        """Open the connection if it is not already open."""
+        if self._sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._sock = sock
+
+    def close(self) -> None:
+        """Close the connection."""
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _request(self, op: int, payload=b'', name: str = ''):
+        self.connect()
+        send_frame(self._sock, op, payload, name=name)
+        response = recv_frame(self._sock)
+        if response is None:
+            self.close()
+            raise ProtocolError("Daemon closed the connection")
+
+        status, _, result = response
+        if status != STATUS_OK:
+            message = result.decode('utf-8', 'replace') if isinstance(result, bytes) else result
+            raise DaemonError(message)
+        return result
+
+    def ping(self) -> float:
+        """Round-trip an empty request. Returns latency in seconds."""
+        start = time.perf_counter()
+        self._request(OP_PING)
+        return time.perf_counter() - start
+
+    def models(self, refresh: bool = False) -> dict:
+        """Describe the models loaded by the daemon (cached unless refresh)."""
+        if self._models is None or refresh:
+            self._models = self._request(OP_MODELS)
+        return self._models
+
+    def infer(self, data: np.ndarray, model: str = '') -> np.ndarray:
+        """
+        Run inference remotely.
+
+        Args:
+            data: uint8 HxWx3 BGR frame, or a preprocessed input tensor
+            model: Model name ('' for the daemon's default model)
+
+        Returns:
+            Raw output tensor
+        """
+        return self._request(OP_INFER, data, name=model)
+
+    def detect(
+        self,
+        frame: np.ndarray,
+        model: str = '',
+        threshold: float = CONFIDENCE_THRESHOLD
+    ) -> list:
+        """Run detection on a frame. Returns list of (class_name, confidence, bbox)."""
+        output = self.infer(frame, model)
+        models = self.models()
+        info = models.get(model) or next(
+            (m for m in models.values() if m.get('default')), {}
+        )
+        class_names = info.get('class_names') or DEFAULT_CLASS_NAMES
+        return decode_output(output, class_names, threshold, info.get('output_quantization'))
@@ -69,15 +69,18 @@ class YOLOConverter:
         self, 
         opset_version: int = 12,
         input_size: Tuple[int, int] = (640, 640),
-        simplify: bool = True
+        simplify: bool = True,
+        dynamic: bool = False
     ) -> Optional[Path]:
         """
         Export the model to ONNX format.
         
         Args:
             opset_version: ONNX opset version (12 recommended for mobile)
-            input_size: Fixed input dimensions (height, width)
+            input_size: Input dimensions (height, width); the default
+                shape when dynamic
             simplify: Whether to simplify the ONNX graph
+            dynamic: Leave batch and spatial dimensions unspecified
             
         Returns:
             Path to the exported ONNX file, or None if failed
@@ -95,7 +98,7 @@ class YOLOConverter:
                 opset=opset_version,
                 imgsz=input_size,
                 simplify=simplify,
-                dynamic=False  # Fixed dimensions for mobile compatibility
+                dynamic=dynamic  # Fixed dimensions by default for mobile compatibility
             )
             
             logger.info(f"[OK] ONNX export complete: {Path(onnx_path).name}")
@@ -105,9 +108,52 @@ class YOLOConverter:
             logger.error(f"ONNX export failed: {e}")
             return None
     
+    def export_to_saved_model(
+        self,
+        input_size: Tuple[int, int] = (640, 640),
+        dynamic: bool = False
+    ) -> Optional[Path]:
+        """
+        Export the model to a TensorFlow SavedModel.
+        
+        Ultralytics writes the SavedModel next to the weights as
+        <stem>_saved_model/, together with float32/float16 .tflite files
+        that export_to_tflite(saved_model_dir=...) can reuse.
+        
+        Args:
+            input_size: Input dimensions (height, width)
+            dynamic: Leave batch and spatial dimensions unspecified
+            
+        Returns:
+            Path to the SavedModel directory, or None if failed
+        """
+        if self.model is None:
+            logger.error("Model not loaded. Call load_model() first.")
+            return None
+            
+        try:
+            logger.info(f"Converting to SavedModel (size={input_size})...")
+            saved_model_dir = self.model.export(
+                format='saved_model',
+                imgsz=input_size,
+                dynamic=dynamic
+            )
+            logger.info(f"[OK] SavedModel export complete: {Path(saved_model_dir).name}")
+            return Path(saved_model_dir)
+            
+        except ImportError as e:
+            logger.error(f"Missing dependency: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"SavedModel export failed: {e}")
+            return None
+    
     def export_to_tflite(
         self,
-        input_size: Tuple[int, int] = (640, 640)
+        input_size: Tuple[int, int] = (640, 640),
+        half: bool = False,
+        saved_model_dir: Optional[Path] = None,
+        dynamic: bool = False
     ) -> Optional[Path]:
         """
         Export the model directly to TFLite format.
@@ -115,29 +161,46 @@ class YOLOConverter:
         
         Args:
             input_size: Fixed input dimensions (height, width)
+            half: Store weights as float16 (<stem>_float16.tflite)
+            saved_model_dir: Output of export_to_saved_model(); its .tflite
+                is copied instead of converting again
+            dynamic: Leave batch and spatial dimensions unspecified, so
+                runtimes can resize the input (TFLiteDetector.prepare)
             
         Returns:
             Path to the exported TFLite file, or None if failed
         """
-        if self.model is None:
+        precision = 'float16' if half else 'float32'
+        reusable = None
+        if saved_model_dir is not None:
+            reusable = Path(saved_model_dir) / f"{self.model_path.stem}_{precision}.tflite"
+            if not reusable.exists():
+                logger.warning(f"{reusable.name} not found in {saved_model_dir}, converting again")
+                reusable = None
+        
+        if reusable is None and self.model is None:
             logger.error("Model not loaded. Call load_model() first.")
             return None
             
         try:
-            logger.info(f"Converting to TFLite (size={input_size})...")
-            logger.info("This may take a few minutes...")
-            
-            # Use Ultralytics built-in TFLite export
-            # This handles PT -> ONNX -> TF SavedModel -> TFLite internally
-            tflite_path = self.model.export(
-                format='tflite',
-                imgsz=input_size,
-                dynamic=False  # Fixed dimensions for mobile
-            )
+            if reusable is not None:
+                tflite_path = reusable
+            else:
+                logger.info(f"Converting to TFLite (size={input_size})...")
+                logger.info("This may take a few minutes...")
+                
+                # Use Ultralytics built-in TFLite export
+                # This handles PT -> ONNX -> TF SavedModel -> TFLite internally
+                tflite_path = self.model.export(
+                    format='tflite',
+                    imgsz=input_size,
+                    half=half,
+                    dynamic=dynamic  # Fixed dimensions by default for mobile
+                )
             
             # Move to output directory with proper naming
             source_path = Path(tflite_path)
-            dest_name = f"{self.model_path.stem}_float32.tflite"
+            dest_name = f"{self.model_path.stem}_{precision}.tflite"
             dest_path = self.output_dir / dest_name
             
             # Copy file to output location
@@ -160,6 +223,65 @@ class YOLOConverter:
             logger.error(f"TFLite export failed: {e}")
             return None
     
+    def export_uint8_tflite(
+        self,
+        saved_model_dir: Path,
+        half: bool = False
+    ) -> Optional[Path]:
+        """
+        Export a TFLite model that takes uint8 RGB pixels.
+        
+        The SavedModel's serving function is wrapped in a graph that casts
+        the uint8 NHWC input to float32 and divides by 255, so callers feed
+        camera bytes directly instead of a 4x larger float tensor.
+        
+        Args:
+            saved_model_dir: Output of export_to_saved_model()
+            half: Store weights as float16
+            
+        Returns:
+            Path to <stem>_uint8.tflite, or None if failed
+        """
+        try:
+            import tensorflow as tf
+            
+            logger.info("Converting to TFLite with uint8 input...")
+            loaded = tf.saved_model.load(str(saved_model_dir))
+            serving = loaded.signatures['serving_default']
+            _, input_specs = serving.structured_input_signature
+            if len(input_specs) != 1:
+                logger.error(f"Expected one model input, found {len(input_specs)}")
+                return None
+            input_name, spec = next(iter(input_specs.items()))
+            
+            @tf.function(input_signature=[tf.TensorSpec(spec.shape, tf.uint8, name=input_name)])
+            def serve_uint8(images):
+                # Normalization fused into the graph: [0, 255] -> [0, 1]
+                return serving(**{input_name: tf.cast(images, tf.float32) / 255.0})
+            
+            converter = tf.lite.TFLiteConverter.from_concrete_functions(
+                [serve_uint8.get_concrete_function()], loaded
+            )
+            if half:
+                converter.optimizations = [tf.lite.Optimize.DEFAULT]
+                converter.target_spec.supported_types = [tf.float16]
+            tflite_model = converter.convert()
+            
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            dest_path = self.output_dir / f"{self.model_path.stem}_uint8.tflite"
+            dest_path.write_bytes(tflite_model)
+            
+            logger.info(f"[OK] uint8 input export complete: {dest_path.name}")
+            logger.info(f"  Size: {dest_path.stat().st_size / 1024 / 1024:.2f} MB")
+            return dest_path
+            
+        except ImportError:
+            logger.error("TensorFlow not installed. Run: pip install tensorflow-cpu")
+            return None
+        except Exception as e:
+            logger.error(f"uint8 input export failed: {e}")
+            return None
+    
     def get_class_names(self) -> list:
         """Get the class names from the loaded model."""
         return self.model_info.get('class_names', [])
@@ -0,0 +1,202 @@
+"""
+Y2M Daemon Module
+
+Long-lived inference daemon that keeps TFLite models loaded and warmed
+and serves requests over a Unix domain socket (see protocol.py). Watched
+model directories are hot-swapped when a new conversion lands (see
+model_manager.py).
+"""
+
+import os
+import logging
+import threading
+import socketserver
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from .runtime.detector import TFLiteDetector
+from .model_manager import ModelManager
+from .protocol import (
+    DEFAULT_SOCKET_PATH,
+    OP_PING,
+    OP_INFER,
+    OP_MODELS,
+    STATUS_OK,
+    STATUS_ERROR,
+    ProtocolError,
+    send_frame,
+    recv_frame,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class InferenceDaemon:
+    """
+    Serves warm TFLite interpreters to short-lived clients.
+
+    Each client connection is handled on its own thread and may send any
+    number of requests. Interpreters are not thread-safe, so every model
+    is guarded by its own lock.
+    """
+
+    def __init__(
+        self,
+        model_paths: Dict[str, str],
+        socket_path: str = DEFAULT_SOCKET_PATH,
+        num_threads: Optional[int] = None,
+        warmup_runs: int = 3,
+        managers: Optional[Dict[str, ModelManager]] = None
+    ):
+        """
+        Initialize the daemon.
+
+        Args:
+            model_paths: Mapping of model name to .tflite path; the first
+                entry is the default model
+            socket_path: Filesystem path of the Unix socket
+            num_threads: Interpreter thread count per model
+            warmup_runs: Blank invocations per model before serving
+            managers: Mapping of model name to a ModelManager for watched
+                model directories (default model if model_paths is empty)
+        """
+        self.model_paths = dict(model_paths)
+        self.socket_path = str(socket_path)
+        self.num_threads = num_threads
+        self.warmup_runs = warmup_runs
+        self.detectors: Dict[str, TFLiteDetector] = {}
+        self.locks: Dict[str, threading.Lock] = {}
+        self.managers: Dict[str, ModelManager] = dict(managers or {})
+        self.default_model = next(iter(self.model_paths), None) or next(iter(self.managers), None)
+        self._server = None
+
+    def load_models(self) -> None:
+        """Load and warm every configured model."""
+        for name, path in self.model_paths.items():
+            detector = TFLiteDetector(path, num_threads=self.num_threads)
+            detector.warmup(self.warmup_runs)
+            self.detectors[name] = detector
+            self.locks[name] = threading.Lock()
+            logger.info(f"[OK] Model ready: {name} ({Path(path).name})")
+        for name, manager in self.managers.items():
+            manager.start()
+
+    def _describe(self, name: str, detector: TFLiteDetector) -> dict:
+        return {
+            'path': detector.model_path,
+            'input_shape': [int(d) for d in detector.input_shape],
+            'input_dtype': np.dtype(detector.input_details[0]['dtype']).name,
+            'output_quantization': detector.output_quantization,
+            'class_names': detector.class_names,
+            'default': name == self.default_model,
+        }
+
+    def describe_models(self) -> dict:
+        """Describe loaded models for OP_MODELS responses."""
+        models = {name: self._describe(name, detector) for name, detector in self.detectors.items()}
+        for name, manager in self.managers.items():
+            # Not acquire(): describing is not a frame and must not enter the swap statistics
+            models[name] = self._describe(name, manager.detector)
+            models[name].update(manager.describe())
+        return models
+
+    def infer(self, name: str, data: np.ndarray) -> np.ndarray:
+        """
+        Run one inference request.
+
+        Args:
+            name: Model name ('' selects the default model)
+            data: uint8 HxWx3 BGR frame, or an already preprocessed
+                tensor matching the model input shape
+
+        Returns:
+            Raw output tensor
+        """
+        name = name or self.default_model
+        if name in self.managers:
+            # Watched model: run on whichever version is live when the request starts
+            with self.managers[name].acquire() as slot, slot.lock:
+                return self._run(slot.detector, data)
+
+        detector = self.detectors.get(name)
+        if detector is None:
+            raise KeyError(f"Unknown model: {name}")
+
+        with self.locks[name]:
+            return self._run(detector, data)
+
+    @staticmethod
+    def _run(detector: TFLiteDetector, data: np.ndarray) -> np.ndarray:
+        if data.ndim == 3 and data.dtype == np.uint8:
+            output = detector.predict(data)
+        else:
+            output = detector.infer(data)
+        return output.copy()
+
+    def handle_connection(self, sock) -> None:
+        """Serve requests on one client connection until it closes."""
+        while True:
+            try:
+                frame = recv_frame(sock)
+            except (ProtocolError, OSError) as e:
+                logger.warning(f"Dropping client: {e}")
+                return
+            if frame is None:
+                return
+
+            op, name, payload = frame
+            try:
+                if op == OP_PING:
+                    send_frame(sock, STATUS_OK, b'')
+                elif op == OP_MODELS:
+                    send_frame(sock, STATUS_OK, self.describe_models())
+                elif op == OP_INFER:
+                    if not isinstance(payload, np.ndarray):
+                        raise ProtocolError("Inference payload must be an array")
+                    send_frame(sock, STATUS_OK, self.infer(name, payload), name=name)
+                else:
+                    send_frame(sock, STATUS_ERROR, f"Unknown op: {op}")
+            except OSError as e:
+                logger.warning(f"Dropping client: {e}")
+                return
+            except Exception as e:
+                send_frame(sock, STATUS_ERROR, str(e))
+
+    def serve_forever(self) -> None:
+        """Bind the socket and serve until shutdown() is called."""
+        if not self.detectors and not any(m.version for m in self.managers.values()):
+            self.load_models()
+
+        # Remove a stale socket left by a previous run
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        daemon = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                daemon.handle_connection(self.request)
+
+        self._server = _ThreadingUnixServer(self.socket_path, Handler)
+        os.chmod(self.socket_path, 0o660)
+        logger.info(f"[OK] Listening on {self.socket_path}")
+
+        try:
+            self._server.serve_forever()
+        finally:
+            for manager in self.managers.values():
+                manager.stop()
+            self._server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def shutdown(self) -> None:
+        """Stop serving (safe to call from another thread)."""
+        if self._server is not None:
+            self._server.shutdown()
@@ -0,0 +1,7 @@
+"""Compatibility alias: the decoding module moved to y2m.runtime.decoding."""
+
+import sys
+
+from .runtime import decoding
+
+sys.modules[__name__] = decoding
@@ -0,0 +1,7 @@
+"""Compatibility alias: the detector module moved to y2m.runtime.detector."""
+
+import sys
+
+from .runtime import detector
+
+sys.modules[__name__] = detector
@@ -0,0 +1,406 @@
+"""
+Y2M Distillation Module
+
+Trains a small low-resolution student classifier from the .pt teacher on
+unlabeled frames (knowledge distillation), exports it through the usual
+YOLOConverter TFLite path, and reports its latency and agreement with
+the teacher.
+
+The teacher runs once over the frames at its own input size and its
+class probabilities are cached; the student (a narrower, shallower
+YOLOv8-cls network) is then trained on CPU against those soft targets at
+the student size, e.g. 128x128. Student inputs are made with
+preprocess_frame, the same resize TFLiteDetector applies at run time.
+"""
+
+import time
+import logging
+from copy import deepcopy
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .calibration import (
+    discover_sources, iter_media_frames, load_calibration_set, preprocess_frame
+)
+from .runtime.sources import sample_to_frame
+
+logger = logging.getLogger(__name__)
+
+# Base architecture of the student; depth and width are scaled down from it
+STUDENT_CONFIG = 'yolov8n-cls.yaml'
+
+# YOLOv8n-cls is depth 0.33, width 0.25
+DEFAULT_DEPTH = 0.33
+DEFAULT_WIDTH = 0.125
+DEFAULT_STUDENT_SIZE = (128, 128)
+DEFAULT_TEMPERATURE = 4.0
+
+# Fraction of frames held out to pick the best epoch and to report agreement
+HOLDOUT_FRACTION = 0.1
+
+
+def load_frames(
+    sources: Sequence[str],
+    max_frames: Optional[int] = None,
+    frame_stride: int = 1
+) -> Tuple[List[np.ndarray], Optional[np.ndarray]]:
+    """
+    Load BGR frames from a calibration .npy or from images/videos.
+
+    Args:
+        sources: One calibration .npy, or directories and media files
+        max_frames: Stop after this many frames
+        frame_stride: Keep every Nth video frame
+
+    Returns:
+        Tuple of (frames, labels or None); labels only come from a labeled
+        .npy and are used for reporting, never for training
+    """
+    if len(sources) == 1 and Path(sources[0]).suffix == '.npy':
+        data, labels, _ = load_calibration_set(sources[0])
+        count = len(data) if max_frames is None else min(max_frames, len(data))
+        frames = [sample_to_frame(data[i]) for i in range(count)]
+        if labels is not None and len(labels) >= count and (labels[:count] >= 0).all():
+            return frames, np.asarray(labels[:count], dtype=np.int64)
+        return frames, None
+
+    frames = []
+    for files in discover_sources(sources).values():
+        for path in files:
+            for frame in iter_media_frames(path, frame_stride):
+                frames.append(frame)
+                if max_frames is not None and len(frames) >= max_frames:
+                    return frames, None
+    return frames, None
+
+
+def teacher_probabilities(teacher, frames: Sequence[np.ndarray], batch_size: int = 32) -> np.ndarray:
+    """Class probabilities of the Ultralytics teacher for each frame."""
+    probabilities = []
+    for start in range(0, len(frames), batch_size):
+        results = teacher(list(frames[start:start + batch_size]), verbose=False)
+        probabilities.extend(r.probs.data.float().cpu().numpy() for r in results)
+    return np.stack(probabilities).astype(np.float32)
+
+
+def build_student(num_classes: int, depth: float = DEFAULT_DEPTH, width: float = DEFAULT_WIDTH):
+    """
+    A YOLOv8-cls ClassificationModel scaled to the given depth and width.
+
+    Args:
+        num_classes: Output classes (the teacher's)
+        depth: Depth multiple (YOLOv8n-cls: 0.33)
+        width: Width multiple (YOLOv8n-cls: 0.25)
+    """
+    from ultralytics.nn.tasks import ClassificationModel, yaml_model_load
+
+    cfg = yaml_model_load(STUDENT_CONFIG)
+    cfg.pop('scales', None)
+    cfg.pop('scale', None)
+    cfg['depth_multiple'] = depth
+    cfg['width_multiple'] = width
+    return ClassificationModel(cfg, nc=num_classes, verbose=False)
+
+
+def _to_tensor(samples: np.ndarray):
+    """uint8 NHWC RGB -> float NCHW in [0, 1]."""
+    import torch
+
+    return torch.from_numpy(np.ascontiguousarray(samples.transpose(0, 3, 1, 2))).float().div_(255.0)
+
+
+def _predict(model, inputs: np.ndarray, batch_size: int = 256) -> np.ndarray:
+    """Top-1 class ids of the student (eval mode) on uint8 NHWC inputs."""
+    import torch
+
+    model.eval()
+    predictions = []
+    with torch.no_grad():
+        for start in range(0, len(inputs), batch_size):
+            output = model(_to_tensor(inputs[start:start + batch_size]))
+            if isinstance(output, (tuple, list)):
+                output = output[0]
+            predictions.append(output.argmax(1).cpu().numpy())
+    return np.concatenate(predictions).astype(np.int64)
+
+
+def train_student(
+    student,
+    inputs: np.ndarray,
+    targets: np.ndarray,
+    holdout: np.ndarray,
+    epochs: int = 30,
+    batch_size: int = 64,
+    learning_rate: float = 1e-3,
+    temperature: float = DEFAULT_TEMPERATURE,
+    flip: bool = True,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Train the student on the teacher's soft targets.
+
+    The loss is KL(teacher || student) on temperature-softened
+    distributions, scaled by T^2 (Hinton et al.). Horizontal flips assume
+    the teacher's prediction does not depend on left/right orientation,
+    which holds for face crops. The weights of the epoch with the best
+    holdout agreement are kept.
+
+    Args:
+        student: ClassificationModel from build_student()
+        inputs: uint8 NHWC RGB frames at the student size
+        targets: Teacher probabilities per frame
+        holdout: Boolean mask of frames used only for evaluation
+        epochs: Training epochs
+        batch_size: Batch size
+        learning_rate: AdamW learning rate (cosine decay)
+        temperature: Distillation temperature
+        flip: Random horizontal flips
+        seed: Shuffle and augmentation seed
+
+    Returns:
+        Training history: per-epoch loss and holdout agreement, best epoch
+    """
+    import torch
+    import torch.nn.functional as F
+
+    torch.manual_seed(seed)
+    rng = np.random.default_rng(seed)
+
+    train_index = np.flatnonzero(~holdout)
+    holdout_index = np.flatnonzero(holdout)
+    teacher_top1 = targets.argmax(1)
+    # Tempered teacher distribution: softmax(log p / T)
+    soft_targets = torch.from_numpy(targets).clamp_min(1e-8).log().div(temperature).softmax(1)
+
+    optimizer = torch.optim.AdamW(student.parameters(), lr=learning_rate, weight_decay=5e-4)
+    steps_per_epoch = max(1, int(np.ceil(len(train_index) / batch_size)))
+    scheduler = torch.optim.lr_scheduler.CosineAnnealingLR(optimizer, T_max=epochs * steps_per_epoch)
+
+    history = []
+    best_state = None
+    best_agreement = -1.0
+    best_epoch = 0
+    for epoch in range(1, epochs + 1):
+        student.train()
+        rng.shuffle(train_index)
+        total_loss = 0.0
+        start = time.perf_counter()
+        for batch_start in range(0, len(train_index), batch_size):
+            batch = train_index[batch_start:batch_start + batch_size]
+            images = _to_tensor(inputs[batch])
+            if flip:
+                flipped = torch.from_numpy(rng.random(len(batch)) < 0.5)
+                images[flipped] = images[flipped].flip(3)
+
+            logits = student(images)
+            if isinstance(logits, (tuple, list)):
+                logits = logits[0]
+            loss = F.kl_div(
+                F.log_softmax(logits / temperature, dim=1), soft_targets[batch],
+                reduction='batchmean'
+            ) * temperature ** 2
+
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            scheduler.step()
+            total_loss += float(loss) * len(batch)
+
+        evaluated = holdout_index if len(holdout_index) else train_index
+        agreement = float((_predict(student, inputs[evaluated]) == teacher_top1[evaluated]).mean())
+        history.append({
+            'epoch': epoch,
+            'loss': round(total_loss / max(1, len(train_index)), 5),
+            'agreement': round(agreement, 4),
+            'seconds': round(time.perf_counter() - start, 2),
+        })
+        logger.info(f"Epoch {epoch}/{epochs}: loss {history[-1]['loss']:.4f}, "
+                    f"agreement {agreement:.4f} ({history[-1]['seconds']:.1f}s)")
+        if agreement > best_agreement:
+            best_agreement = agreement
+            best_epoch = epoch
+            best_state = deepcopy(student.state_dict())
+
+    if best_state is not None:
+        student.load_state_dict(best_state)
+    student.eval()
+    return {'epochs': history, 'best_epoch': best_epoch, 'best_agreement': round(best_agreement, 4)}
+
+
+def save_student(student, path: Path, class_names: Sequence[str], input_size: Tuple[int, int]) -> Path:
+    """
+    Save the student as an Ultralytics checkpoint that YOLO() (and so
+    YOLOConverter) can load.
+    """
+    import torch
+    from ultralytics import __version__ as ultralytics_version
+
+    model = deepcopy(student).float().eval()
+    model.names = {i: name for i, name in enumerate(class_names)}
+    torch.save({
+        'model': model.half(),
+        'train_args': {'task': 'classify', 'imgsz': int(input_size[0]), 'model': STUDENT_CONFIG},
+        'date': datetime.now().isoformat(),
+        'version': ultralytics_version,
+    }, path)
+    return path
+
+
+def distill(
+    weights: str,
+    sources: Sequence[str],
+    output_dir: str,
+    input_size: Tuple[int, int] = DEFAULT_STUDENT_SIZE,
+    depth: float = DEFAULT_DEPTH,
+    width: float = DEFAULT_WIDTH,
+    epochs: int = 30,
+    batch_size: int = 64,
+    learning_rate: float = 1e-3,
+    temperature: float = DEFAULT_TEMPERATURE,
+    max_frames: Optional[int] = None,
+    frame_stride: int = 1,
+    flip: bool = True,
+    reference: Optional[str] = None,
+    latency_runs: int = 50,
+    seed: int = 0
+) -> Optional[Dict[str, Any]]:
+    """
+    Distill the .pt teacher into a small student and export it to TFLite.
+
+    Args:
+        weights: Teacher .pt (YOLO classification model)
+        sources: Calibration .npy, or image directories and videos
+        output_dir: Receives <stem>_student.pt, <stem>_student_float32.tflite
+            and metadata.json (with the report under 'distillation')
+        input_size: Student input size (height, width)
+        depth: Student depth multiple
+        width: Student width multiple
+        epochs: Training epochs
+        batch_size: Batch size
+        learning_rate: AdamW learning rate
+        temperature: Distillation temperature
+        max_frames: Limit on frames loaded
+        frame_stride: Keep every Nth video frame
+        flip: Random horizontal flips during training
+        reference: Optional .tflite (e.g. the exported teacher) to time
+            alongside the student
+        latency_runs: Timed single-thread inferences per model
+        seed: Shuffle, split and augmentation seed
+
+    Returns:
+        Report dictionary, or None if failed
+    """
+    try:
+        import torch
+        from ultralytics import YOLO
+    except ImportError:
+        logger.error("Ultralytics not installed. Run: pip install ultralytics")
+        return None
+
+    from .converter import YOLOConverter
+    from .tuner import benchmark_model, predict_top1
+    from .utils import create_metadata
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stem = f"{Path(weights).stem}_student"
+
+    frames, labels = load_frames(sources, max_frames, frame_stride)
+    if len(frames) < 2:
+        logger.error(f"Need at least 2 frames to distill, found {len(frames)}")
+        return None
+    logger.info(f"Loaded {len(frames)} frames")
+
+    try:
+        teacher = YOLO(str(weights))
+        if teacher.task != 'classify':
+            logger.error(f"Distillation needs a classification teacher, got task '{teacher.task}'")
+            return None
+        class_names = list(teacher.names.values()) if isinstance(teacher.names, dict) else list(teacher.names)
+
+        start = time.perf_counter()
+        targets = teacher_probabilities(teacher, frames)
+        teacher_ms = (time.perf_counter() - start) * 1000 / len(frames)
+        logger.info(f"[OK] Teacher labeled {len(frames)} frames ({teacher_ms:.1f} ms/frame)")
+        del teacher
+
+        inputs = np.stack([preprocess_frame(frame, input_size, np.uint8) for frame in frames])
+        rng = np.random.default_rng(seed)
+        holdout = np.zeros(len(frames), dtype=bool)
+        holdout_count = max(1, int(round(len(frames) * HOLDOUT_FRACTION)))
+        holdout[rng.choice(len(frames), holdout_count, replace=False)] = True
+
+        student = build_student(len(class_names), depth, width)
+        parameters = sum(p.numel() for p in student.parameters())
+        logger.info(f"Student: {parameters:,} parameters, input {input_size[0]}x{input_size[1]}, "
+                    f"{torch.get_num_threads()} CPU threads")
+
+        start = time.perf_counter()
+        training = train_student(
+            student, inputs, targets, holdout,
+            epochs=epochs, batch_size=batch_size, learning_rate=learning_rate,
+            temperature=temperature, flip=flip, seed=seed
+        )
+        training['seconds'] = round(time.perf_counter() - start, 1)
+
+        student_weights = save_student(student, output_dir / f"{stem}.pt", class_names, input_size)
+    except Exception as e:
+        logger.error(f"Distillation failed: {e}")
+        return None
+
+    converter = YOLOConverter(str(student_weights), str(output_dir))
+    if not converter.load_model():
+        return None
+    tflite_path = converter.export_to_tflite(input_size=input_size)
+    if tflite_path is None:
+        return None
+
+    # Agreement of the exported model, so export differences show up too
+    holdout_frames = [frames[i] for i in np.flatnonzero(holdout)]
+    teacher_top1 = targets.argmax(1)
+    student_top1 = predict_top1(tflite_path, frames)
+    report = {
+        'teacher': Path(weights).name,
+        'student': tflite_path.name,
+        'student_weights': student_weights.name,
+        'input_size': list(input_size),
+        'depth_multiple': depth,
+        'width_multiple': width,
+        'parameters': parameters,
+        'size_mb': round(tflite_path.stat().st_size / 1024 / 1024, 3),
+        'temperature': temperature,
+        'frames': len(frames),
+        'holdout_frames': holdout_count,
+        'agreement': round(float((student_top1 == teacher_top1).mean()), 4),
+        'holdout_agreement': round(float((student_top1[holdout] == teacher_top1[holdout]).mean()), 4),
+        'training': training,
+    }
+    if labels is not None:
+        report['accuracy'] = round(float((student_top1 == labels).mean()), 4)
+        report['teacher_accuracy'] = round(float((teacher_top1 == labels).mean()), 4)
+
+    # Single-thread latency: what one stream costs on one core
+    latency = benchmark_model(tflite_path, holdout_frames or frames, runs=latency_runs, num_threads=1)
+    report['latency_ms'] = latency
+    report['streams_per_core'] = round(1000.0 / latency['p50'], 1) if latency['p50'] else None
+    if reference:
+        reference_latency = benchmark_model(Path(reference), holdout_frames or frames,
+                                            runs=latency_runs, num_threads=1)
+        report['reference'] = {
+            'model': Path(reference).name,
+            'latency_ms': reference_latency,
+            'agreement': round(float((predict_top1(Path(reference), frames) == teacher_top1).mean()), 4),
+        }
+        report['speedup'] = round(reference_latency['p50'] / latency['p50'], 2) if latency['p50'] else None
+
+    create_metadata(
+        model_name=student_weights.name,
+        output_dir=output_dir,
+        class_names=class_names,
+        input_size=input_size,
+        extra_info={'distillation': report}
+    )
+    return report
@@ -0,0 +1,614 @@
+"""
+Y2M Isolation Module
+
+Runs export stages in child processes so the memory TensorFlow and
+Ultralytics allocate during conversion is returned to the OS when the
+stage ends. Each stage can be capped (address space, resident memory,
+wall time); its log records are streamed back to the parent's handlers
+and its wall time and peak RSS are recorded.
+"""
+
+import sys
+import time
+import queue
+import logging
+import logging.handlers
+import multiprocessing
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Stage status values
+STATUS_OK = 'ok'
+STATUS_FAILED = 'failed'
+STATUS_TIMEOUT = 'timeout'
+STATUS_MEMORY = 'memory_limit'
+STATUS_CRASHED = 'crashed'
+
+# Export stages, in pipeline order
+STAGE_LOAD = 'load_model'
+STAGE_ONNX = 'onnx'
+STAGE_SAVED_MODEL = 'saved_model'
+STAGE_TFLITE = 'tflite'
+STAGE_INT8 = 'int8'
+STAGE_UINT8 = 'uint8_input'
+STAGE_PRUNE = 'prune'
+
+_POLL_INTERVAL = 0.2
+
+
+def _maxrss_mb(usage) -> float:
+    """ru_maxrss in MB (kilobytes on Linux, bytes on macOS)."""
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return usage.ru_maxrss / scale
+
+
+def _cpu_time_s(children: bool = False) -> Optional[float]:
+    """User + system CPU seconds of this process, or of its reaped children."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _proc_status_mb(pid: int, field: str) -> Optional[float]:
+    """Read a memory field (VmRSS, VmHWM) of a live process from /proc, in MB."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _stage_entry(
+    func: Callable,
+    args: tuple,
+    kwargs: dict,
+    log_queue,
+    result_conn,
+    log_level: int,
+    address_space_mb: Optional[int]
+) -> None:
+    """Child process body: apply limits, route logs to the parent, run func."""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(log_level)
+
+    if address_space_mb:
+        try:
+            import resource
+            limit = address_space_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError) as e:
+            logger.warning(f"Address space limit not applied: {e}")
+
+    try:
+        result = func(*args, **kwargs)
+        outcome = {'ok': True, 'result': result}
+    except MemoryError:
+        outcome = {'ok': False, 'error': 'MemoryError', 'memory': True}
+    except BaseException as e:
+        outcome = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+
+    try:
+        import resource
+        outcome['peak_rss_mb'] = max(
+            _maxrss_mb(resource.getrusage(resource.RUSAGE_SELF)),
+            _maxrss_mb(resource.getrusage(resource.RUSAGE_CHILDREN))
+        )
+    except ImportError:
+        pass
+
+    try:
+        result_conn.send(outcome)
+    except Exception as e:
+        # Unpicklable result
+        result_conn.send({'ok': False, 'error': f"Result not transferable: {e}",
+                          'peak_rss_mb': outcome.get('peak_rss_mb')})
+    result_conn.close()
+
+
+def _drain_logs(log_queue) -> None:
+    while True:
+        try:
+            record = log_queue.get_nowait()
+        except (queue.Empty, EOFError, OSError):
+            return
+        logging.getLogger(record.name).handle(record)
+
+
+def run_isolated(
+    name: str,
+    func: Callable,
+    args: tuple = (),
+    kwargs: Optional[dict] = None,
+    address_space_mb: Optional[int] = None,
+    rss_limit_mb: Optional[int] = None,
+    timeout: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Run func(*args, **kwargs) in a fresh 'spawn' child process.
+
+    func must be importable at module level and its arguments and return
+    value picklable.
+
+    Args:
+        name: Stage name used in logs and the returned record
+        func: Stage function
+        args: Positional arguments
+        kwargs: Keyword arguments
+        address_space_mb: RLIMIT_AS for the child (POSIX only); allocations
+            beyond it raise MemoryError in the child
+        rss_limit_mb: Kill the child when its resident memory exceeds this
+            (Linux; polled)
+        timeout: Kill the child after this many seconds
+
+    Returns:
+        Stage record: stage, status, result, wall_time_s, cpu_time_s,
+        peak_rss_mb, exit_code and error (if any)
+    """
+    ctx = multiprocessing.get_context('spawn')
+    log_queue = ctx.Queue()
+    result_recv, result_send = ctx.Pipe(duplex=False)
+
+    process = ctx.Process(
+        target=_stage_entry,
+        args=(func, args, kwargs or {}, log_queue, result_send,
+              logging.getLogger().getEffectiveLevel(), address_space_mb),
+        name=f"y2m-{name}",
+        daemon=True
+    )
+
+    logger.info(f"[{name}] Starting isolated stage")
+    children_cpu = _cpu_time_s(children=True)
+    start = time.perf_counter()
+    process.start()
+    result_send.close()
+
+    status = None
+    outcome = None
+    peak_rss = 0.0
+
+    while True:
+        process.join(_POLL_INTERVAL)
+        _drain_logs(log_queue)
+
+        if outcome is None and result_recv.poll():
+            try:
+                outcome = result_recv.recv()
+            except EOFError:
+                pass
+
+        if not process.is_alive():
+            break
+
+        hwm = _proc_status_mb(process.pid, 'VmHWM')
+        if hwm is not None:
+            peak_rss = max(peak_rss, hwm)
+        rss = _proc_status_mb(process.pid, 'VmRSS')
+
+        if rss_limit_mb and rss is not None and rss > rss_limit_mb:
+            logger.error(f"[{name}] RSS {rss:.0f} MB exceeds limit of {rss_limit_mb} MB, killing")
+            status = STATUS_MEMORY
+            process.kill()
+        elif timeout and time.perf_counter() - start > timeout:
+            logger.error(f"[{name}] Timed out after {timeout:.0f}s, killing")
+            status = STATUS_TIMEOUT
+            process.kill()
+
+    process.join()
+    wall_time = time.perf_counter() - start
+    # join() reaped the child, so its CPU time is now in RUSAGE_CHILDREN
+    cpu_time = _cpu_time_s(children=True)
+    _drain_logs(log_queue)
+    if outcome is None and result_recv.poll():
+        try:
+            outcome = result_recv.recv()
+        except EOFError:
+            pass
+    result_recv.close()
+    log_queue.close()
+
+    if outcome and outcome.get('peak_rss_mb'):
+        peak_rss = max(peak_rss, outcome['peak_rss_mb'])
+
+    if status is None:
+        if outcome is None:
+            status = STATUS_CRASHED
+        elif outcome['ok']:
+            status = STATUS_OK
+        else:
+            status = STATUS_MEMORY if outcome.get('memory') else STATUS_FAILED
+
+    record = {
+        'stage': name,
+        'status': status,
+        'result': outcome.get('result') if outcome else None,
+        'wall_time_s': round(wall_time, 2),
+        'cpu_time_s': round(cpu_time - children_cpu, 2) if cpu_time is not None else None,
+        'peak_rss_mb': round(peak_rss, 1) if peak_rss else None,
+        'exit_code': process.exitcode,
+    }
+    if outcome and not outcome['ok']:
+        record['error'] = outcome['error']
+    elif status == STATUS_CRASHED:
+        record['error'] = f"Child exited with code {process.exitcode} without a result"
+
+    log = logger.info if status == STATUS_OK else logger.error
+    log(f"[{name}] {status} in {record['wall_time_s']:.1f}s, peak RSS "
+        f"{record['peak_rss_mb'] or 0:.0f} MB")
+    return record
+
+
+def run_inline(name: str, func: Callable, args: tuple = (), kwargs: Optional[dict] = None) -> Dict[str, Any]:
+    """
+    Run a stage in this process, recording the same fields as run_isolated.
+
+    peak_rss_mb is the process high-water mark so far, so it includes
+    earlier stages.
+    """
+    start = time.perf_counter()
+    cpu_start = _cpu_time_s()
+    record = {'stage': name}
+    try:
+        record['result'] = func(*args, **(kwargs or {}))
+        record['status'] = STATUS_OK
+    except Exception as e:
+        record['result'] = None
+        record['status'] = STATUS_FAILED
+        record['error'] = f"{type(e).__name__}: {e}"
+    record['wall_time_s'] = round(time.perf_counter() - start, 2)
+    cpu_time = _cpu_time_s()
+    record['cpu_time_s'] = round(cpu_time - cpu_start, 2) if cpu_time is not None else None
+    try:
+        import resource
+        record['peak_rss_mb'] = round(_maxrss_mb(resource.getrusage(resource.RUSAGE_SELF)), 1)
+    except ImportError:
+        record['peak_rss_mb'] = None
+    return record
+
+
+# Stage functions. Each loads the model itself so it can run in a fresh
+# process, unless an inline pipeline passes the converter it already
+# loaded; results are plain dicts with string paths.
+
+def _load_converter(weights: str, output_dir: str, converter=None):
+    """Load weights into a YOLOConverter; a given converter is reused as is."""
+    if converter is not None:
+        return converter
+
+    from .converter import YOLOConverter
+
+    converter = YOLOConverter(weights, output_dir)
+    start = time.perf_counter()
+    if not converter.load_model():
+        raise RuntimeError(f"Failed to load model: {weights}")
+    converter.load_time_s = time.perf_counter() - start
+    return converter
+
+
+def _stage_result(path: Optional[Path], converter, what: str, shared: bool = False) -> dict:
+    if path is None:
+        raise RuntimeError(f"{what} export failed")
+    result = {'path': str(path), 'model_info': converter.get_model_info()}
+    # A shared converter's load is recorded once, as the load_model stage
+    if hasattr(converter, 'load_time_s') and not shared:
+        result['model_load_s'] = round(converter.load_time_s, 2)
+    return result
+
+
+def export_onnx_stage(
+    weights: str,
+    output_dir: str,
+    input_size: Tuple[int, int],
+    dynamic: bool = False,
+    converter=None
+) -> dict:
+    """Stage: .pt -> standalone .onnx."""
+    shared = converter is not None
+    converter = _load_converter(weights, output_dir, converter)
+    path = converter.export_to_onnx(input_size=input_size, dynamic=dynamic)
+    return _stage_result(path, converter, 'ONNX', shared)
+
+
+def export_saved_model_stage(
+    weights: str,
+    output_dir: str,
+    input_size: Tuple[int, int],
+    dynamic: bool = False,
+    converter=None
+) -> dict:
+    """Stage: .pt -> SavedModel (Ultralytics converts via ONNX internally)."""
+    shared = converter is not None
+    converter = _load_converter(weights, output_dir, converter)
+    path = converter.export_to_saved_model(input_size=input_size, dynamic=dynamic)
+    return _stage_result(path, converter, 'SavedModel', shared)
+
+
+def export_tflite_stage(
+    weights: str,
+    output_dir: str,
+    input_size: Tuple[int, int],
+    saved_model_dir: Optional[str] = None,
+    dynamic: bool = False,
+    converter=None
+) -> dict:
+    """Stage: SavedModel -> .tflite (converts from scratch without one)."""
+    from .converter import YOLOConverter
+
+    if saved_model_dir:
+        copier = YOLOConverter(weights, output_dir)
+        path = copier.export_to_tflite(input_size=input_size, saved_model_dir=Path(saved_model_dir))
+        if path is not None:
+            return _stage_result(path, copier, 'TFLite')
+    shared = converter is not None
+    converter = _load_converter(weights, output_dir, converter)
+    path = converter.export_to_tflite(input_size=input_size, dynamic=dynamic)
+    return _stage_result(path, converter, 'TFLite', shared)
+
+
+def export_int8_stage(
+    weights: str,
+    output_dir: str,
+    input_size: Tuple[int, int],
+    integer_io: bool = False,
+    calibration: Optional[str] = None,
+    num_calibration_samples: int = 100,
+    tflite_path: Optional[str] = None,
+    saved_model_dir: Optional[str] = None
+) -> dict:
+    """
+    Stage: int8 .tflite.
+
+    With a calibration set (y2m calib build), the SavedModel from the float
+    stages is quantized by ModelOptimizer; otherwise .pt -> int8 through
+    Ultralytics' own calibration.
+    """
+    from .optimizer import ModelOptimizer, quantize_with_ultralytics
+
+    if calibration:
+        if not saved_model_dir or not tflite_path:
+            raise RuntimeError("Calibrated int8 export needs the SavedModel and TFLite stage outputs")
+        optimizer = ModelOptimizer(tflite_path, output_dir, calibration_data=calibration)
+        path = optimizer.quantize_int8(
+            num_calibration_samples,
+            input_shape=(1, *input_size, 3),
+            saved_model_dir=saved_model_dir,
+            integer_io=integer_io
+        )
+    else:
+        path = quantize_with_ultralytics(weights, output_dir, input_size=input_size, integer_io=integer_io)
+    if path is None:
+        raise RuntimeError("Int8 export failed")
+    return {'path': str(path), 'model_info': {}}
+
+
+def export_uint8_stage(
+    weights: str,
+    output_dir: str,
+    input_size: Tuple[int, int],
+    saved_model_dir: Optional[str] = None
+) -> dict:
+    """Stage: SavedModel -> .tflite with uint8 input and fused normalization."""
+    from .converter import YOLOConverter
+
+    if not saved_model_dir:
+        raise RuntimeError("uint8 input export needs the SavedModel stage output")
+    converter = YOLOConverter(weights, output_dir)
+    return _stage_result(converter.export_uint8_tflite(Path(saved_model_dir)), converter, 'uint8 input')
+
+
+def export_pruned_stage(
+    weights: str,
+    output_dir: str,
+    input_size: Tuple[int, int],
+    sparsity: float = 0.5,
+    finetune_data: Optional[str] = None,
+    finetune_epochs: int = 3
+) -> dict:
+    """Stage: .pt -> pruned (optionally fine-tuned) .pt -> sparse .tflite."""
+    from .pruning import prune_and_export
+
+    result = prune_and_export(
+        weights, output_dir, input_size,
+        sparsity=sparsity,
+        finetune_data=finetune_data, finetune_epochs=finetune_epochs
+    )
+    if result is None:
+        raise RuntimeError("Pruned export failed")
+    return {'path': result.pop('path'), 'model_info': {}, 'pruning': result}
+
+
+class ExportPipeline:
+    """
+    Runs the export stages (SavedModel, TFLite, optional ONNX, int8,
+    uint8 input and pruned),
+    each inline or in its own child process, and keeps a record per stage
+    for metadata.json.
+
+    Inline stages share one loaded model (recorded as the load_model
+    stage); isolated stages each load their own in the child process.
+    """
+
+    def __init__(
+        self,
+        weights: str,
+        output_dir: str,
+        input_size: Tuple[int, int] = (640, 640),
+        isolate: bool = False,
+        address_space_mb: Optional[int] = None,
+        rss_limit_mb: Optional[int] = None,
+        stage_timeout: Optional[float] = None,
+        dynamic: bool = False,
+        onnx: bool = False
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            weights: Path to the .pt model
+            output_dir: Output directory for the .tflite files
+            input_size: Fixed input dimensions (height, width)
+            isolate: Run every stage in a child process
+            address_space_mb: Per-stage address space limit (isolated only)
+            rss_limit_mb: Per-stage resident memory limit (isolated only)
+            stage_timeout: Per-stage timeout in seconds (isolated only)
+            dynamic: Export the float stages with dynamic input shapes
+            onnx: Also export a standalone .onnx as its own stage. The
+                SavedModel stage does not use it: Ultralytics always
+                converts through its own ONNX export.
+        """
+        self.weights = str(weights)
+        self.output_dir = str(output_dir)
+        self.input_size = tuple(input_size)
+        self.isolate = isolate
+        self.address_space_mb = address_space_mb
+        self.rss_limit_mb = rss_limit_mb
+        self.stage_timeout = stage_timeout
+        self.dynamic = dynamic
+        self.onnx = onnx
+        self._converter = None
+        self.stages: List[Dict[str, Any]] = []
+        self.model_info: Dict[str, Any] = {}
+        # Full result of each successful stage, by stage name
+        self.outputs: Dict[str, Dict[str, Any]] = {}
+
+    def run_stage(self, name: str, func: Callable, **kwargs) -> Optional[Path]:
+        """Run one stage and return its output path, or None if it failed."""
+        args = (self.weights, self.output_dir, self.input_size)
+        if self.isolate:
+            record = run_isolated(
+                name, func, args, kwargs,
+                address_space_mb=self.address_space_mb,
+                rss_limit_mb=self.rss_limit_mb,
+                timeout=self.stage_timeout
+            )
+        else:
+            record = run_inline(name, func, args, kwargs)
+            if record['status'] != STATUS_OK:
+                logger.error(f"[{name}] {record['error']}")
+
+        result = record.pop('result') or {}
+        if result.get('model_info'):
+            self.model_info.update(result['model_info'])
+        if result.get('model_load_s') is not None:
+            record['model_load_s'] = result['model_load_s']
+        if record['status'] == STATUS_OK:
+            record['artifact'] = Path(result['path']).name
+            self.outputs[name] = result
+        self.stages.append(record)
+        return Path(result['path']) if record['status'] == STATUS_OK else None
+
+    def _shared_converter(self) -> Dict[str, Any]:
+        """
+        Stage kwargs passing the inline pipeline's loaded converter.
+
+        The model is loaded on first use and recorded as the load_model
+        stage. Isolated stages cannot share it, so they get no kwargs; if
+        the load fails, stages fall back to loading (and failing) themselves.
+        """
+        if self.isolate:
+            return {}
+        if self._converter is None:
+            record = run_inline(STAGE_LOAD, _load_converter, (self.weights, self.output_dir))
+            converter = record.pop('result')
+            self.stages.append(record)
+            if record['status'] != STATUS_OK:
+                logger.error(f"[{STAGE_LOAD}] {record['error']}")
+                return {}
+            self._converter = converter
+            self.model_info.update(converter.get_model_info())
+        return {'converter': self._converter}
+
+    def run(self) -> Tuple[Optional[Path], Optional[Path]]:
+        """
+        Run the float stages (optional ONNX, SavedModel, TFLite).
+
+        The TFLite stage reuses the SavedModel output; if that stage
+        failed it converts from scratch.
+
+        Returns:
+            (float32 .tflite path, SavedModel directory); either may be None
+        """
+        if self.onnx:
+            onnx_path = self.run_stage(
+                STAGE_ONNX, export_onnx_stage, dynamic=self.dynamic, **self._shared_converter()
+            )
+            if onnx_path is None:
+                logger.warning("Standalone ONNX export failed, continuing with SavedModel and TFLite")
+        saved_model_dir = self.run_stage(
+            STAGE_SAVED_MODEL, export_saved_model_stage, dynamic=self.dynamic, **self._shared_converter()
+        )
+        # The copy from the SavedModel needs no model; loading waits for the fallback
+        tflite_path = self.run_stage(
+            STAGE_TFLITE, export_tflite_stage,
+            saved_model_dir=str(saved_model_dir) if saved_model_dir else None,
+            dynamic=self.dynamic,
+            **({} if saved_model_dir else self._shared_converter())
+        )
+        return tflite_path, saved_model_dir
+
+    def run_int8(
+        self,
+        integer_io: bool = False,
+        calibration: Optional[str] = None,
+        num_calibration_samples: int = 100,
+        tflite_path: Optional[Path] = None,
+        saved_model_dir: Optional[Path] = None
+    ) -> Optional[Path]:
+        """
+        Run the int8 stage. Returns the int8 .tflite path or None.
+
+        With calibration, quantizes the SavedModel from run() on that set
+        instead of exporting from .pt with Ultralytics' calibration.
+        """
+        return self.run_stage(
+            STAGE_INT8, export_int8_stage,
+            integer_io=integer_io,
+            calibration=calibration,
+            num_calibration_samples=num_calibration_samples,
+            tflite_path=str(tflite_path) if tflite_path else None,
+            saved_model_dir=str(saved_model_dir) if saved_model_dir else None
+        )
+
+    def run_uint8(self, saved_model_dir: Optional[Path]) -> Optional[Path]:
+        """Run the uint8 input stage on the SavedModel from run(). Returns the .tflite path or None."""
+        return self.run_stage(
+            STAGE_UINT8, export_uint8_stage,
+            saved_model_dir=str(saved_model_dir) if saved_model_dir else None
+        )
+
+    def run_prune(
+        self,
+        sparsity: float,
+        finetune_data: Optional[str] = None,
+        finetune_epochs: int = 3
+    ) -> Optional[Path]:
+        """Run the pruning stage. Returns the sparse .tflite path or None; stats are in outputs['prune']."""
+        return self.run_stage(
+            STAGE_PRUNE, export_pruned_stage,
+            sparsity=sparsity,
+            finetune_data=finetune_data, finetune_epochs=finetune_epochs
+        )
+
+    def report(self) -> Dict[str, Any]:
+        """Metadata section describing how the stages ran."""
+        return {
+            'isolated': self.isolate,
+            'dynamic': self.dynamic,
+            'onnx': self.onnx,
+            'limits': {
+                'address_space_mb': self.address_space_mb,
+                'rss_limit_mb': self.rss_limit_mb,
+                'timeout_s': self.stage_timeout,
+            },
+            'stages': self.stages,
+        }
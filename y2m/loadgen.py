@@ -0,0 +1,238 @@
+"""
+Y2M Load Generator Module
+
+Async load generator for the HTTP inference service (server.py). Each
+concurrency level runs N keep-alive connections in closed loop for a
+fixed duration and reports throughput, tail latency and 503 rate.
+A client that gets a 503 waits for the Retry-After the server sent (or
+REJECT_BACKOFF without one) before its next request, like a well-behaved
+client, instead of hammering the overloaded service.
+"""
+
+import time
+import asyncio
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import cv2
+import numpy as np
+
+from .runtime.stats import latency_stats
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait after a 503 without a Retry-After header
+REJECT_BACKOFF = 0.05
+
+
+def encode_frames(
+    frames: Sequence[np.ndarray],
+    raw: bool = False,
+    quality: int = 90
+) -> List[Tuple[bytes, Dict[str, str]]]:
+    """
+    Encode BGR frames as request bodies.
+
+    Returns:
+        List of (body, headers) pairs, JPEG unless raw
+    """
+    bodies = []
+    for frame in frames:
+        if raw:
+            frame = np.ascontiguousarray(frame, dtype=np.uint8)
+            bodies.append((frame.tobytes(), {
+                'Content-Type': 'application/octet-stream',
+                'X-Frame-Width': str(frame.shape[1]),
+                'X-Frame-Height': str(frame.shape[0]),
+            }))
+        else:
+            ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if not ok:
+                raise ValueError("JPEG encoding failed")
+            bodies.append((encoded.tobytes(), {'Content-Type': 'image/jpeg'}))
+    return bodies
+
+
+def _build_request(host: str, path: str, body: bytes, headers: Dict[str, str]) -> bytes:
+    head = f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(body)}\r\n"
+    head += ''.join(f"{name}: {value}\r\n" for name, value in headers.items())
+    return (head + "\r\n").encode('latin-1') + body
+
+
+async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, bool, Optional[float]]:
+    """Read one response; returns (status, server keeps the connection, Retry-After seconds)."""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ')[1])
+    length = 0
+    keep_alive = True
+    retry_after = None
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        name = name.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'connection':
+            keep_alive = value.strip().lower() != 'close'
+        elif name == 'retry-after':
+            # HTTP-date values are not used by server.py; fall back to REJECT_BACKOFF
+            try:
+                retry_after = max(float(value), 0.0)
+            except ValueError:
+                pass
+    if length:
+        await reader.readexactly(length)
+    return status, keep_alive, retry_after
+
+
+class _Level:
+    """Results of one concurrency level."""
+
+    def __init__(self):
+        self.latencies_ms: List[float] = []
+        self.rejected_ms: List[float] = []
+        self.errors = 0
+        self.connection_errors = 0
+        self.statuses: Dict[int, int] = {}
+
+
+async def _client(
+    host: str,
+    port: int,
+    path: str,
+    requests: List[bytes],
+    offset: int,
+    deadline: float,
+    results: _Level
+) -> None:
+    reader = writer = None
+    index = offset
+    try:
+        while time.perf_counter() < deadline:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+
+            start = time.perf_counter()
+            writer.write(requests[index % len(requests)])
+            index += 1
+            await writer.drain()
+            status, keep_alive, retry_after = await _read_response(reader)
+            elapsed = (time.perf_counter() - start) * 1000
+
+            results.statuses[status] = results.statuses.get(status, 0) + 1
+            if status == 200:
+                results.latencies_ms.append(elapsed)
+            elif status == 503:
+                results.rejected_ms.append(elapsed)
+            else:
+                results.errors += 1
+
+            if not keep_alive:
+                writer.close()
+                reader = writer = None
+
+            if status == 503:
+                backoff = REJECT_BACKOFF if retry_after is None else retry_after
+                await asyncio.sleep(max(min(backoff, deadline - time.perf_counter()), 0.0))
+    except (ConnectionError, asyncio.IncompleteReadError, OSError) as e:
+        logger.debug(f"Client connection failed: {e}")
+        results.errors += 1
+        results.connection_errors += 1
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+async def run_level(
+    url: str,
+    bodies: List[Tuple[bytes, Dict[str, str]]],
+    concurrency: int,
+    duration: float
+) -> dict:
+    """
+    Run one concurrency level.
+
+    Args:
+        url: Service base URL (http://host:port)
+        bodies: Request bodies from encode_frames(), sent round-robin
+        concurrency: Concurrent keep-alive connections
+        duration: Seconds to run
+
+    Returns:
+        Throughput (successful requests/s), latency stats of successful
+        requests, 503 count and latency, and error count (non-200/503
+        responses plus failed connections, the latter also counted
+        separately since they have no status)
+    """
+    parts = urlsplit(url)
+    host = parts.hostname or '127.0.0.1'
+    port = parts.port or 80
+    path = (parts.path.rstrip('/') or '') + '/v1/infer'
+    requests = [_build_request(f"{host}:{port}", path, body, headers) for body, headers in bodies]
+
+    results = _Level()
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(
+        _client(host, port, path, requests, i, deadline, results) for i in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+
+    total = sum(results.statuses.values())
+    report = {
+        'concurrency': concurrency,
+        'requests': total,
+        'throughput_rps': round(len(results.latencies_ms) / elapsed, 2),
+        'rejected': len(results.rejected_ms),
+        'rejected_rate': round(len(results.rejected_ms) / total, 4) if total else 0.0,
+        'errors': results.errors,
+        'connection_errors': results.connection_errors,
+        'statuses': results.statuses,
+    }
+    if results.latencies_ms:
+        report['latency_ms'] = latency_stats(results.latencies_ms)
+        report['latency_ms']['p99'] = round(float(np.percentile(results.latencies_ms, 99)), 3)
+    if results.rejected_ms:
+        report['rejected_latency_ms'] = latency_stats(results.rejected_ms)
+    return report
+
+
+async def run_loadgen(
+    url: str,
+    frames: Sequence[np.ndarray],
+    concurrency_levels: Sequence[int] = (1, 2, 4, 8, 16),
+    duration: float = 10.0,
+    raw: bool = False,
+    stop_on_errors: Optional[float] = 0.5
+) -> List[dict]:
+    """
+    Run rising concurrency levels against the service.
+
+    Args:
+        url: Service base URL
+        frames: BGR frames to send (round-robin)
+        concurrency_levels: Levels to run, in order
+        duration: Seconds per level
+        raw: Send raw BGR bodies instead of JPEG
+        stop_on_errors: Stop early once this fraction of a level's
+            requests failed outright (None to run every level)
+
+    Returns:
+        One report per level
+    """
+    bodies = encode_frames(frames, raw=raw)
+    reports = []
+    for concurrency in concurrency_levels:
+        report = await run_level(url, bodies, concurrency, duration)
+        reports.append(report)
+        latency = report.get('latency_ms', {})
+        logger.info(f"c={concurrency}: {report['throughput_rps']:.1f} req/s, "
+                    f"p50 {latency.get('p50', 0):.1f} ms, p99 {latency.get('p99', 0):.1f} ms, "
+                    f"503 {report['rejected_rate']:.1%}")
+        # Error responses are already in 'requests'; failed connections are not
+        attempted = report['requests'] + report['connection_errors']
+        if stop_on_errors is not None and attempted and report['errors'] / attempted > stop_on_errors:
+            logger.warning("Too many errors, stopping")
+            break
+    return reports
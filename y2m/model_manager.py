@@ -0,0 +1,432 @@
+"""
+Y2M Model Manager Module
+
+Zero-downtime model rollout for long-running detectors. A ModelManager
+watches a converted model directory, keyed off its metadata.json, and
+when a new conversion lands it:
+
+1. loads and warms the new interpreter on a background thread while the
+   old one keeps serving
+2. runs a few canary frames through it and rejects it if outputs are
+   not finite, the input/output interface changed, or it disagrees with
+   the live model
+3. swaps it in with a single pointer assignment between frames
+4. keeps the old interpreter until every in-flight request on it has
+   finished, then drops it
+
+Each swap is reported with its preparation time, swap and drain latency,
+and how requests fared while it was in progress: frame latency (acquire
+to release, so CPU contention from the background load and warmup shows
+up) against the frames before the swap, the longest gap between frames,
+and the frames that were missed (failed, or over the frame budget).
+"""
+
+import copy
+import time
+import hashlib
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from .runtime.detector import TFLiteDetector
+from .runtime.stats import latency_stats
+
+logger = logging.getLogger(__name__)
+
+METADATA_FILENAME = 'metadata.json'
+
+DEFAULT_POLL_INTERVAL = 2.0
+# Canary top-1 agreement with the live model required to swap
+DEFAULT_MIN_AGREEMENT = 0.8
+# A frame taking longer than this, acquire to release, counts as missed (30 fps)
+DEFAULT_FRAME_BUDGET_MS = 33.3
+# Recent frame latencies kept as the baseline for the next swap
+BASELINE_FRAMES = 100
+# Synthetic canary frames used when none are given (sanity checks only)
+SYNTHETIC_CANARIES = 4
+
+STATUS_SWAPPED = 'swapped'
+STATUS_REJECTED = 'rejected'
+STATUS_FAILED = 'failed'
+
+
+def model_signature(model_dir: Path) -> Optional[str]:
+    """
+    Version key of a model directory: metadata.json content plus the size
+    and mtime of every .tflite file. None while metadata.json is missing.
+    """
+    try:
+        digest = hashlib.sha256((model_dir / METADATA_FILENAME).read_bytes())
+    except OSError:
+        return None
+    for path in sorted(model_dir.glob('*.tflite')):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:12]
+
+
+def _frame_stats(samples_ms: Sequence[float]) -> Dict[str, float]:
+    """latency_stats plus the slowest frame, which is what a swap stalls."""
+    stats = latency_stats(samples_ms)
+    stats['max'] = round(float(np.max(samples_ms)), 3)
+    return stats
+
+
+def synthetic_canaries(height: int, width: int, count: int = SYNTHETIC_CANARIES) -> List[np.ndarray]:
+    """Deterministic noise frames; enough to catch broken models, not to compare them."""
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(count)]
+
+
+class ModelSlot:
+    """
+    One loaded model version.
+
+    The interpreter is not thread-safe: hold `lock` while invoking
+    `detector`. `refs` counts requests currently using the slot.
+    """
+
+    def __init__(self, detector: TFLiteDetector, version: str):
+        self.detector = detector
+        self.version = version
+        self.lock = threading.Lock()
+        self.refs = 0
+        self.retired = False
+        self.loaded_at = time.time()
+        # Canary outputs, for comparison with the next version
+        self.canary_scores: Optional[np.ndarray] = None
+        self.canary_shape: Optional[tuple] = None
+
+
+class ModelManager:
+    """
+    Serves the current version of a converted model and hot-swaps new ones.
+
+    Usage:
+        manager = ModelManager('converted_models')
+        manager.start()
+        with manager.acquire() as slot:
+            with slot.lock:
+                output = slot.detector.predict(frame)
+        manager.stop()
+    """
+
+    def __init__(
+        self,
+        model_dir: str,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        warmup_runs: int = 3,
+        canary_frames: Optional[Sequence[np.ndarray]] = None,
+        min_agreement: float = DEFAULT_MIN_AGREEMENT,
+        frame_budget_ms: float = DEFAULT_FRAME_BUDGET_MS,
+        loader: Optional[Callable[[str], TFLiteDetector]] = None
+    ):
+        """
+        Initialize the manager. Call start() (or load()) before serving.
+
+        Args:
+            model_dir: Directory with metadata.json and the .tflite models
+            poll_interval: Seconds between metadata.json checks
+            warmup_runs: Blank invocations before a version serves
+            canary_frames: BGR frames checked on every new version; top-1
+                agreement with the live model is only enforced for these
+                (synthetic frames are used otherwise)
+            min_agreement: Canary top-1 agreement required to swap (0
+                disables the check)
+            frame_budget_ms: Frame latency (acquire to release) beyond which
+                a frame counts as missed
+            loader: Builds a detector from model_dir (default:
+                TFLiteDetector.from_metadata)
+        """
+        self.model_dir = Path(model_dir)
+        self.poll_interval = poll_interval
+        self.warmup_runs = warmup_runs
+        self.canary_frames = list(canary_frames) if canary_frames is not None else None
+        self.min_agreement = min_agreement
+        self.frame_budget_ms = frame_budget_ms
+        self.loader = loader or TFLiteDetector.from_metadata
+
+        self.swaps: List[Dict[str, Any]] = []
+        self.frames = 0
+
+        self._lock = threading.Lock()
+        self._current: Optional[ModelSlot] = None
+        self._pending: Optional[str] = None
+        self._rejected: set = set()
+        # Report of the swap in progress (prepare start until the old version drains)
+        self._window: Optional[Dict[str, Any]] = None
+        self._drains: Dict[int, Dict[str, Any]] = {}
+        self._recent_frame_ms: deque = deque(maxlen=BASELINE_FRAMES)
+        self._last_frame_start: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._current.version if self._current else None
+
+    @property
+    def detector(self) -> Optional[TFLiteDetector]:
+        """Live detector (use acquire() to run it)."""
+        return self._current.detector if self._current else None
+
+    def load(self) -> None:
+        """Load and warm the current version synchronously."""
+        version = model_signature(self.model_dir)
+        if version is None:
+            raise FileNotFoundError(f"No {METADATA_FILENAME} in {self.model_dir}")
+        slot, _ = self._prepare(version)
+        self._current = slot
+        logger.info(f"[OK] Model ready: {self.model_dir} (version {version})")
+
+    def start(self) -> None:
+        """Load the current version (if needed) and start watching for new ones."""
+        if self._current is None:
+            self.load()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch_loop, name='y2m-model-watch', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching (the live version keeps serving)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=max(5.0, self.poll_interval * 2))
+            self._thread = None
+
+    @contextmanager
+    def acquire(self) -> Iterator[ModelSlot]:
+        """
+        Borrow the live version for one request.
+
+        A swap never waits for requests: requests that already hold the
+        old version finish on it, and the old interpreter is dropped when
+        the last of them releases it.
+
+        The whole borrowed section is timed, so a frame that is slowed
+        down by a swap in progress (e.g. the new version loading on the
+        same cores) is counted in the swap report.
+        """
+        start = time.perf_counter()
+        with self._lock:
+            slot = self._current
+            if slot is None:
+                raise RuntimeError("No model loaded")
+            slot.refs += 1
+            self.frames += 1
+            window = self._window
+            if window is not None and self._last_frame_start is not None:
+                gap_ms = (start - self._last_frame_start) * 1000
+                window['max_gap_ms'] = round(max(window['max_gap_ms'], gap_ms), 3)
+            self._last_frame_start = start
+
+        failed = False
+        try:
+            yield slot
+        except Exception:
+            failed = True
+            raise
+        finally:
+            frame_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                slot.refs -= 1
+                # A window closed while this frame ran has already been reported
+                if window is not None and '_frame_ms' in window:
+                    window['_frame_ms'].append(frame_ms)
+                    if failed or frame_ms > self.frame_budget_ms:
+                        window['missed_frames'] += 1
+                    if window['status'] is None:
+                        window['frames_during_prepare'] += 1
+                elif window is None and not failed:
+                    self._recent_frame_ms.append(frame_ms)
+                if slot.retired and slot.refs == 0:
+                    self._release(slot)
+
+    def check_for_update(self) -> Optional[Dict[str, Any]]:
+        """
+        One poll: swap in a new version if metadata.json changed and has
+        been stable for one poll interval.
+
+        Returns:
+            Swap report if a new version was tried, else None
+        """
+        version = model_signature(self.model_dir)
+        if version is None or version == self.version or version in self._rejected:
+            self._pending = None
+            return None
+        # Conversions write several files; wait until nothing changed for a poll
+        if version != self._pending:
+            self._pending = version
+            return None
+        self._pending = None
+        return self.update(version)
+
+    def update(self, version: str) -> Dict[str, Any]:
+        """Load, check and swap in a version. Returns its swap report."""
+        report = {
+            'version': version,
+            'previous_version': self.version,
+            'status': None,
+            'started_at': time.time(),
+            'frames_during_prepare': 0,
+            'missed_frames': 0,
+            'max_gap_ms': 0.0,
+            '_frame_ms': [],
+        }
+        with self._lock:
+            if self._recent_frame_ms:
+                report['baseline_frame_ms'] = _frame_stats(self._recent_frame_ms)
+            self._window = report
+        start = time.perf_counter()
+
+        try:
+            slot, timings = self._prepare(version)
+            report.update(timings)
+            report['canary'] = self._check_canaries(slot)
+        except Exception as e:
+            logger.error(f"Loading version {version} failed: {e}")
+            # Retried once any file changes again (new signature)
+            self._rejected.add(version)
+            report.update(status=STATUS_FAILED, error=str(e))
+            return self._finish(report)
+        report['prepare_ms'] = round((time.perf_counter() - start) * 1000, 3)
+
+        if report['canary'].get('error'):
+            logger.error(f"Version {version} rejected: {report['canary']['error']}")
+            self._rejected.add(version)
+            report['status'] = STATUS_REJECTED
+            return self._finish(report)
+
+        # The swap itself: a pointer assignment between two acquire() calls
+        swap_start = time.perf_counter()
+        with self._lock:
+            old, self._current = self._current, slot
+            report['status'] = STATUS_SWAPPED
+            report['swap_ms'] = round((time.perf_counter() - swap_start) * 1000, 3)
+            report['in_flight_at_swap'] = old.refs if old else 0
+            if old is not None:
+                old.retired = True
+                self._drains[id(old)] = {'report': report, 'start': swap_start}
+                if old.refs == 0:
+                    self._release(old)
+            else:
+                self._close_window(report)
+            # Still updated under the lock until the old version drains
+            self.swaps.append(report)
+        return report
+
+    def _prepare(self, version: str):
+        """Load, warm and canary-run a new version off the serving path."""
+        load_start = time.perf_counter()
+        detector = self.loader(str(self.model_dir))
+        load_ms = (time.perf_counter() - load_start) * 1000
+
+        warmup_start = time.perf_counter()
+        detector.warmup(self.warmup_runs)
+        warmup_ms = (time.perf_counter() - warmup_start) * 1000
+
+        slot = ModelSlot(detector, version)
+        outputs = [np.array(detector.predict(frame)) for frame in self._canaries(detector)]
+        slot.canary_shape = tuple(outputs[0].shape)
+        slot.canary_scores = np.stack([detector.class_scores(output) for output in outputs])
+        if not all(np.isfinite(output).all() for output in outputs):
+            slot.canary_scores = None
+        return slot, {'load_ms': round(load_ms, 3), 'warmup_ms': round(warmup_ms, 3)}
+
+    def _canaries(self, detector: TFLiteDetector) -> List[np.ndarray]:
+        if self.canary_frames:
+            return self.canary_frames
+        return synthetic_canaries(detector.input_height, detector.input_width)
+
+    def _check_canaries(self, slot: ModelSlot) -> Dict[str, Any]:
+        """Compare a prepared version's canary outputs with the live version's."""
+        result = {'frames': len(self._canaries(slot.detector)), 'synthetic': not self.canary_frames}
+        if slot.canary_scores is None:
+            result['error'] = 'non-finite outputs on canary frames'
+            return result
+
+        live = self._current
+        if live is None or live.canary_scores is None:
+            return result
+        # Clients cache the interface (e.g. DaemonClient decodes with the
+        # output quantization it read once), so a swap must not change it
+        if slot.canary_shape != live.canary_shape:
+            result['error'] = f"output shape changed from {live.canary_shape} to {slot.canary_shape}"
+            return result
+        if slot.detector.input_dtype != live.detector.input_dtype:
+            result['error'] = f"input type changed from {live.detector.input_dtype} to {slot.detector.input_dtype}"
+            return result
+        if slot.detector.output_quantization != live.detector.output_quantization:
+            result['error'] = "output quantization changed"
+            return result
+
+        agreement = float((slot.canary_scores.argmax(axis=-1) == live.canary_scores.argmax(axis=-1)).mean())
+        result['agreement'] = round(agreement, 4)
+        if self.canary_frames and agreement < self.min_agreement:
+            result['error'] = f"canary agreement {agreement:.1%} below {self.min_agreement:.1%}"
+        return result
+
+    def _release(self, slot: ModelSlot) -> None:
+        """Drop a drained version. Called with self._lock held."""
+        drain = self._drains.pop(id(slot), None)
+        slot.detector = None
+        if drain is None:
+            return
+        report = drain['report']
+        report['drain_ms'] = round((time.perf_counter() - drain['start']) * 1000, 3)
+        self._close_window(report)
+        frame_ms = report.get('frame_ms')
+        logger.info(f"[OK] Swapped {self.model_dir} to version {report['version']}: "
+                     f"prepare {report['prepare_ms']:.0f} ms, swap {report['swap_ms']:.3f} ms, "
+                     f"drain {report['drain_ms']:.1f} ms, {report['missed_frames']} of "
+                     f"{report['frames_during_swap']} frame(s) missed"
+                     + (f", max frame {frame_ms['max']:.1f} ms" if frame_ms else ''))
+
+    def _close_window(self, report: Dict[str, Any]) -> None:
+        """Summarize the frames seen during a swap. Called with self._lock held."""
+        samples = report.pop('_frame_ms', [])
+        report['frames_during_swap'] = len(samples)
+        if samples:
+            report['frame_ms'] = _frame_stats(samples)
+        if self._window is report:
+            self._window = None
+
+    def _finish(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self._close_window(report)
+            self.swaps.append(report)
+        return report
+
+    def _watch_loop(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check_for_update()
+            except Exception:
+                logger.exception(f"Model watch failed for {self.model_dir}")
+
+    def describe(self) -> Dict[str, Any]:
+        """
+        Live version and swap history.
+
+        A snapshot taken under the lock: a swap still draining keeps
+        updating its report, so callers get copies (without the raw frame
+        samples) that are safe to serialize.
+        """
+        with self._lock:
+            return {
+                'model_dir': str(self.model_dir),
+                'version': self.version,
+                'frames': self.frames,
+                'swaps': [
+                    copy.deepcopy({key: value for key, value in report.items() if not key.startswith('_')})
+                    for report in self.swaps
+                ],
+            }
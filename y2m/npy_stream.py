@@ -0,0 +1,100 @@
+"""
+Y2M NPY Streaming Module
+
+Append-only writer for .npy files of unknown final length. Rows are
+streamed straight to disk and the header is patched on close, so the
+result can be opened with np.load(..., mmap_mode='r') without ever
+holding the array in memory.
+"""
+
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+
+_MAGIC = b'\x93NUMPY\x01\x00'
+
+# Row count used to size the reserved header; any real count fits in it
+_PLACEHOLDER_ROWS = 10 ** 15
+
+
+def _header_text(dtype: np.dtype, shape: Tuple[int, ...]) -> str:
+    descr = np.lib.format.dtype_to_descr(dtype)
+    return "{'descr': %r, 'fortran_order': False, 'shape': %r, }" % (descr, shape)
+
+
+class NpyStreamWriter:
+    """
+    Streams fixed-shape rows into a version 1.0 .npy file.
+
+    Example:
+        with NpyStreamWriter('frames.npy', (128, 128, 3), np.float32) as writer:
+            for frame in frames:
+                writer.append(frame)
+    """
+
+    def __init__(self, path: str, row_shape: Tuple[int, ...], dtype=np.float32):
+        """
+        Create the file and reserve its header.
+
+        Args:
+            path: Output .npy path (overwritten if it exists)
+            row_shape: Shape of a single row
+            dtype: Row dtype (plain or structured)
+        """
+        self.path = Path(path)
+        self.row_shape = tuple(int(d) for d in row_shape)
+        self.dtype = np.dtype(dtype)
+        self.count = 0
+
+        # Reserve room for the largest header we could ever need, padded to
+        # the 64-byte alignment numpy expects for the data offset
+        placeholder = _header_text(self.dtype, (_PLACEHOLDER_ROWS,) + self.row_shape)
+        self.header_size = -(-(len(_MAGIC) + 2 + len(placeholder) + 1) // 64) * 64
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'wb')
+        self._write_header()
+
+    def _write_header(self) -> None:
+        text = _header_text(self.dtype, (self.count,) + self.row_shape)
+        text = text.ljust(self.header_size - len(_MAGIC) - 2 - 1) + '\n'
+        self._file.seek(0)
+        self._file.write(_MAGIC + len(text).to_bytes(2, 'little') + text.encode('latin1'))
+
+    def append(self, rows: np.ndarray) -> None:
+        """Append a single row or a batch of rows."""
+        rows = np.asarray(rows)
+        if rows.shape == self.row_shape:
+            rows = rows[np.newaxis]
+        if rows.shape[1:] != self.row_shape:
+            raise ValueError(f"Row shape {rows.shape[1:]} does not match {self.row_shape}")
+
+        rows = np.ascontiguousarray(rows, dtype=self.dtype)
+        self._file.write(rows.data.cast('B'))
+        self.count += len(rows)
+
+    def flush(self) -> None:
+        """
+        Make everything appended so far readable: rewrite the header with
+        the current row count and push data to the OS.
+        """
+        self._write_header()
+        self._file.seek(0, 2)
+        self._file.flush()
+
+    def close(self) -> Path:
+        """Patch the header with the final row count and close the file."""
+        if self._file is not None:
+            self._file.flush()
+            self._write_header()
+            self._file.close()
+            self._file = None
+        return self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
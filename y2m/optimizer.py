@@ -5,9 +5,12 @@ Handles post-training quantization for mobile optimization.
 Converts FP32 weights to Int8 for 4x size reduction.
 """
 
+import io
+import csv
+import shutil
 import logging
 from pathlib import Path
-from typing import Optional, Callable
+from typing import Any, Callable, Dict, List, Optional, Sequence
 import numpy as np
 
 logger = logging.getLogger(__name__)
@@ -22,16 +25,24 @@ class ModelOptimizer:
     - Int8 Post-Training Quantization (for mobile deployment)
     """
     
-    def __init__(self, tflite_path: str, output_dir: str):
+    def __init__(
+        self,
+        tflite_path: str,
+        output_dir: str,
+        calibration_data: Optional[str] = None
+    ):
         """
         Initialize the optimizer.
         
         Args:
             tflite_path: Path to the float32 TFLite model
             output_dir: Directory for output files
+            calibration_data: Calibration .npy built by `y2m calib build`
+                (random data is used if None)
         """
         self.tflite_path = Path(tflite_path)
         self.output_dir = Path(output_dir)
+        self.calibration_data = calibration_data
         
     def _representative_dataset_generator(
         self, 
@@ -48,6 +59,16 @@ class ModelOptimizer:
         Returns:
             Generator function yielding sample inputs
         """
+        if self.calibration_data:
+            from .calibration import calibration_generator
+            
+            logger.info(f"  Calibration data: {self.calibration_data}")
+            return calibration_generator(
+                self.calibration_data,
+                num_samples=num_samples,
+                input_shape=input_shape
+            )
+        
         def generator():
             for _ in range(num_samples):
                 # Generate random calibration data
@@ -60,7 +81,9 @@ class ModelOptimizer:
     def quantize_int8(
         self,
         num_calibration_samples: int = 100,
-        input_shape: tuple = (1, 640, 640, 3)
+        input_shape: tuple = (1, 640, 640, 3),
+        saved_model_dir: Optional[str] = None,
+        integer_io: bool = False
     ) -> Optional[Path]:
         """
         Apply Int8 post-training quantization.
@@ -68,6 +91,10 @@ class ModelOptimizer:
         Args:
             num_calibration_samples: Number of samples for calibration
             input_shape: Input tensor shape (NHWC format)
+            saved_model_dir: SavedModel to quantize (found next to the
+                float model if None)
+            integer_io: Use int8 input and output tensors (full-integer
+                model) instead of float
             
         Returns:
             Path to the quantized model, or None if failed
@@ -80,13 +107,35 @@ class ModelOptimizer:
             
             # Load the float32 model
             converter = tf.lite.TFLiteConverter.from_saved_model(
-                str(self._find_saved_model_dir())
+                str(saved_model_dir or self._find_saved_model_dir())
             )
             
-            # If no saved model, try converting from TFLite
-            # This is a fallback approach
+            # Calibrate with the representative dataset (streamed lazily)
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+            converter.representative_dataset = self._representative_dataset_generator(
+                num_calibration_samples,
+                input_shape
+            )
+            converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+            if integer_io:
+                converter.inference_input_type = tf.int8
+                converter.inference_output_type = tf.int8
+            tflite_model = converter.convert()
             
-        except Exception:
+            output_name = f"{self.tflite_path.stem.replace('_float32', '')}_int8.tflite"
+            output_path = self.output_dir / output_name
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            output_path.write_bytes(tflite_model)
+            
+            logger.info(f"[OK] Int8 model saved: {output_name}")
+            return output_path
+            
+        except Exception as e:
+            if self.calibration_data:
+                # The fallback below ignores the calibration set
+                logger.error(f"Int8 quantization failed: {e}")
+                return None
+            # No SavedModel (or conversion failed)
             # Fallback: Read the TFLite file and re-quantize
             return self._quantize_from_tflite(
                 num_calibration_samples, 
@@ -106,14 +155,10 @@ class ModelOptimizer:
         a representative dataset.
         """
         try:
-            import tensorflow as tf
+            from .tflite_inspect import inspect_model
             
             logger.info("Applying dynamic range quantization...")
             
-            # Read the original model
-            with open(self.tflite_path, 'rb') as f:
-                model_content = f.read()
-            
             # For proper Int8 quantization, we need the SavedModel
             # However, we can apply dynamic range quantization to the TFLite
             # This gives partial benefits without full calibration
@@ -122,12 +167,9 @@ class ModelOptimizer:
             output_name = f"{self.tflite_path.stem.replace('_float32', '')}_int8.tflite"
             output_path = self.output_dir / output_name
             
-            # Use the interpreter to get model details
-            interpreter = tf.lite.Interpreter(model_content=model_content)
-            interpreter.allocate_tensors()
-            
-            input_details = interpreter.get_input_details()
-            logger.info(f"  Input shape: {input_details[0]['shape']}")
+            # Read model details from the flatbuffer (no interpreter needed)
+            report = inspect_model(self.tflite_path)
+            logger.info(f"  Input shape: {report['inputs'][0]['shape']}")
             
             # For full Int8 quantization, we'd need to re-export from YOLO
             # with int8 flag. For now, copy as a placeholder.
@@ -153,15 +195,226 @@ class ModelOptimizer:
     
     def _find_saved_model_dir(self) -> Optional[Path]:
         """Find the SavedModel directory if it exists."""
-        # Look for saved_model directory in parent
+        # Ultralytics writes the .tflite files inside the SavedModel directory
         parent = self.tflite_path.parent
+        if (parent / 'saved_model.pb').exists():
+            return parent
+        # Look for saved_model directory in parent
         for item in parent.iterdir():
             if item.is_dir() and 'saved_model' in item.name.lower():
                 return item
         return None
+    
+    def _input_shape(self) -> tuple:
+        """Input shape of the float TFLite model."""
+        from .runtime.detector import create_interpreter
+        
+        interpreter = create_interpreter(str(self.tflite_path))
+        return tuple(int(d) for d in interpreter.get_input_details()[0]['shape'])
+    
+    def _debug_converter(self, saved_model_dir: Path, num_samples: int, input_shape: tuple):
+        import tensorflow as tf
+        
+        converter = tf.lite.TFLiteConverter.from_saved_model(str(saved_model_dir))
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = self._representative_dataset_generator(num_samples, input_shape)
+        return converter
+    
+    def analyze_layers(
+        self,
+        num_debug_samples: int = 32,
+        num_calibration_samples: int = 100,
+        saved_model_dir: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Run the float and int8 models side by side on calibration data and
+        measure the quantization error of every quantized layer output.
+        
+        Uses tf.lite.experimental.QuantizationDebugger. Layers are ranked
+        by RMSE divided by the quantization scale: about 0.29 (1/sqrt(12))
+        is plain rounding noise, much larger values mean the int8 range
+        does not fit the layer.
+        
+        Args:
+            num_debug_samples: Samples run through both models
+            num_calibration_samples: Samples used to calibrate the int8 model
+            saved_model_dir: SavedModel to quantize (found next to the
+                float model if None)
+            
+        Returns:
+            Per-layer statistics, worst first
+        """
+        import tensorflow as tf
+        
+        saved_model_dir = Path(saved_model_dir) if saved_model_dir else self._find_saved_model_dir()
+        if saved_model_dir is None:
+            raise FileNotFoundError(f"No SavedModel found next to {self.tflite_path}")
+        
+        input_shape = self._input_shape()
+        logger.info(f"Analyzing per-layer quantization error ({num_debug_samples} samples)...")
+        
+        debugger = tf.lite.experimental.QuantizationDebugger(
+            converter=self._debug_converter(saved_model_dir, num_calibration_samples, input_shape),
+            debug_dataset=self._representative_dataset_generator(num_debug_samples, input_shape),
+            debug_options=tf.lite.experimental.QuantizationDebugOptions(
+                layer_debug_metrics={'mean_abs_error': lambda diff: float(np.mean(np.abs(diff)))}
+            )
+        )
+        debugger.run()
+        
+        buffer = io.StringIO()
+        debugger.layer_statistics_dump(buffer)
+        buffer.seek(0)
+        
+        layers = []
+        for row in csv.DictReader(buffer):
+            scale = float(row.get('scale') or 0.0)
+            mse = float(row.get('mean_squared_error') or 0.0)
+            layers.append({
+                'tensor_name': row['tensor_name'],
+                'op_name': row.get('op_name', ''),
+                'num_elements': int(float(row.get('num_elements') or 0)),
+                'scale': scale,
+                'mean_abs_error': float(row.get('mean_abs_error') or 0.0),
+                'max_abs_error': float(row.get('max_abs_error') or 0.0),
+                'rmse': float(np.sqrt(mse)),
+                'rmse_per_scale': float(np.sqrt(mse) / scale) if scale else 0.0,
+            })
+        
+        layers.sort(key=lambda layer: layer['rmse_per_scale'], reverse=True)
+        for layer in layers[:5]:
+            logger.info(f"  {layer['op_name']:<18} rmse/scale {layer['rmse_per_scale']:.3f}  {layer['tensor_name']}")
+        return layers
+    
+    def quantize_mixed_precision(
+        self,
+        max_accuracy_drop: float = 0.01,
+        denylist_steps: Sequence[int] = (0, 1, 2, 4, 8, 16),
+        num_debug_samples: int = 32,
+        num_calibration_samples: int = 100,
+        latency_runs: int = 30,
+        saved_model_dir: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Int8 quantization with the most sensitive layers kept in float.
+        
+        For each step k, the k worst layers from analyze_layers() are
+        denylisted and the model is re-quantized. Every candidate is scored
+        on the calibration set (accuracy if it has labels, otherwise
+        agreement with the float model) and timed on this machine. The
+        fastest candidate within max_accuracy_drop of the float model is
+        saved as <stem>_int8_mixed.tflite.
+        
+        Args:
+            max_accuracy_drop: Allowed drop vs the float model
+            denylist_steps: Numbers of worst layers to keep in float
+            num_debug_samples: Samples for the per-layer analysis
+            num_calibration_samples: Samples used to calibrate
+            latency_runs: Timed inferences per candidate
+            saved_model_dir: SavedModel to quantize (found next to the
+                float model if None)
+            
+        Returns:
+            Report with layer statistics, every candidate and the chosen
+            one (None if nothing met the budget), or None if failed
+        """
+        if not self.calibration_data:
+            logger.error("Mixed precision needs a calibration set (y2m calib build)")
+            return None
+        
+        try:
+            import tensorflow as tf
+            from .calibration import load_calibration_set, sample_to_frame
+            from .tuner import benchmark_model, predict_top1
+            
+            saved_model_dir = Path(saved_model_dir) if saved_model_dir else self._find_saved_model_dir()
+            if saved_model_dir is None:
+                raise FileNotFoundError(f"No SavedModel found next to {self.tflite_path}")
+            
+            layers = self.analyze_layers(num_debug_samples, num_calibration_samples, saved_model_dir)
+            
+            data, labels, _ = load_calibration_set(self.calibration_data)
+            frames = [sample_to_frame(sample) for sample in data]
+            reference = predict_top1(self.tflite_path, frames)
+            if labels is not None and len(labels) == len(frames) and (labels >= 0).all():
+                target = labels.astype(np.int64)
+            else:
+                target = reference
+            float_accuracy = float((reference == target).mean())
+            
+            candidates_dir = self.output_dir / 'quant_debug'
+            candidates_dir.mkdir(parents=True, exist_ok=True)
+            stem = self.tflite_path.stem.replace('_float32', '')
+            input_shape = self._input_shape()
+            
+            candidates = [{
+                'name': 'float32',
+                'model': str(self.tflite_path),
+                'denylisted': None,
+                'size_mb': round(self.tflite_path.stat().st_size / 1024 / 1024, 3),
+                'latency_ms': benchmark_model(self.tflite_path, frames, latency_runs),
+                'accuracy': round(float_accuracy, 4),
+                'accuracy_drop': 0.0,
+            }]
+            
+            steps = sorted({min(k, len(layers)) for k in denylist_steps})
+            for k in steps:
+                denylist = [layer['tensor_name'] for layer in layers[:k]]
+                logger.info(f"Quantizing with {k} layer(s) kept in float...")
+                debugger = tf.lite.experimental.QuantizationDebugger(
+                    converter=self._debug_converter(saved_model_dir, num_calibration_samples, input_shape),
+                    debug_dataset=self._representative_dataset_generator(1, input_shape),
+                    debug_options=tf.lite.experimental.QuantizationDebugOptions(denylisted_nodes=denylist)
+                )
+                path = candidates_dir / f"{stem}_int8_deny{k}.tflite"
+                path.write_bytes(debugger.get_nondebug_quantized_model())
+                
+                accuracy = float((predict_top1(path, frames) == target).mean())
+                candidates.append({
+                    'name': f"int8_deny{k}",
+                    'model': str(path),
+                    'denylisted': denylist,
+                    'size_mb': round(path.stat().st_size / 1024 / 1024, 3),
+                    'latency_ms': benchmark_model(path, frames, latency_runs),
+                    'accuracy': round(accuracy, 4),
+                    'accuracy_drop': round(float_accuracy - accuracy, 4),
+                })
+                logger.info(f"  {candidates[-1]['name']}: acc {accuracy:.4f}, "
+                            f"p50 {candidates[-1]['latency_ms']['p50']:.2f} ms")
+            
+            eligible = [c for c in candidates[1:] if c['accuracy_drop'] <= max_accuracy_drop]
+            best = min(eligible, key=lambda c: c['latency_ms']['p50']) if eligible else None
+            
+            if best is not None:
+                output_path = self.output_dir / f"{stem}_int8_mixed.tflite"
+                shutil.copy2(best['model'], output_path)
+                best = {**best, 'model': str(output_path)}
+                logger.info(f"[OK] Mixed-precision model saved: {output_path.name} "
+                            f"({len(best['denylisted'])} float layer(s))")
+            else:
+                logger.warning("No int8 candidate stayed within the accuracy budget")
+            
+            return {
+                'float_model': str(self.tflite_path),
+                'labeled': target is not reference,
+                'samples': len(frames),
+                'max_accuracy_drop': max_accuracy_drop,
+                'layers': layers,
+                'candidates': candidates,
+                'best': best,
+            }
+            
+        except Exception as e:
+            logger.error(f"Mixed-precision quantization failed: {e}")
+            return None
 
 
-def quantize_with_ultralytics(model_path: str, output_dir: str) -> Optional[Path]:
+def quantize_with_ultralytics(
+    model_path: str,
+    output_dir: str,
+    input_size: tuple = (640, 640),
+    integer_io: bool = False
+) -> Optional[Path]:
     """
     Use Ultralytics built-in Int8 export for best results.
     
@@ -171,6 +424,10 @@ def quantize_with_ultralytics(model_path: str, output_dir: str) -> Optional[Path
     Args:
         model_path: Path to the original .pt model
         output_dir: Output directory
+        input_size: Fixed input dimensions (height, width)
+        integer_io: Keep the full-integer variant (int8 input and output
+            tensors; TFLiteDetector quantizes pixels and dequantizes
+            scores itself) instead of the float-I/O model
         
     Returns:
         Path to the quantized model, or None if failed
@@ -186,12 +443,18 @@ def quantize_with_ultralytics(model_path: str, output_dir: str) -> Optional[Path
         int8_path = model.export(
             format='tflite',
             int8=True,
-            imgsz=(640, 640),
+            imgsz=input_size,
             dynamic=False
         )
         
         # Move to output directory
         source = Path(int8_path)
+        if integer_io:
+            full_integer = sorted(source.parent.glob('*_full_integer_quant.tflite'))
+            if full_integer:
+                source = full_integer[0]
+            else:
+                logger.warning("No full-integer model found, keeping float input/output")
         dest_name = f"{Path(model_path).stem}_int8.tflite"
         dest = Path(output_dir) / dest_name
         
@@ -0,0 +1,220 @@
+"""
+Y2M Profiling Module
+
+Per-stage wall time, CPU time, peak memory and artifact sizes for the
+conversion CLI (--profile), with an optional cProfile capture of the
+main process (--profile-python).
+"""
+
+import io
+import json
+import time
+import pstats
+import logging
+import cProfile
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from .isolation import _cpu_time_s, _maxrss_mb, _proc_status_mb
+
+logger = logging.getLogger(__name__)
+
+PROFILE_FILENAME = 'profile.json'
+PYTHON_PROFILE_FILENAME = 'profile.prof'
+
+# Functions listed in the JSON report from the cProfile capture
+TOP_FUNCTIONS = 25
+
+
+def _cpu_seconds() -> Optional[float]:
+    """User + system CPU time of this process and its reaped children."""
+    own = _cpu_time_s()
+    return None if own is None else own + _cpu_time_s(children=True)
+
+
+def _children_peak_mb() -> Optional[float]:
+    """Largest peak RSS of any reaped child process."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    return _maxrss_mb(resource.getrusage(resource.RUSAGE_CHILDREN))
+
+
+def _reset_peak_rss() -> bool:
+    """
+    Reset this process's VmHWM so the next reading covers one stage.
+
+    Writing 5 to /proc/self/clear_refs (Linux 4.0+) resets the peak;
+    elsewhere readings fall back to the process-wide peak.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _self_peak_mb() -> Optional[float]:
+    peak = _proc_status_mb('self', 'VmHWM')
+    if peak is not None:
+        return peak
+    try:
+        import resource
+    except ImportError:
+        return None
+    return _maxrss_mb(resource.getrusage(resource.RUSAGE_SELF))
+
+
+def artifact_size(path: Union[str, Path]) -> Optional[int]:
+    """Size in bytes of a file, or of all files under a directory."""
+    path = Path(path)
+    if path.is_file():
+        return path.stat().st_size
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.rglob('*') if p.is_file())
+    return None
+
+
+class StageProfiler:
+    """
+    Records one entry per stage of a run.
+
+    Usage:
+        profiler = StageProfiler()
+        with profiler.stage('validation'):
+            ...
+        with profiler.stage('export') as record:
+            ...
+            record['artifacts'] = [tflite_path]
+        profiler.write(output_dir)
+    """
+
+    def __init__(self, python_profile: bool = False):
+        """
+        Initialize the profiler and start the run clock.
+
+        Args:
+            python_profile: Capture a cProfile of this process (stages in
+                isolated child processes are not included)
+        """
+        self.stages: List[Dict[str, Any]] = []
+        self.started_at = datetime.now().isoformat()
+        self._start = time.perf_counter()
+        self._cpu_start = _cpu_seconds()
+        self._profile = cProfile.Profile() if python_profile else None
+        if self._profile is not None:
+            self._profile.enable()
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Time a stage.
+
+        Yields the stage record. Callers may set 'artifacts' (paths,
+        replaced by their sizes on exit), 'stages' (sub-stage records) or
+        any other key.
+        """
+        record: Dict[str, Any] = {'stage': name}
+        per_stage_peak = _reset_peak_rss()
+        children_peak = _children_peak_mb()
+        cpu_start = _cpu_seconds()
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record['error'] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record['wall_time_s'] = round(time.perf_counter() - start, 3)
+            cpu_end = _cpu_seconds()
+            record['cpu_time_s'] = round(cpu_end - cpu_start, 3) if cpu_start is not None else None
+
+            peak = _self_peak_mb()
+            # Children that ran (and were reaped) during the stage count too
+            child_peak = _children_peak_mb()
+            if child_peak is not None and child_peak > (children_peak or 0):
+                peak = max(peak or 0, child_peak)
+            record['peak_rss_mb'] = round(peak, 1) if peak else None
+            record['peak_rss_scope'] = 'stage' if per_stage_peak else 'process'
+
+            artifacts = record.pop('artifacts', None)
+            if artifacts:
+                record['artifacts'] = {
+                    Path(p).name: artifact_size(p) for p in artifacts if p is not None
+                }
+            self.stages.append(record)
+
+    def add_stage_records(self, parent: Dict[str, Any], records: Iterable[Dict[str, Any]]) -> None:
+        """Attach sub-stage records (e.g. ExportPipeline.stages) to a stage record."""
+        parent.setdefault('stages', []).extend(dict(r) for r in records)
+
+    def _python_profile(self, output_dir: Path) -> Optional[Dict[str, Any]]:
+        if self._profile is None:
+            return None
+        self._profile.disable()
+        prof_path = output_dir / PYTHON_PROFILE_FILENAME
+        self._profile.dump_stats(str(prof_path))
+
+        stats = pstats.Stats(self._profile, stream=io.StringIO())
+        stats.sort_stats(pstats.SortKey.CUMULATIVE)
+        top = []
+        for func in stats.fcn_list[:TOP_FUNCTIONS]:
+            calls, _, total, cumulative, _ = stats.stats[func]
+            filename, line, function = func
+            top.append({
+                'function': f"{Path(filename).name}:{line}({function})",
+                'calls': calls,
+                'total_s': round(total, 3),
+                'cumulative_s': round(cumulative, 3),
+            })
+        return {'file': prof_path.name, 'top_cumulative': top}
+
+    def report(self, output_dir: Optional[Path] = None) -> Dict[str, Any]:
+        """Profile report; stops the cProfile capture when output_dir is given."""
+        cpu_end = _cpu_seconds()
+        try:
+            import resource
+            peak = max(
+                _maxrss_mb(resource.getrusage(resource.RUSAGE_SELF)),
+                _maxrss_mb(resource.getrusage(resource.RUSAGE_CHILDREN))
+            )
+        except ImportError:
+            peak = None
+
+        report = {
+            'started_at': self.started_at,
+            'total': {
+                'wall_time_s': round(time.perf_counter() - self._start, 3),
+                'cpu_time_s': round(cpu_end - self._cpu_start, 3) if self._cpu_start is not None else None,
+                'peak_rss_mb': round(peak, 1) if peak else None,
+            },
+            'stages': self.stages,
+        }
+        if output_dir is not None:
+            python_profile = self._python_profile(Path(output_dir))
+            if python_profile:
+                report['python_profile'] = python_profile
+        return report
+
+    def write(self, output_dir: Union[str, Path]) -> Path:
+        """Write the report as output_dir/profile.json."""
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        path = output_dir / PROFILE_FILENAME
+        with open(path, 'w') as f:
+            json.dump(self.report(output_dir), f, indent=2)
+        logger.info(f"[OK] Profile saved: {path}")
+        return path
+
+    def summary(self) -> str:
+        """Text table of the top-level stages."""
+        lines = [f"   {'Stage':<14} {'Wall':>9} {'CPU':>9} {'Peak RSS':>10}"]
+        for record in self.stages:
+            cpu = f"{record['cpu_time_s']:.1f}s" if record.get('cpu_time_s') is not None else 'n/a'
+            peak = f"{record['peak_rss_mb']:.0f} MB" if record.get('peak_rss_mb') else 'n/a'
+            lines.append(f"   {record['stage']:<14} {record['wall_time_s']:>8.1f}s {cpu:>9} {peak:>10}")
+        return '\n'.join(lines)
@@ -0,0 +1,154 @@
+"""
+Y2M Protocol Module
+
+Compact binary frame protocol spoken between the inference daemon and
+its clients over a Unix domain socket.
+
+Frame layout (little-endian):
+    header   magic(4s) op(B) dtype(B) ndim(B) flags(B) name_len(H) payload_len(I)
+    shape    ndim x uint32
+    name     name_len bytes (UTF-8 model name)
+    payload  payload_len bytes (raw array data, UTF-8 text or JSON)
+
+Requests and responses share the layout; in responses ``op`` carries
+the status code.
+"""
+
+import os
+import json
+import socket
+import struct
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b'Y2M1'
+HEADER = struct.Struct('<4sBBBBHI')
+
+DEFAULT_SOCKET_PATH = os.environ.get('Y2M_SOCKET', '/tmp/y2m-inference.sock')
+
+# Request operations
+OP_PING = 0
+OP_INFER = 1
+OP_MODELS = 2
+
+# Response status codes
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+# Payload dtypes
+DTYPE_BYTES = 0
+DTYPE_JSON = 1
+DTYPE_UINT8 = 2
+DTYPE_INT8 = 3
+DTYPE_FLOAT32 = 4
+DTYPE_FLOAT16 = 5
+DTYPE_INT32 = 6
+
+_NUMPY_DTYPES = {
+    DTYPE_UINT8: np.dtype(np.uint8),
+    DTYPE_INT8: np.dtype(np.int8),
+    DTYPE_FLOAT32: np.dtype('<f4'),
+    DTYPE_FLOAT16: np.dtype('<f2'),
+    DTYPE_INT32: np.dtype('<i4'),
+}
+_DTYPE_CODES = {dtype: code for code, dtype in _NUMPY_DTYPES.items()}
+
+
+class ProtocolError(Exception):
+    """Raised when a peer sends a malformed frame."""
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytearray]:
+    """Read exactly size bytes, or return None on a clean EOF before any data."""
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:])
+        if n == 0:
+            if received == 0:
+                return None
+            raise ProtocolError("Connection closed mid-frame")
+        received += n
+    return buffer
+
+
+def send_frame(
+    sock: socket.socket,
+    op: int,
+    payload: Any = b'',
+    name: str = ''
+) -> None:
+    """
+    Send one frame.
+
+    Args:
+        sock: Connected socket
+        op: Operation (requests) or status code (responses)
+        payload: numpy array, bytes, str or a JSON-serialisable dict/list
+        name: Model name
+    """
+    shape = ()
+    if isinstance(payload, np.ndarray):
+        dtype_code = _DTYPE_CODES.get(payload.dtype.newbyteorder('<'))
+        if dtype_code is None:
+            raise ProtocolError(f"Unsupported dtype: {payload.dtype}")
+        shape = payload.shape
+        data = np.ascontiguousarray(payload, dtype=_NUMPY_DTYPES[dtype_code]).data.cast('B')
+    elif isinstance(payload, (bytes, bytearray, memoryview)):
+        dtype_code = DTYPE_BYTES
+        data = payload
+    elif isinstance(payload, str):
+        dtype_code = DTYPE_BYTES
+        data = payload.encode('utf-8')
+    else:
+        dtype_code = DTYPE_JSON
+        data = json.dumps(payload).encode('utf-8')
+
+    name_bytes = name.encode('utf-8')
+    header = HEADER.pack(MAGIC, op, dtype_code, len(shape), 0, len(name_bytes), len(data))
+    dims = struct.pack(f'<{len(shape)}I', *shape)
+    sock.sendall(header + dims + name_bytes)
+    if len(data):
+        sock.sendall(data)
+
+
+def recv_frame(sock: socket.socket) -> Optional[Tuple[int, str, Any]]:
+    """
+    Receive one frame.
+
+    Returns:
+        Tuple of (op, name, payload) where payload is a numpy array,
+        bytes or decoded JSON, or None if the peer closed the connection
+    """
+    header = _recv_exact(sock, HEADER.size)
+    if header is None:
+        return None
+
+    magic, op, dtype_code, ndim, _, name_len, payload_len = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ProtocolError(f"Bad magic: {bytes(magic)!r}")
+
+    extra = _recv_exact(sock, 4 * ndim + name_len) if ndim or name_len else b''
+    if extra is None:
+        raise ProtocolError("Connection closed mid-frame")
+    shape = struct.unpack_from(f'<{ndim}I', extra)
+    name = bytes(extra[4 * ndim:]).decode('utf-8')
+
+    data = _recv_exact(sock, payload_len) if payload_len else bytearray()
+    if data is None:
+        raise ProtocolError("Connection closed mid-frame")
+
+    if dtype_code == DTYPE_JSON:
+        return op, name, json.loads(data.decode('utf-8'))
+    if dtype_code == DTYPE_BYTES:
+        return op, name, bytes(data)
+
+    dtype = _NUMPY_DTYPES.get(dtype_code)
+    if dtype is None:
+        raise ProtocolError(f"Unknown dtype code: {dtype_code}")
+    array = np.frombuffer(data, dtype=dtype)
+    if array.size != int(np.prod(shape)):
+        raise ProtocolError(f"Payload size does not match shape {shape}")
+    return op, name, array.reshape(shape)
@@ -0,0 +1,282 @@
+"""
+Y2M Pruning Module
+
+Magnitude pruning of the PyTorch model before TFLite export, with
+optional short fine-tuning, and a sparse TFLite export.
+
+XNNPACK's sparse kernels cover 1x1 convolutions whose weights are stored
+in the TFLite sparse format (Optimize.EXPERIMENTAL_SPARSITY), so pruning
+zeroes 4-output-channel blocks of 1x1 convolutions, the layout those
+kernels consume. Tensor shapes stay dense: the saving comes only from
+the sparse kernels. Whether a runtime build takes the sparse path is not
+visible from Python, so the stage reports measured latency against the
+dense model rather than assuming a speedup.
+
+The pruned model is exported separately from the dense one (the dense
+export is the baseline the pruning report compares against), so pruning
+runs between loading best.pt and its own TFLite export.
+"""
+
+import shutil
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Output channels per pruned block
+BLOCK_SIZE = 4
+PATTERN = f"{BLOCK_SIZE}x1 blocks of 1x1 convolutions"
+
+
+def _prunable_convs(model):
+    """
+    Yield (name, conv) for convolutions that may be pruned.
+
+    Skips the stem (3 input channels) and biased convolutions, which in
+    Ultralytics models are the head output layers (Conv blocks are
+    bias-free and followed by BatchNorm), and anything the sparse
+    kernels do not cover.
+    """
+    import torch.nn as nn
+
+    for name, module in model.named_modules():
+        if not isinstance(module, nn.Conv2d) or module.groups != 1:
+            continue
+        if module.in_channels == 3 or module.bias is not None:
+            continue
+        if module.kernel_size != (1, 1) or module.out_channels % BLOCK_SIZE:
+            continue
+        yield name, module
+
+
+def _magnitude_mask(weight, sparsity: float):
+    """Mask zeroing the lowest-magnitude 4x1 blocks of a 1x1 convolution."""
+    import torch
+
+    # [O, I, 1, 1] -> [O / 4, 4, I]: one L2 norm per 4x1 block
+    out_channels = weight.shape[0]
+    blocks = weight.detach().reshape(out_channels // BLOCK_SIZE, BLOCK_SIZE, -1)
+    scores = blocks.norm(dim=1)
+    count = int(round(sparsity * scores.numel()))
+    mask = torch.ones_like(scores)
+    if count:
+        mask.view(-1)[scores.view(-1).argsort()[:count]] = 0
+    return mask.unsqueeze(1).expand_as(blocks).reshape(weight.shape)
+
+
+def prune_model(model, sparsity: float) -> Dict[str, Any]:
+    """
+    Zero the lowest-magnitude weights of every prunable convolution in place.
+
+    Args:
+        model: torch.nn.Module (YOLO(...).model)
+        sparsity: Target fraction of pruned 4x1 blocks per layer (0-1)
+
+    Returns:
+        Dictionary of masks by module name ('masks') and sparsity stats
+    """
+    import torch
+
+    if not 0.0 < sparsity < 1.0:
+        raise ValueError(f"Sparsity must be between 0 and 1, got {sparsity}")
+
+    masks = {}
+    with torch.no_grad():
+        for name, conv in _prunable_convs(model):
+            mask = _magnitude_mask(conv.weight, sparsity)
+            conv.weight.mul_(mask)
+            masks[name] = mask
+
+    stats = sparsity_stats(model, masks)
+    logger.info(f"[OK] Pruned {len(masks)} convolutions ({PATTERN}): "
+                f"{stats['pruned_sparsity']:.1%} of prunable weights, "
+                f"{stats['global_sparsity']:.1%} of all conv weights")
+    return {'masks': masks, **stats}
+
+
+def apply_masks(model, masks: Dict[str, Any]) -> None:
+    """Re-zero pruned weights (after an optimizer step or reload)."""
+    import torch
+
+    model = getattr(model, 'module', model)
+    modules = dict(model.named_modules())
+    with torch.no_grad():
+        for name, mask in masks.items():
+            conv = modules.get(name)
+            if conv is not None:
+                conv.weight.mul_(mask.to(conv.weight.device, conv.weight.dtype))
+
+
+def sparsity_stats(model, masks: Dict[str, Any]) -> Dict[str, Any]:
+    """Measured zero fractions of the pruned layers and of all conv weights."""
+    import torch.nn as nn
+
+    pruned_zeros = pruned_total = all_zeros = all_total = 0
+    modules = dict(model.named_modules())
+    for name, module in modules.items():
+        if isinstance(module, nn.Conv2d):
+            zeros = int((module.weight == 0).sum())
+            all_zeros += zeros
+            all_total += module.weight.numel()
+            if name in masks:
+                pruned_zeros += zeros
+                pruned_total += module.weight.numel()
+    return {
+        'pruned_layers': len(masks),
+        'pruned_sparsity': round(pruned_zeros / pruned_total, 4) if pruned_total else 0.0,
+        'global_sparsity': round(all_zeros / all_total, 4) if all_total else 0.0,
+    }
+
+
+def finetune(yolo, data: str, masks: Dict[str, Any], epochs: int = 3, input_size: int = 640) -> None:
+    """
+    Briefly fine-tune a pruned model, keeping pruned weights at zero.
+
+    Args:
+        yolo: Ultralytics YOLO model (pruned in place)
+        data: Training data as Ultralytics expects it (a folder with
+            train/ and val/ class subfolders for classification, a
+            dataset .yaml for detection)
+        masks: Masks from prune_model()
+        epochs: Training epochs
+        input_size: Training image size
+    """
+
+    def keep_masks(trainer):
+        apply_masks(trainer.model, masks)
+        ema = getattr(trainer, 'ema', None)
+        if ema is not None and getattr(ema, 'ema', None) is not None:
+            apply_masks(ema.ema, masks)
+
+    for event in ('on_train_batch_end', 'on_fit_epoch_end', 'on_train_end'):
+        yolo.add_callback(event, keep_masks)
+
+    logger.info(f"Fine-tuning pruned model on {data} for {epochs} epoch(s)...")
+    yolo.train(data=data, epochs=epochs, imgsz=input_size, plots=False)
+    # train() reloads the best checkpoint; make its sparsity exact again
+    apply_masks(yolo.model, masks)
+
+
+def export_sparse_tflite(saved_model_dir: Path, output_path: Path) -> Optional[Path]:
+    """Convert a SavedModel to TFLite with sparse weight encoding."""
+    try:
+        import tensorflow as tf
+
+        converter = tf.lite.TFLiteConverter.from_saved_model(str(saved_model_dir))
+        converter.optimizations = [tf.lite.Optimize.EXPERIMENTAL_SPARSITY]
+        output_path.write_bytes(converter.convert())
+        logger.info(f"[OK] Sparse TFLite saved: {output_path.name} "
+                    f"({output_path.stat().st_size / 1024 / 1024:.2f} MB)")
+        return output_path
+    except ImportError:
+        logger.error("TensorFlow not installed. Run: pip install tensorflow-cpu")
+        return None
+    except Exception as e:
+        logger.error(f"Sparse TFLite export failed: {e}")
+        return None
+
+
+def prune_and_export(
+    weights: str,
+    output_dir: str,
+    input_size: Tuple[int, int] = (640, 640),
+    sparsity: float = 0.5,
+    finetune_data: Optional[str] = None,
+    finetune_epochs: int = 3
+) -> Optional[Dict[str, Any]]:
+    """
+    Prune best.pt, optionally fine-tune, and export <stem>_sparse.tflite.
+
+    Returns:
+        Dictionary with the pruned weights, sparse model path and sparsity
+        stats, or None if failed
+    """
+    try:
+        from ultralytics import YOLO
+    except ImportError:
+        logger.error("Ultralytics not installed. Run: pip install ultralytics")
+        return None
+
+    from .converter import YOLOConverter
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stem = Path(weights).stem
+
+    try:
+        yolo = YOLO(str(weights))
+        result = prune_model(yolo.model, sparsity)
+        masks = result.pop('masks')
+        if finetune_data:
+            finetune(yolo, finetune_data, masks, epochs=finetune_epochs, input_size=input_size[0])
+            result.update(sparsity_stats(yolo.model, masks))
+            result['finetune'] = {'data': str(finetune_data), 'epochs': finetune_epochs}
+
+        pruned_weights = output_dir / f"{stem}_pruned.pt"
+        yolo.save(str(pruned_weights))
+    except Exception as e:
+        logger.error(f"Pruning failed: {e}")
+        return None
+
+    converter = YOLOConverter(str(pruned_weights), str(output_dir))
+    if not converter.load_model():
+        return None
+    saved_model_dir = converter.export_to_saved_model(input_size=input_size)
+    if saved_model_dir is None:
+        return None
+
+    sparse_path = export_sparse_tflite(saved_model_dir, output_dir / f"{stem}_sparse.tflite")
+    shutil.rmtree(saved_model_dir, ignore_errors=True)
+    if sparse_path is None:
+        return None
+
+    return {
+        'path': str(sparse_path),
+        'weights': pruned_weights.name,
+        'pattern': PATTERN,
+        'target_sparsity': sparsity,
+        **result,
+    }
+
+
+def compare_models(
+    dense_path: Path,
+    sparse_path: Path,
+    frames: Sequence[np.ndarray],
+    labels: Optional[np.ndarray] = None,
+    runs: int = 30
+) -> Dict[str, Any]:
+    """
+    Size, latency and accuracy of the sparse model against the dense one.
+
+    Args:
+        dense_path: Dense .tflite
+        sparse_path: Sparse .tflite
+        frames: BGR frames for timing and predictions
+        labels: Optional class ids for accuracy
+        runs: Timed invocations per model
+
+    Returns:
+        Report with one entry per model and top-1 agreement
+    """
+    from .tuner import benchmark_model, predict_top1
+
+    report = {}
+    predictions = {}
+    for key, path in (('dense', dense_path), ('sparse', sparse_path)):
+        predictions[key] = predict_top1(path, frames)
+        entry = {
+            'model': Path(path).name,
+            'size_mb': round(Path(path).stat().st_size / 1024 / 1024, 3),
+            'latency_ms': benchmark_model(path, frames, runs=runs),
+        }
+        if labels is not None:
+            entry['accuracy'] = round(float((predictions[key] == labels).mean()), 4)
+        report[key] = entry
+
+    report['agreement'] = round(float((predictions['dense'] == predictions['sparse']).mean()), 4)
+    report['speedup'] = round(report['dense']['latency_ms']['p50'] / report['sparse']['latency_ms']['p50'], 3)
+    return report
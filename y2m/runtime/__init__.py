@@ -0,0 +1,56 @@
+"""
+Y2M Runtime
+
+Inference-only subset of Y2M for edge devices: detector, output decoding,
+temporal smoothing, camera capture, frame sources and latency
+statistics. Depends only on
+NumPy, OpenCV and a TFLite interpreter package (see
+requirements-runtime.txt); nothing here imports TensorFlow, PyTorch or
+Ultralytics.
+
+Exports are resolved lazily (PEP 562), so `import y2m.runtime` is
+nearly free and each name loads only the module that defines it. Check
+the import time and memory budget with `python -m y2m.runtime.footprint`.
+"""
+
+import importlib
+
+_EXPORTS = {
+    'TFLiteDetector': 'detector',
+    'create_interpreter': 'detector',
+    'get_interpreter_class': 'detector',
+    'DELEGATE_XNNPACK': 'detector',
+    'DELEGATE_NONE': 'detector',
+    'decode_output': 'decoding',
+    'class_scores': 'decoding',
+    'dequantize': 'decoding',
+    'CONFIDENCE_THRESHOLD': 'decoding',
+    'DEFAULT_CLASS_NAMES': 'decoding',
+    'SmoothingPolicy': 'smoothing',
+    'MajorityVote': 'smoothing',
+    'ConsecutiveFrames': 'smoothing',
+    'EMA': 'smoothing',
+    'Hysteresis': 'smoothing',
+    'score_from_detection': 'smoothing',
+    'STATE_NAMES': 'smoothing',
+    'CameraCapture': 'capture',
+    'FrameSource': 'sources',
+    'ReplaySource': 'sources',
+    'open_source': 'sources',
+    'latency_stats': 'stats',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,224 @@
+"""
+Y2M Capture Module
+
+Camera capture tuned for inference rather than display:
+- negotiates the smallest resolution/pixel format that still covers the
+  model input, so frames are not decoded at 1080p only to be shrunk
+- keeps the driver buffer at one frame to avoid stale frames
+- grabs on a dedicated thread so the latest frame is always ready
+- timestamps frames when the driver captured them, so capture-to-result
+  latency includes the time a frame waited in the driver buffer
+"""
+
+import time
+import logging
+import threading
+from typing import Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from .sources import FrameSource
+
+logger = logging.getLogger(__name__)
+
+# Common UVC modes as (width, height), smallest first
+COMMON_RESOLUTIONS = [
+    (160, 120), (176, 144), (320, 240), (352, 288), (424, 240),
+    (640, 360), (640, 480), (800, 600), (960, 540), (1024, 768),
+    (1280, 720), (1280, 960), (1600, 1200), (1920, 1080),
+]
+
+# Uncompressed formats first: at small sizes they avoid a JPEG decode
+PIXEL_FORMATS = ('YUYV', 'MJPG')
+
+# Driver timestamps further in the past are not on the perf_counter clock
+MAX_DRIVER_AGE_S = 5.0
+
+
+def _fourcc_str(value: float) -> str:
+    code = int(value)
+    return ''.join(chr((code >> (8 * i)) & 0xFF) for i in range(4)).strip('\x00')
+
+
+def negotiate_format(
+    cap: cv2.VideoCapture,
+    target_size: Tuple[int, int],
+    formats: Sequence[str] = PIXEL_FORMATS,
+    resolutions: Sequence[Tuple[int, int]] = COMMON_RESOLUTIONS
+) -> dict:
+    """
+    Pick the smallest camera mode that covers the model input.
+
+    Modes are requested in increasing area and read back, since drivers
+    silently substitute the nearest mode they support.
+
+    Args:
+        cap: Opened capture
+        target_size: Model input (height, width)
+        formats: FOURCC codes to try, in order of preference
+        resolutions: Candidate (width, height) modes
+
+    Returns:
+        Dictionary with the negotiated width, height and fourcc
+    """
+    target_h, target_w = target_size
+    candidates = sorted(
+        (mode for mode in resolutions if mode[0] >= target_w and mode[1] >= target_h),
+        key=lambda mode: mode[0] * mode[1]
+    )
+
+    for fourcc in formats:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        if _fourcc_str(cap.get(cv2.CAP_PROP_FOURCC)) != fourcc:
+            continue
+
+        for width, height in candidates:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+            actual_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            actual_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            if actual_w >= target_w and actual_h >= target_h:
+                return {'width': actual_w, 'height': actual_h, 'fourcc': fourcc}
+
+    # Nothing covered the input: keep whatever the driver settled on
+    return {
+        'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        'fourcc': _fourcc_str(cap.get(cv2.CAP_PROP_FOURCC)),
+    }
+
+
+class CameraCapture(FrameSource):
+    """
+    Camera source returning (ok, frame, timestamp) tuples.
+
+    The timestamp is on the time.perf_counter() clock, so callers can
+    measure capture-to-result latency. With V4L2 it is the driver's buffer
+    timestamp (CLOCK_MONOTONIC, the clock perf_counter uses on Linux), so
+    time spent queued in the driver is counted. Other backends report a
+    stream position instead; there the time read() was called is used,
+    which overstates the age by the wait for the next frame.
+    """
+
+    def __init__(
+        self,
+        index: int = 0,
+        target_size: Optional[Tuple[int, int]] = None,
+        negotiate: bool = True,
+        threaded: bool = True,
+        buffer_size: int = 1,
+        formats: Sequence[str] = PIXEL_FORMATS
+    ):
+        """
+        Initialize the capture. Call open() before reading.
+
+        Args:
+            index: Camera index passed to cv2.VideoCapture
+            target_size: Model input (height, width) to negotiate against
+            negotiate: Negotiate resolution and pixel format
+            threaded: Grab frames on a background thread
+            buffer_size: Driver buffer size (0 leaves the driver default)
+            formats: FOURCC codes to try when negotiating
+        """
+        self.index = index
+        self.target_size = target_size
+        self.negotiate = negotiate and target_size is not None
+        self.threaded = threaded
+        self.buffer_size = buffer_size
+        self.formats = formats
+        self.mode = {}
+
+        self._cap = None
+        self._thread = None
+        self._running = False
+        self._cond = threading.Condition()
+        self._frame = None
+        self._timestamp = 0.0
+        self._seq = 0
+        self._read_seq = 0
+        self._ok = True
+        self._driver_clock = False
+
+    def open(self) -> bool:
+        """Open and configure the camera. Returns False if it cannot be opened."""
+        self._cap = cv2.VideoCapture(self.index)
+        if not self._cap.isOpened():
+            return False
+
+        if self.buffer_size:
+            self._cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
+        self._driver_clock = self._cap.getBackendName() == 'V4L2'
+
+        if self.negotiate:
+            self.mode = negotiate_format(self._cap, self.target_size, self.formats)
+        else:
+            self.mode = {
+                'width': int(self._cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                'height': int(self._cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                'fourcc': _fourcc_str(self._cap.get(cv2.CAP_PROP_FOURCC)),
+            }
+        logger.info(f"Camera {self.index}: {self.mode['width']}x{self.mode['height']} "
+                    f"{self.mode['fourcc'] or '?'} (threaded={self.threaded})")
+
+        if self.threaded:
+            self._running = True
+            self._thread = threading.Thread(target=self._grab_loop, name='y2m-capture', daemon=True)
+            self._thread.start()
+        return True
+
+    def isOpened(self) -> bool:
+        return self._cap is not None and self._cap.isOpened()
+
+    def _frame_timestamp(self, read_at: float) -> float:
+        """Capture time of the frame just read, or read_at without a usable driver clock."""
+        if self._driver_clock:
+            captured_at = self._cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            if 0.0 < time.perf_counter() - captured_at < MAX_DRIVER_AGE_S:
+                return captured_at
+        return read_at
+
+    def _grab_loop(self) -> None:
+        while self._running:
+            read_at = time.perf_counter()
+            ok, frame = self._cap.read()
+            timestamp = self._frame_timestamp(read_at)
+            with self._cond:
+                self._ok = ok
+                if ok:
+                    self._frame = frame
+                    self._timestamp = timestamp
+                    self._seq += 1
+                self._cond.notify_all()
+            if not ok:
+                break
+
+    def read(self, timeout: float = 2.0) -> Tuple[bool, Optional[np.ndarray], float]:
+        """
+        Return the newest frame.
+
+        In threaded mode this waits for a frame newer than the last one
+        returned, dropping any that arrived in between.
+        """
+        if not self.threaded:
+            read_at = time.perf_counter()
+            ok, frame = self._cap.read()
+            return ok, frame, self._frame_timestamp(read_at)
+
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > self._read_seq or not self._ok, timeout):
+                return False, None, 0.0
+            if self._seq == self._read_seq:
+                return False, None, 0.0
+            self._read_seq = self._seq
+            return True, self._frame, self._timestamp
+
+    def release(self) -> None:
+        """Stop the grab thread and release the camera."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
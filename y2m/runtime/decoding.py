@@ -0,0 +1,118 @@
+"""
+Y2M Decoding Module
+
+Turns raw TFLite output tensors into class scores and detections.
+Kept free of interpreter and OpenCV imports so thin clients can use it.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# (scale, zero_point) of a quantized output tensor; None for float outputs
+Quantization = Optional[Tuple[float, int]]
+
+# Class names used when no metadata.json is available
+DEFAULT_CLASS_NAMES = ['drowsy', 'notdrowsy']
+
+# Minimum confidence for a detection to be reported
+CONFIDENCE_THRESHOLD = 0.25
+
+
+def class_name(class_id: int, class_names: Sequence[str]) -> str:
+    """Map a class index to its name, falling back to class_<id>."""
+    if class_id < len(class_names):
+        return class_names[class_id]
+    return f"class_{class_id}"
+
+
+def dequantize(values, quantization: Quantization) -> np.ndarray:
+    """Map quantized values to real values ((q - zero_point) * scale)."""
+    if quantization is None:
+        return np.asarray(values)
+    scale, zero_point = quantization
+    return (np.asarray(values, dtype=np.float32) - zero_point) * scale
+
+
+def class_scores(output_data: np.ndarray, quantization: Quantization = None) -> np.ndarray:
+    """
+    Reduce a raw model output to one score per class.
+
+    Args:
+        output_data: Output tensor, either classification [batch, num_classes]
+            or YOLO [batch, num_boxes, 4 + num_classes]
+        quantization: (scale, zero_point) of a quantized output; the
+            reduction runs on the integers (dequantization is monotonic)
+            and only the per-class results are dequantized
+
+    Returns:
+        1-D array of class scores for the first batch entry
+    """
+    if output_data.ndim == 3:
+        # YOLO format: best score per class across all boxes
+        predictions = output_data[0]
+        if predictions.shape[-1] < 6:
+            return np.zeros(0, dtype=np.float32)
+        return dequantize(predictions[:, 4:].max(axis=0), quantization)
+
+    return dequantize(output_data.reshape(output_data.shape[0], -1)[0], quantization)
+
+
+def decode_output(
+    output_data: np.ndarray,
+    class_names: Sequence[str] = DEFAULT_CLASS_NAMES,
+    threshold: float = CONFIDENCE_THRESHOLD,
+    quantization: Quantization = None
+) -> List[Tuple[str, float, Optional[tuple]]]:
+    """
+    Decode a raw model output into detections.
+
+    Args:
+        output_data: Output tensor as returned by the interpreter
+        class_names: Names indexed by class id
+        threshold: Minimum confidence to keep a detection
+        quantization: (scale, zero_point) of a quantized output; argmax
+            and thresholding run on the integers and only the kept
+            detections are dequantized
+
+    Returns:
+        List of (class_name, confidence, bbox) tuples; bbox is None for
+        classification outputs
+    """
+    detections = []
+    if quantization is not None:
+        # Threshold in the quantized domain
+        threshold = threshold / quantization[0] + quantization[1]
+
+    if output_data.ndim == 3:
+        # Shape: [1, num_boxes, 4 + num_classes] - standard YOLO format
+        # YOLO output: [x_center, y_center, width, height, class1_conf, class2_conf, ...]
+        predictions = output_data[0]
+        if predictions.shape[-1] < 6:
+            return detections
+
+        scores = predictions[:, 4:]
+        class_ids = scores.argmax(axis=1)
+        confidences = scores[np.arange(len(scores)), class_ids]
+
+        for i in np.flatnonzero(confidences > threshold):
+            x, y, w, h = dequantize(predictions[i, :4], quantization)
+            detections.append((
+                class_name(int(class_ids[i]), class_names),
+                float(dequantize(confidences[i], quantization)),
+                (x, y, w, h)
+            ))
+
+    elif output_data.ndim == 2:
+        # Classification output [batch, num_classes]
+        scores = output_data[0]
+        class_id = int(np.argmax(scores))
+        confidence = scores[class_id]
+        if confidence > threshold:
+            detections.append((
+                class_name(class_id, class_names),
+                float(dequantize(confidence, quantization)),
+                None
+            ))
+
+    return detections
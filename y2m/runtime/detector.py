@@ -0,0 +1,352 @@
+"""
+Y2M Detector Module
+
+TFLite runtime wrapper used by the inference scripts and services.
+Needs only NumPy, OpenCV and a TFLite interpreter package.
+"""
+
+import sys
+import json
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from .decoding import DEFAULT_CLASS_NAMES, CONFIDENCE_THRESHOLD, Quantization, class_scores, decode_output
+
+logger = logging.getLogger(__name__)
+
+# Delegate choices for create_interpreter
+DELEGATE_XNNPACK = 'xnnpack'
+DELEGATE_NONE = 'none'
+
+# Interpreters kept prepared for input shapes other than the default
+DEFAULT_SHAPE_CACHE_SIZE = 4
+
+_interpreter_class = None
+
+
+def get_interpreter_class():
+    """
+    Resolve the TFLite interpreter class.
+
+    Prefers the standalone runtimes (tflite-runtime, then its successor
+    ai-edge-litert), which load in a fraction of the time and memory of
+    full TensorFlow, and falls back to TensorFlow.
+
+    Raises:
+        ImportError: If none of them is installed
+    """
+    global _interpreter_class
+    if _interpreter_class is not None:
+        return _interpreter_class
+
+    try:
+        import tflite_runtime.interpreter as tflite
+        _interpreter_class = tflite.Interpreter
+        logger.info("Using TFLite Runtime")
+    except ImportError:
+        try:
+            from ai_edge_litert import interpreter as litert
+            _interpreter_class = litert.Interpreter
+            logger.info("Using LiteRT")
+        except ImportError:
+            try:
+                import tensorflow as tf
+                _interpreter_class = tf.lite.Interpreter
+                logger.info("Using TensorFlow Lite")
+            except ImportError:
+                raise ImportError(
+                    "No TFLite interpreter installed. "
+                    "Install with: pip install -r requirements-runtime.txt"
+                )
+
+    return _interpreter_class
+
+
+def create_interpreter(
+    model_path: str,
+    num_threads: Optional[int] = None,
+    delegate: str = DELEGATE_XNNPACK
+):
+    """
+    Construct a TFLite interpreter.
+
+    Args:
+        model_path: Path to the .tflite model
+        num_threads: Interpreter thread count (runtime default if None)
+        delegate: 'xnnpack' (runtime default), 'none' for the plain builtin
+            kernels, or a path to an external delegate library
+
+    Returns:
+        Interpreter (tensors not yet allocated)
+    """
+    interpreter_class = get_interpreter_class()
+    module = sys.modules[interpreter_class.__module__]
+    kwargs = {'model_path': str(model_path), 'num_threads': num_threads}
+
+    if delegate == DELEGATE_NONE:
+        kwargs['experimental_op_resolver_type'] = (
+            module.OpResolverType.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+        )
+    elif delegate and delegate != DELEGATE_XNNPACK:
+        kwargs['experimental_delegates'] = [module.load_delegate(delegate)]
+
+    return interpreter_class(**kwargs)
+
+
+def tensor_quantization(details: dict) -> Quantization:
+    """(scale, zero_point) of a quantized integer tensor, None for float tensors."""
+    if not np.issubdtype(details['dtype'], np.integer):
+        return None
+    scale, zero_point = details.get('quantization', (0.0, 0))
+    if not scale:
+        return None
+    return float(scale), int(zero_point)
+
+
+def input_lookup_table(quantization: Quantization, dtype) -> Optional[np.ndarray]:
+    """
+    Map each uint8 pixel value straight to the quantized model input.
+
+    The table folds the [0, 1] normalization and the input quantization
+    into one gather. None when the model takes the raw bytes unchanged
+    (scale 1/255, zero point 0 on a uint8 input).
+    """
+    if quantization is None:
+        return None
+    scale, zero_point = quantization
+    info = np.iinfo(dtype)
+    pixels = np.arange(256, dtype=np.float64)
+    table = np.clip(np.round(pixels / 255.0 / scale) + zero_point, info.min, info.max).astype(dtype)
+    if np.dtype(dtype) == np.uint8 and np.array_equal(table, pixels):
+        return None
+    return table
+
+
+def load_class_names(model_path: str) -> List[str]:
+    """Read class names from the metadata.json next to a model, if any."""
+    metadata_path = Path(model_path).parent / "metadata.json"
+    try:
+        with open(metadata_path) as f:
+            class_names = json.load(f).get('class_names')
+        if class_names:
+            return list(class_names)
+    except (OSError, ValueError):
+        pass
+    return list(DEFAULT_CLASS_NAMES)
+
+
+class TFLiteDetector:
+    """TFLite model wrapper for drowsiness detection."""
+
+    def __init__(
+        self,
+        model_path: str,
+        class_names: Optional[List[str]] = None,
+        num_threads: Optional[int] = None,
+        delegate: str = DELEGATE_XNNPACK,
+        input_size: Optional[Tuple[int, int]] = None,
+        shape_cache_size: int = DEFAULT_SHAPE_CACHE_SIZE
+    ):
+        """
+        Load the model and allocate its tensors.
+
+        Args:
+            model_path: Path to the .tflite model
+            class_names: Class names (read from metadata.json if None)
+            num_threads: Interpreter thread count (runtime default if None)
+            delegate: See create_interpreter
+            input_size: Default (height, width) for dynamic-shape models
+                (the model's own input shape if None)
+            shape_cache_size: Interpreters kept prepared for other input
+                shapes (batch sizes or resolutions), least recently used
+                evicted first
+        """
+        self.model_path = str(model_path)
+        self.num_threads = num_threads
+        self.delegate = delegate
+        self.shape_cache_size = shape_cache_size
+        self.interpreter = create_interpreter(self.model_path, num_threads, delegate)
+
+        # Get input/output details
+        self.input_details = self.interpreter.get_input_details()
+        self.output_details = self.interpreter.get_output_details()
+
+        # -1 in the signature marks a dimension exported with --dynamic
+        signature = self.input_details[0].get('shape_signature', self.input_details[0]['shape'])
+        self.dynamic = bool(np.any(np.asarray(signature) == -1))
+        if input_size is not None and tuple(self.input_details[0]['shape'][1:3]) != tuple(input_size):
+            self._resize(self.interpreter, (1, input_size[0], input_size[1], int(signature[-1])))
+        self.interpreter.allocate_tensors()
+        self.input_details = self.interpreter.get_input_details()
+
+        # Get input shape
+        self.input_shape = self.input_details[0]['shape']
+        self.input_height = self.input_shape[1]
+        self.input_width = self.input_shape[2]
+        # uint8 models (--uint8-input) normalize in the graph and take raw pixels;
+        # quantized models get pixels mapped through a lookup table
+        self.input_dtype = self.input_details[0]['dtype']
+        self.input_quantization = tensor_quantization(self.input_details[0])
+        self.output_quantization = tensor_quantization(self.output_details[0])
+        self._input_lut = input_lookup_table(self.input_quantization, self.input_dtype)
+
+        self._default_shape = tuple(int(d) for d in self.input_shape)
+        self._shape_cache: 'OrderedDict[tuple, object]' = OrderedDict()
+
+        self.class_names = class_names or load_class_names(self.model_path)
+
+        logger.info(f"Model loaded: {self.model_path}")
+        logger.info(f"  Input shape: {self.input_shape}{' (dynamic)' if self.dynamic else ''}")
+        logger.info(f"  Classes: {self.class_names}")
+        if self.input_quantization or self.output_quantization:
+            logger.info(f"  Quantized I/O: input {self.input_quantization}, output {self.output_quantization}")
+
+    @classmethod
+    def from_metadata(cls, model_dir: str) -> 'TFLiteDetector':
+        """
+        Create a detector using the deployment configuration that
+        `y2m tune` wrote into model_dir/metadata.json.
+
+        Falls back to the float32 model with runtime defaults when the
+        metadata has no deployment section.
+        """
+        model_dir = Path(model_dir)
+        with open(model_dir / "metadata.json") as f:
+            metadata = json.load(f)
+
+        deployment = metadata.get('deployment')
+        input_size = metadata.get('input_size') if metadata.get('dynamic_shapes') else None
+        if not deployment:
+            model_file = metadata.get('output_files', {}).get('float32', 'best_float32.tflite')
+            return cls(str(model_dir / model_file), metadata.get('class_names'), input_size=input_size)
+
+        return cls(
+            str(model_dir / deployment['model_file']),
+            metadata.get('class_names'),
+            num_threads=deployment.get('num_threads'),
+            delegate=deployment.get('delegate', DELEGATE_XNNPACK),
+            input_size=deployment.get('input_size', input_size) if input_size else None
+        )
+
+    def preprocess(self, frame: np.ndarray, input_size: Optional[Tuple[int, int]] = None) -> np.ndarray:
+        """
+        Preprocess a BGR frame for inference.
+
+        Args:
+            frame: BGR frame
+            input_size: (height, width) to resize to (the model input if None)
+        """
+        height, width = input_size or (self.input_height, self.input_width)
+        # Resize to model input size (skipped when capture already matches)
+        if frame.shape[:2] == (height, width):
+            resized = frame
+        else:
+            resized = cv2.resize(frame, (int(width), int(height)))
+        # Convert BGR to RGB
+        rgb = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
+        if self._input_lut is not None:
+            return np.expand_dims(self._input_lut[rgb], axis=0)
+        if np.issubdtype(self.input_dtype, np.integer):
+            return np.expand_dims(rgb, axis=0)
+        # Normalize to 0-1 and add batch dimension
+        normalized = rgb.astype(np.float32) / 255.0
+        batched = np.expand_dims(normalized, axis=0)
+        return batched
+
+    def _resize(self, interpreter, shape: Sequence[int]) -> None:
+        try:
+            interpreter.resize_tensor_input(self.input_details[0]['index'], list(shape), strict=self.dynamic)
+        except (RuntimeError, ValueError) as e:
+            raise ValueError(
+                f"Cannot run {self.model_path} with input shape {tuple(shape)}; "
+                f"export it with --dynamic ({e})"
+            )
+
+    def prepare(self, shape: Sequence[int]):
+        """
+        Return an interpreter with tensors allocated for an input shape.
+
+        The default shape uses the main interpreter. Other shapes get their
+        own interpreter, created on first use and kept in an LRU cache, so
+        alternating between shapes does not reallocate tensors.
+
+        Raises:
+            ValueError: If the model cannot be resized to the shape
+        """
+        shape = tuple(int(d) for d in shape)
+        if shape == self._default_shape:
+            return self.interpreter
+
+        interpreter = self._shape_cache.get(shape)
+        if interpreter is not None:
+            self._shape_cache.move_to_end(shape)
+            return interpreter
+
+        interpreter = create_interpreter(self.model_path, self.num_threads, self.delegate)
+        self._resize(interpreter, shape)
+        try:
+            interpreter.allocate_tensors()
+        except (RuntimeError, ValueError) as e:
+            raise ValueError(f"Cannot allocate {self.model_path} for input shape {shape}: {e}")
+        logger.debug(f"Prepared interpreter for input shape {shape}")
+
+        self._shape_cache[shape] = interpreter
+        if len(self._shape_cache) > self.shape_cache_size:
+            evicted, _ = self._shape_cache.popitem(last=False)
+            logger.debug(f"Evicted interpreter for input shape {evicted}")
+        return interpreter
+
+    def infer(self, input_data: np.ndarray) -> np.ndarray:
+        """Run the interpreter prepared for the input's shape on a preprocessed tensor."""
+        interpreter = self.prepare(input_data.shape)
+        interpreter.set_tensor(self.input_details[0]['index'], input_data)
+        interpreter.invoke()
+        return interpreter.get_tensor(self.output_details[0]['index'])
+
+    def predict(self, frame: np.ndarray, input_size: Optional[Tuple[int, int]] = None) -> np.ndarray:
+        """Run inference on a BGR frame and return the raw (possibly quantized) output tensor."""
+        return self.infer(self.preprocess(frame, input_size))
+
+    def class_scores(self, output: np.ndarray) -> np.ndarray:
+        """Per-class scores of a raw output from this model, dequantized."""
+        return class_scores(output, self.output_quantization)
+
+    def decode(self, output: np.ndarray, threshold: float = CONFIDENCE_THRESHOLD) -> list:
+        """Decode a raw output from this model. Returns list of (class_name, confidence, bbox)."""
+        return decode_output(output, self.class_names, threshold, self.output_quantization)
+
+    def detect(
+        self,
+        frame: np.ndarray,
+        threshold: float = CONFIDENCE_THRESHOLD,
+        input_size: Optional[Tuple[int, int]] = None
+    ) -> list:
+        """Run detection on a frame. Returns list of (class_name, confidence, bbox)."""
+        return self.decode(self.predict(frame, input_size), threshold)
+
+    def detect_batch(
+        self,
+        frames: Sequence[np.ndarray],
+        threshold: float = CONFIDENCE_THRESHOLD,
+        input_size: Optional[Tuple[int, int]] = None
+    ) -> List[list]:
+        """
+        Run detection on several frames in one invocation.
+
+        Returns:
+            One list of (class_name, confidence, bbox) per frame
+        """
+        batch = np.concatenate([self.preprocess(frame, input_size) for frame in frames])
+        output = self.infer(batch)
+        return [self.decode(output[i:i + 1], threshold) for i in range(len(frames))]
+
+    def warmup(self, runs: int = 3, shape: Optional[Sequence[int]] = None) -> None:
+        """Invoke the model on blank input so first real frames run at full speed."""
+        blank = np.zeros(shape or self.input_shape, dtype=self.input_details[0]['dtype'])
+        for _ in range(runs):
+            self.infer(blank)
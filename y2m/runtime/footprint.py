@@ -0,0 +1,188 @@
+"""
+Y2M Runtime Footprint Check
+
+Measures the cold-start cost of the runtime in fresh interpreter
+processes: import time, resident memory after import and, optionally,
+model load time and memory with a warmed interpreter. Also verifies that
+no conversion-side dependency (TensorFlow, PyTorch, Ultralytics, ...)
+was pulled in. Exits non-zero when a budget is exceeded, so it can gate
+CI and edge image builds:
+
+    python -m y2m.runtime.footprint --model converted_models/best_float32.tflite
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+# What an edge deployment imports
+RUNTIME_MODULES = (
+    'y2m.runtime.detector',
+    'y2m.runtime.decoding',
+    'y2m.runtime.smoothing',
+    'y2m.runtime.capture',
+    'y2m.runtime.sources',
+)
+
+# Modules that must never be loaded by the runtime
+FORBIDDEN_MODULES = (
+    'tensorflow', 'keras', 'torch', 'torchvision', 'ultralytics', 'onnx', 'polars',
+    'y2m.converter', 'y2m.optimizer', 'y2m.isolation',
+)
+
+# Budgets (median of the runs), with headroom over a single-core x86 box
+# running numpy, cv2 and ai-edge-litert
+DEFAULT_MAX_IMPORT_MS = 500.0
+DEFAULT_MAX_RSS_MB = 150.0
+DEFAULT_RUNS = 3
+
+# Directory containing the y2m package; the probe imports it from here
+PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+
+# Runs in a fresh interpreter; argv: modules and forbidden modules
+# (comma-separated), model path or ''
+_PROBE = r'''
+import sys, json, time, importlib
+
+def rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+result = {'baseline_rss_mb': rss_mb()}
+start = time.perf_counter()
+for name in sys.argv[1].split(','):
+    importlib.import_module(name)
+from y2m.runtime.detector import get_interpreter_class
+get_interpreter_class()
+result['import_ms'] = (time.perf_counter() - start) * 1000
+result['import_rss_mb'] = rss_mb()
+
+if sys.argv[3]:
+    from y2m.runtime.detector import TFLiteDetector
+    start = time.perf_counter()
+    detector = TFLiteDetector(sys.argv[3])
+    detector.warmup(1)
+    result['load_ms'] = (time.perf_counter() - start) * 1000
+    result['load_rss_mb'] = rss_mb()
+
+result['interpreter'] = get_interpreter_class().__module__
+result['forbidden_modules'] = [name for name in sys.argv[2].split(',') if name in sys.modules]
+print(json.dumps(result))
+'''
+
+
+def _probe(modules: Sequence[str], model_path: Optional[str]) -> Dict[str, Any]:
+    # Independent of the caller's working directory and PYTHONPATH
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, (str(PACKAGE_ROOT), env.get('PYTHONPATH'))))
+    completed = subprocess.run(
+        [sys.executable, '-c', _PROBE, ','.join(modules), ','.join(FORBIDDEN_MODULES),
+         str(Path(model_path).resolve()) if model_path else ''],
+        capture_output=True, text=True, timeout=120, cwd=str(PACKAGE_ROOT), env=env
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Footprint probe failed: {completed.stderr.strip().splitlines()[-1:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure_footprint(
+    modules: Sequence[str] = RUNTIME_MODULES,
+    model_path: Optional[str] = None,
+    runs: int = DEFAULT_RUNS
+) -> Dict[str, Any]:
+    """
+    Cold-start import time and memory of the runtime.
+
+    Args:
+        modules: Modules to import, in order
+        model_path: Also load and warm this model
+        runs: Fresh processes to measure (medians are reported)
+
+    Returns:
+        Medians of import_ms, import_rss_mb (and load_ms, load_rss_mb),
+        the interpreter module, and any forbidden modules that were loaded
+    """
+    probes = [_probe(modules, model_path) for _ in range(max(1, runs))]
+    report = {
+        key: round(statistics.median(p[key] for p in probes), 1)
+        for key in ('baseline_rss_mb', 'import_ms', 'import_rss_mb', 'load_ms', 'load_rss_mb')
+        if key in probes[0]
+    }
+    report.update({
+        'runs': len(probes),
+        'python': sys.version.split()[0],
+        'interpreter': probes[0]['interpreter'],
+        'forbidden_modules': sorted(set().union(*(p['forbidden_modules'] for p in probes))),
+    })
+    return report
+
+
+def check_footprint(
+    report: Dict[str, Any],
+    max_import_ms: float = DEFAULT_MAX_IMPORT_MS,
+    max_rss_mb: float = DEFAULT_MAX_RSS_MB
+) -> List[str]:
+    """Budget violations of a measure_footprint() report (empty if within budget)."""
+    violations = []
+    if report['import_ms'] > max_import_ms:
+        violations.append(f"import time {report['import_ms']:.0f} ms > {max_import_ms:.0f} ms")
+    rss = report.get('load_rss_mb', report['import_rss_mb'])
+    if rss > max_rss_mb:
+        violations.append(f"RSS {rss:.0f} MB > {max_rss_mb:.0f} MB")
+    if report['forbidden_modules']:
+        violations.append(f"forbidden modules loaded: {', '.join(report['forbidden_modules'])}")
+    return violations
+
+
+def main(args=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m y2m.runtime.footprint',
+        description='Measure and enforce the runtime import time and memory budget'
+    )
+    parser.add_argument('--model', type=str, default=None, help='Also load and warm this .tflite model')
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help=f'Fresh processes to measure (default: {DEFAULT_RUNS})')
+    parser.add_argument('--max-import-ms', type=float, default=DEFAULT_MAX_IMPORT_MS,
+                        help=f'Import time budget (default: {DEFAULT_MAX_IMPORT_MS:g})')
+    parser.add_argument('--max-rss-mb', type=float, default=DEFAULT_MAX_RSS_MB,
+                        help=f'Resident memory budget after import/load (default: {DEFAULT_MAX_RSS_MB:g})')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    parsed_args = parser.parse_args(args)
+
+    try:
+        report = measure_footprint(model_path=parsed_args.model, runs=parsed_args.runs)
+    except (RuntimeError, subprocess.TimeoutExpired) as e:
+        print(f"[ERROR] {e}")
+        return 1
+    violations = check_footprint(report, parsed_args.max_import_ms, parsed_args.max_rss_mb)
+    report['violations'] = violations
+
+    if parsed_args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Interpreter: {report['interpreter']} (Python {report['python']}, {report['runs']} runs)")
+        print(f"Import:      {report['import_ms']:.0f} ms, RSS {report['import_rss_mb']:.0f} MB "
+              f"(interpreter baseline {report['baseline_rss_mb']:.0f} MB)")
+        if 'load_ms' in report:
+            print(f"Model load:  {report['load_ms']:.0f} ms, RSS {report['load_rss_mb']:.0f} MB")
+        for violation in violations:
+            print(f"[ERROR] {violation}")
+        if not violations:
+            print("[OK] Within budget")
+    return 1 if violations else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
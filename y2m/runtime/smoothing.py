@@ -0,0 +1,348 @@
+"""
+Y2M Smoothing Module
+
+Temporal smoothing policies that turn per-frame drowsy scores into a
+stable state. Each policy has an O(1) streaming update() for live loops
+and a NumPy-vectorized replay() that processes a whole recording in one
+pass, for sweeping thresholds and window sizes offline.
+
+Scores are the drowsy-class probability per frame; NaN marks a frame
+without a detection.
+
+Policies:
+- MajorityVote: rolling vote of the webcam scripts (test_webcam)
+- ConsecutiveFrames: N-in-a-row rule of the Android DrowsinessDetector
+- EMA: exponential moving average with a threshold
+- Hysteresis: separate on/off thresholds
+"""
+
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from itertools import product
+from typing import Dict, List, Optional, Sequence, Type
+
+import numpy as np
+
+# Smoothed states
+STATE_UNKNOWN = -1
+STATE_ALERT = 0
+STATE_DROWSY = 1
+STATE_UNCERTAIN = 2
+
+STATE_NAMES = {
+    STATE_UNKNOWN: "UNKNOWN",
+    STATE_ALERT: "ALERT",
+    STATE_DROWSY: "DROWSY",
+    STATE_UNCERTAIN: "UNCERTAIN",
+}
+
+
+def _forward_fill_index(valid: np.ndarray) -> np.ndarray:
+    """Index of the most recent valid entry at each position (-1 before the first)."""
+    idx = np.where(valid, np.arange(len(valid)), -1)
+    return np.maximum.accumulate(idx) if len(idx) else idx
+
+
+class SmoothingPolicy(ABC):
+    """Base class for smoothing policies."""
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Forget all history."""
+
+    @abstractmethod
+    def update(self, score: float) -> int:
+        """Consume one frame score and return the smoothed state."""
+
+    @abstractmethod
+    def replay(self, scores: np.ndarray) -> np.ndarray:
+        """
+        Vectorized equivalent of calling update() on every score from a
+        fresh state. Does not touch the streaming state.
+
+        Returns:
+            int8 array of states, one per frame
+        """
+
+
+class MajorityVote(SmoothingPolicy):
+    """
+    Majority vote over the last `window` frames with a detection.
+
+    Mirrors test_webcam: frames vote drowsy when score >= threshold, ties
+    are UNCERTAIN, and the state is only re-evaluated every `report_every`
+    frames (held in between).
+    """
+
+    def __init__(self, window: int = 5, threshold: float = 0.5, report_every: int = 1):
+        self.window = window
+        self.threshold = threshold
+        self.report_every = max(1, report_every)
+        self.reset()
+
+    def reset(self) -> None:
+        self._votes = deque(maxlen=self.window)
+        self._confidences = deque(maxlen=self.window)
+        self.drowsy_count = 0
+        self.confidence_sum = 0.0
+        self.frame_count = 0
+        self.state = STATE_UNKNOWN
+
+    @property
+    def count(self) -> int:
+        """Votes currently in the window."""
+        return len(self._votes)
+
+    @property
+    def mean_confidence(self) -> float:
+        """Mean top-class confidence of the votes in the window."""
+        return self.confidence_sum / len(self._votes) if self._votes else 0.0
+
+    def update(self, score: float) -> int:
+        self.frame_count += 1
+
+        if not math.isnan(score):
+            vote = score >= self.threshold
+            confidence = max(score, 1.0 - score)
+            if len(self._votes) == self.window:
+                self.drowsy_count -= self._votes[0]
+                self.confidence_sum -= self._confidences[0]
+            self._votes.append(vote)
+            self._confidences.append(confidence)
+            self.drowsy_count += vote
+            self.confidence_sum += confidence
+
+        if self._votes and self.frame_count % self.report_every == 0:
+            alert_count = len(self._votes) - self.drowsy_count
+            if self.drowsy_count > alert_count:
+                self.state = STATE_DROWSY
+            elif alert_count > self.drowsy_count:
+                self.state = STATE_ALERT
+            else:
+                self.state = STATE_UNCERTAIN
+
+        return self.state
+
+    def replay(self, scores: np.ndarray) -> np.ndarray:
+        scores = np.asarray(scores, dtype=np.float64)
+        n = len(scores)
+        valid = ~np.isnan(scores)
+
+        # Rolling vote over the valid frames only
+        votes = (scores[valid] >= self.threshold).astype(np.int64)
+        cumulative = np.concatenate(([0], np.cumsum(votes)))
+        k = np.arange(1, len(votes) + 1)
+        lower = np.maximum(k - self.window, 0)
+        drowsy = cumulative[k] - cumulative[lower]
+        total = k - lower
+        vote_state = np.where(
+            2 * drowsy > total, STATE_DROWSY,
+            np.where(2 * drowsy < total, STATE_ALERT, STATE_UNCERTAIN)
+        )
+
+        # Each evaluation frame reports the vote after its most recent valid
+        # frame; other frames hold the last evaluation
+        last_valid = np.cumsum(valid) - 1
+        evaluated = ((np.arange(n) + 1) % self.report_every == 0) & (last_valid >= 0)
+        source = _forward_fill_index(evaluated)
+        states = np.full(n, STATE_UNKNOWN, dtype=np.int64)
+        held = source >= 0
+        states[held] = vote_state[last_valid[source[held]]]
+        return states.astype(np.int8)
+
+
+class ConsecutiveFrames(SmoothingPolicy):
+    """
+    DROWSY after `required` consecutive drowsy frames, ALERT immediately
+    on any other frame. Mirrors DrowsinessDetector.processFrame (Android).
+    """
+
+    def __init__(self, required: int = 3, threshold: float = 0.5):
+        self.required = required
+        self.threshold = threshold
+        self.reset()
+
+    def reset(self) -> None:
+        self.consecutive = 0
+        self.state = STATE_ALERT
+
+    def update(self, score: float) -> int:
+        if score >= self.threshold:
+            self.consecutive += 1
+            if self.consecutive >= self.required:
+                self.state = STATE_DROWSY
+        else:
+            self.consecutive = 0
+            self.state = STATE_ALERT
+        return self.state
+
+    def replay(self, scores: np.ndarray) -> np.ndarray:
+        scores = np.asarray(scores, dtype=np.float64)
+        drowsy = scores >= self.threshold  # NaN compares False, like a non-drowsy frame
+        idx = np.arange(len(scores))
+        last_break = _forward_fill_index(~drowsy)
+        run_length = idx - last_break
+        states = np.where(drowsy & (run_length >= self.required), STATE_DROWSY, STATE_ALERT)
+        return states.astype(np.int8)
+
+
+class EMA(SmoothingPolicy):
+    """Exponential moving average of the score, DROWSY when >= threshold."""
+
+    def __init__(self, alpha: float = 0.3, threshold: float = 0.5):
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("alpha must be in (0, 1]")
+        self.alpha = alpha
+        self.threshold = threshold
+        self.reset()
+
+    def reset(self) -> None:
+        self.value = None
+        self.state = STATE_UNKNOWN
+
+    def update(self, score: float) -> int:
+        if not math.isnan(score):
+            if self.value is None:
+                self.value = score
+            else:
+                self.value += self.alpha * (score - self.value)
+            self.state = STATE_DROWSY if self.value >= self.threshold else STATE_ALERT
+        return self.state
+
+    def smooth(self, scores: np.ndarray) -> np.ndarray:
+        """Vectorized EMA values (NaN frames hold the previous value)."""
+        scores = np.asarray(scores, dtype=np.float64)
+        valid = ~np.isnan(scores)
+        x = scores[valid]
+        values = np.empty_like(x)
+
+        if len(x):
+            a = self.alpha
+            if a == 1.0:
+                values[:] = x
+            else:
+                # Closed form per block, carrying the last value across blocks.
+                # Block length keeps (1 - a) ** -k within float64 range.
+                decay = 1.0 - a
+                block = int(max(1, min(4096, 300.0 / -math.log(decay))))
+                powers = decay ** np.arange(block + 1)
+                inverse = decay ** -np.arange(block)
+                carry = x[0]
+                for start in range(0, len(x), block):
+                    xb = x[start:start + block]
+                    m = len(xb)
+                    weighted = np.cumsum(xb * inverse[:m]) * powers[:m]
+                    values[start:start + m] = powers[1:m + 1] * carry + a * weighted
+                    carry = values[start + m - 1]
+
+        source = np.cumsum(valid) - 1
+        result = np.full(len(scores), np.nan)
+        seen = source >= 0
+        result[seen] = values[source[seen]]
+        return result
+
+    def replay(self, scores: np.ndarray) -> np.ndarray:
+        values = self.smooth(scores)
+        states = np.where(
+            np.isnan(values), STATE_UNKNOWN,
+            np.where(values >= self.threshold, STATE_DROWSY, STATE_ALERT)
+        )
+        return states.astype(np.int8)
+
+
+class Hysteresis(SmoothingPolicy):
+    """DROWSY once score >= on_threshold, ALERT again once score <= off_threshold."""
+
+    def __init__(self, on_threshold: float = 0.6, off_threshold: float = 0.4):
+        if off_threshold > on_threshold:
+            raise ValueError("off_threshold must not exceed on_threshold")
+        self.on_threshold = on_threshold
+        self.off_threshold = off_threshold
+        self.reset()
+
+    def reset(self) -> None:
+        self.state = STATE_ALERT
+
+    def update(self, score: float) -> int:
+        if score >= self.on_threshold:
+            self.state = STATE_DROWSY
+        elif score <= self.off_threshold:
+            self.state = STATE_ALERT
+        return self.state
+
+    def replay(self, scores: np.ndarray) -> np.ndarray:
+        scores = np.asarray(scores, dtype=np.float64)
+        events = np.where(
+            scores >= self.on_threshold, STATE_DROWSY,
+            np.where(scores <= self.off_threshold, STATE_ALERT, STATE_UNKNOWN)
+        )
+        source = _forward_fill_index(events != STATE_UNKNOWN)
+        states = np.where(source >= 0, events[np.maximum(source, 0)], STATE_ALERT)
+        return states.astype(np.int8)
+
+
+def score_from_detection(detection: Optional[tuple]) -> float:
+    """Drowsy score from a (class_name, confidence, ...) detection; NaN if None."""
+    if detection is None:
+        return float('nan')
+    class_name, confidence = detection[0], detection[1]
+    return confidence if class_name == 'drowsy' else 1.0 - confidence
+
+
+def evaluate_states(states: np.ndarray, labels: np.ndarray) -> Dict[str, float]:
+    """
+    Compare smoothed states with per-frame ground truth (1 = drowsy).
+
+    Returns:
+        accuracy over decided frames, drowsy recall, false alarm rate,
+        fraction undecided and number of state transitions
+    """
+    states = np.asarray(states)
+    labels = np.asarray(labels).astype(bool)
+    decided = (states == STATE_DROWSY) | (states == STATE_ALERT)
+    predicted = states == STATE_DROWSY
+
+    positives = labels & decided
+    negatives = ~labels & decided
+    return {
+        'accuracy': float((predicted == labels)[decided].mean()) if decided.any() else 0.0,
+        'recall': float(predicted[positives].mean()) if positives.any() else 0.0,
+        'false_alarm_rate': float(predicted[negatives].mean()) if negatives.any() else 0.0,
+        'undecided': float(1.0 - decided.mean()) if len(states) else 0.0,
+        'transitions': int(np.count_nonzero(np.diff(states.astype(np.int16)))),
+    }
+
+
+def sweep(
+    policy_class: Type[SmoothingPolicy],
+    scores: np.ndarray,
+    grid: Dict[str, Sequence],
+    labels: Optional[np.ndarray] = None
+) -> List[dict]:
+    """
+    Replay a policy for every parameter combination in a grid.
+
+    Example:
+        sweep(ConsecutiveFrames, scores, {'required': [2, 3, 5], 'threshold': [0.5, 0.7]}, labels)
+
+    Returns:
+        One dict per combination with the parameters and, if labels are
+        given, the evaluate_states() metrics; otherwise the drowsy
+        fraction and transition count
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    names = list(grid)
+    results = []
+    for values in product(*(grid[name] for name in names)):
+        params = dict(zip(names, values))
+        states = policy_class(**params).replay(scores)
+        if labels is not None:
+            metrics = evaluate_states(states, labels)
+        else:
+            metrics = {
+                'drowsy_fraction': float((states == STATE_DROWSY).mean()) if len(states) else 0.0,
+                'transitions': int(np.count_nonzero(np.diff(states.astype(np.int16)))),
+            }
+        results.append({**params, **metrics})
+    return results
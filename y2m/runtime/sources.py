@@ -0,0 +1,262 @@
+"""
+Y2M Sources Module
+
+Frame sources for capture loops. Every source returns
+(ok, frame, timestamp) from read(), with the timestamp taken from
+time.perf_counter() when the frame became available, so loops measure
+capture-to-result latency the same way for a camera and a recording.
+
+- CameraCapture (capture.py): a live camera
+- ReplaySource: a video file, an image directory or a .npy stack,
+  emitted at real-time pace or as fast as the consumer reads
+"""
+
+import time
+import logging
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.webp'}
+
+PACE_FAST = 'fast'
+PACE_REALTIME = 'realtime'
+
+# Frame rate assumed for image directories, .npy stacks and videos
+# without a usable rate
+DEFAULT_FPS = 30.0
+
+
+def sample_to_frame(sample: np.ndarray) -> np.ndarray:
+    """A calibration sample (RGB, [0, 1] or uint8) as a BGR uint8 frame."""
+    if sample.dtype != np.uint8:
+        sample = np.clip(np.asarray(sample) * 255.0 + 0.5, 0, 255).astype(np.uint8)
+    return cv2.cvtColor(np.ascontiguousarray(sample), cv2.COLOR_RGB2BGR)
+
+
+class FrameSource(ABC):
+    """Base class for frame sources."""
+
+    # Set by replay sources once the last frame has been returned
+    finished = False
+
+    @abstractmethod
+    def open(self) -> bool:
+        """Open the source. Returns False if it cannot be opened."""
+
+    @abstractmethod
+    def isOpened(self) -> bool:
+        """Whether open() succeeded and release() has not been called."""
+
+    @abstractmethod
+    def read(self, timeout: float = 2.0) -> Tuple[bool, Optional[np.ndarray], float]:
+        """Return (ok, frame, timestamp); ok is False on error or end of stream."""
+
+    @abstractmethod
+    def release(self) -> None:
+        """Release the underlying device or file."""
+
+    def __enter__(self):
+        if not self.open():
+            raise OSError(f"Could not open frame source: {self}")
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def __iter__(self):
+        """Yield (frame, timestamp) until the source ends."""
+        while True:
+            ok, frame, timestamp = self.read()
+            if not ok:
+                return
+            yield frame, timestamp
+
+
+class ReplaySource(FrameSource):
+    """
+    Replays recorded frames deterministically.
+
+    In 'fast' pace every frame is returned in order as soon as it is read.
+    In 'realtime' pace frame i becomes available at start + i / fps and,
+    like a camera, frames the consumer was too slow for are dropped
+    (counted in `dropped`); the timestamp is the time the frame became
+    available, so waiting shows up in capture-to-result latency.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        pace: str = PACE_FAST,
+        fps: Optional[float] = None,
+        loop: bool = False,
+        max_frames: Optional[int] = None
+    ):
+        """
+        Initialize the source. Call open() before reading.
+
+        Args:
+            path: Video file, directory of images (sorted by name) or .npy
+                stack (calibration layout: RGB, [0, 1] or uint8)
+            pace: 'fast' or 'realtime'
+            fps: Playback rate (the video's own rate, else DEFAULT_FPS)
+            loop: Restart from the first frame at the end
+            max_frames: Stop after this many frames
+        """
+        if pace not in (PACE_FAST, PACE_REALTIME):
+            raise ValueError(f"Unknown pace: {pace}")
+
+        self.path = Path(path)
+        self.pace = pace
+        self.fps = fps
+        self.loop = loop
+        self.max_frames = max_frames
+        self.mode = {}
+
+        self.frames_read = 0
+        self.dropped = 0
+        self.finished = False
+
+        self._cap = None
+        self._items = None
+        self._length = 0
+        self._position = 0
+        self._start = 0.0
+
+    def __repr__(self) -> str:
+        return f"ReplaySource({str(self.path)!r}, pace={self.pace!r})"
+
+    def open(self) -> bool:
+        if self.path.is_dir():
+            self._items = sorted(p for p in self.path.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+            self._length = len(self._items)
+        elif self.path.suffix.lower() == '.npy':
+            self._items = np.load(self.path, mmap_mode='r')
+            self._length = len(self._items)
+        else:
+            self._cap = cv2.VideoCapture(str(self.path))
+            if not self._cap.isOpened():
+                self._cap = None
+                return False
+            self._length = int(self._cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            if self.fps is None:
+                video_fps = self._cap.get(cv2.CAP_PROP_FPS)
+                self.fps = video_fps if 0 < video_fps < 1000 else None
+
+        if self._cap is None and self._length == 0:
+            logger.error(f"No frames found in {self.path}")
+            return False
+
+        self.fps = self.fps or DEFAULT_FPS
+        self.mode = {'source': str(self.path), 'frames': self._length, 'fps': self.fps, 'pace': self.pace}
+        logger.info(f"Replaying {self.path.name}: {self._length} frames at {self.fps:.1f} FPS ({self.pace})")
+
+        self._position = 0
+        self._start = time.perf_counter()
+        return True
+
+    def isOpened(self) -> bool:
+        return self._cap is not None or self._items is not None
+
+    def _skip(self, count: int) -> None:
+        if self._cap is not None:
+            # grab() without retrieve() skips the decode
+            for _ in range(count):
+                self._cap.grab()
+        self._position += count
+
+    def _read_next(self) -> Optional[np.ndarray]:
+        if self._cap is not None:
+            ok, frame = self._cap.read()
+            self._position += 1
+            return frame if ok else None
+
+        while self._position < self._length:
+            item = self._items[self._position]
+            self._position += 1
+            if isinstance(self._items, np.ndarray):
+                return sample_to_frame(item)
+            frame = cv2.imread(str(item))
+            if frame is not None:
+                return frame
+            logger.warning(f"Could not read image: {item.name}")
+        return None
+
+    def _rewind(self) -> None:
+        if self._cap is not None:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        self._position = 0
+
+    def read(self, timeout: float = 2.0) -> Tuple[bool, Optional[np.ndarray], float]:
+        if not self.isOpened() or self.finished:
+            return False, None, 0.0
+        if self.max_frames is not None and self.frames_read >= self.max_frames:
+            self.finished = True
+            return False, None, 0.0
+
+        timestamp = time.perf_counter()
+        if self.pace == PACE_REALTIME:
+            # Frame index due now, counted across loops
+            due = int((timestamp - self._start) * self.fps)
+            emitted = self.frames_read + self.dropped
+            if due > emitted:
+                self.dropped += due - emitted
+                self._skip(due - emitted)
+            else:
+                due = emitted
+            timestamp = self._start + due / self.fps
+            time.sleep(max(0.0, timestamp - time.perf_counter()))
+
+        frame = self._read_next()
+        if frame is None and self.loop and self._position > 0:
+            self._rewind()
+            frame = self._read_next()
+        if frame is None:
+            self.finished = True
+            return False, None, 0.0
+
+        if self.pace == PACE_FAST:
+            timestamp = time.perf_counter()
+        self.frames_read += 1
+        return True, frame, timestamp
+
+    def release(self) -> None:
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+        self._items = None
+
+
+def open_source(
+    spec: Union[str, int, None],
+    target_size: Optional[Tuple[int, int]] = None,
+    pace: str = PACE_FAST,
+    fps: Optional[float] = None,
+    loop: bool = False,
+    max_frames: Optional[int] = None,
+    **camera_options
+) -> FrameSource:
+    """
+    Create (but do not open) a frame source from a command-line spec.
+
+    Args:
+        spec: Camera index ('0', 0 or None for the default camera) or a
+            path to a video, image directory or .npy stack
+        target_size: Model input (height, width) for camera negotiation
+        pace, fps, loop, max_frames: Replay options (see ReplaySource)
+        **camera_options: Passed to CameraCapture
+
+    Returns:
+        FrameSource
+    """
+    if spec is None or isinstance(spec, int) or str(spec).isdigit():
+        from .capture import CameraCapture
+
+        return CameraCapture(int(spec or 0), target_size=target_size, **camera_options)
+
+    return ReplaySource(spec, pace=pace, fps=fps, loop=loop, max_frames=max_frames)
@@ -0,0 +1,21 @@
+"""
+Y2M Runtime Statistics
+
+Latency summaries shared by the benchmark, load generator, tuner and
+model manager. NumPy only, so clients can report latency without the
+conversion stack.
+"""
+
+from typing import Dict, Sequence
+
+import numpy as np
+
+
+def latency_stats(samples_ms: Sequence[float]) -> Dict[str, float]:
+    """Summarize latency samples in milliseconds."""
+    samples = np.asarray(samples_ms, dtype=np.float64)
+    return {
+        'p50': round(float(np.percentile(samples, 50)), 3),
+        'p95': round(float(np.percentile(samples, 95)), 3),
+        'mean': round(float(samples.mean()), 3),
+    }
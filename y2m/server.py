@@ -0,0 +1,325 @@
+"""
+Y2M Server Module
+
+Asyncio HTTP/1.1 inference service for gateway boxes.
+
+    POST /v1/infer    body: JPEG/PNG (Content-Type image/*) or raw BGR
+                      pixels (application/octet-stream with X-Frame-Width
+                      and X-Frame-Height headers)
+    GET  /v1/models   model description
+    GET  /healthz     liveness and load counters
+
+Connections are kept alive. Decoding and inference run on a thread pool
+with one interpreter per worker; requests beyond the workers plus a
+short queue are rejected immediately with 503 instead of queueing.
+"""
+
+import json
+import time
+import queue
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .runtime.decoding import CONFIDENCE_THRESHOLD
+from .runtime.detector import DELEGATE_XNNPACK, TFLiteDetector
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+
+# Request limits
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 32 * 1024 * 1024
+KEEPALIVE_TIMEOUT = 30.0
+
+REASONS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    408: 'Request Timeout', 411: 'Length Required', 413: 'Payload Too Large',
+    415: 'Unsupported Media Type', 431: 'Request Header Fields Too Large',
+    500: 'Internal Server Error', 503: 'Service Unavailable',
+}
+
+
+class HTTPError(Exception):
+    """Error answered with an HTTP status code."""
+
+    def __init__(self, status: int, message: str = ''):
+        super().__init__(message or REASONS.get(status, ''))
+        self.status = status
+
+
+def _parse_head(head: bytes) -> Tuple[str, str, str, Dict[str, str]]:
+    """Parse a request line and headers into (method, path, version, headers)."""
+    lines = head.decode('latin-1').split('\r\n')
+    try:
+        method, path, version = lines[0].split(' ')
+    except ValueError:
+        raise HTTPError(400, 'Malformed request line')
+
+    headers = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, sep, value = line.partition(':')
+        if not sep:
+            raise HTTPError(400, 'Malformed header')
+        headers[name.strip().lower()] = value.strip()
+    return method, path, version, headers
+
+
+def _response(status: int, body: dict, keep_alive: bool, extra_headers: str = '') -> bytes:
+    payload = json.dumps(body).encode()
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        f"{extra_headers}\r\n"
+    )
+    return head.encode('latin-1') + payload
+
+
+class InferenceServer:
+    """
+    HTTP front end for a pool of TFLiteDetector instances.
+
+    TFLite interpreters are not thread-safe, so each executor worker
+    borrows its own detector from the pool for the duration of a request.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        workers: int = 2,
+        max_queue: int = 4,
+        num_threads: Optional[int] = 1,
+        delegate: str = DELEGATE_XNNPACK,
+        threshold: float = CONFIDENCE_THRESHOLD,
+        warmup_runs: int = 3
+    ):
+        """
+        Initialize the server. Models are loaded by start().
+
+        Args:
+            model_path: Path to the .tflite model
+            host: Bind address
+            port: Bind port
+            workers: Concurrent inferences (one interpreter each)
+            max_queue: Requests allowed to wait for a worker; beyond
+                workers + max_queue requests get 503
+            num_threads: Interpreter thread count per worker
+            delegate: See create_interpreter
+            threshold: Detection confidence threshold
+            warmup_runs: Blank invocations per interpreter before serving
+        """
+        self.model_path = str(model_path)
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers)
+        self.capacity = self.workers + max(0, max_queue)
+        self.num_threads = num_threads
+        self.delegate = delegate
+        self.threshold = threshold
+        self.warmup_runs = warmup_runs
+
+        self.detectors: List[TFLiteDetector] = []
+        self._pool: queue.SimpleQueue = queue.SimpleQueue()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+        self.in_flight = 0
+        self.stats = {'requests': 0, 'ok': 0, 'rejected': 0, 'errors': 0}
+        self.started_at = 0.0
+
+    def load_models(self) -> None:
+        """Create and warm one detector per worker."""
+        for _ in range(self.workers):
+            detector = TFLiteDetector(self.model_path, num_threads=self.num_threads, delegate=self.delegate)
+            detector.warmup(self.warmup_runs)
+            self.detectors.append(detector)
+            self._pool.put(detector)
+        logger.info(f"[OK] {self.workers} interpreter(s) ready: {self.model_path}")
+
+    def describe_model(self) -> dict:
+        detector = self.detectors[0]
+        return {
+            'path': detector.model_path,
+            'input_shape': [int(d) for d in detector.input_shape],
+            'class_names': detector.class_names,
+            'workers': self.workers,
+            'capacity': self.capacity,
+        }
+
+    def _decode_frame(self, body: bytes, headers: Dict[str, str]) -> np.ndarray:
+        content_type = headers.get('content-type', '').split(';')[0].strip().lower()
+        if content_type.startswith('image/'):
+            frame = cv2.imdecode(np.frombuffer(body, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if frame is None:
+                raise HTTPError(400, 'Could not decode image')
+            return frame
+
+        if content_type in ('application/octet-stream', ''):
+            try:
+                width = int(headers['x-frame-width'])
+                height = int(headers['x-frame-height'])
+            except (KeyError, ValueError):
+                raise HTTPError(400, 'Raw frames need X-Frame-Width and X-Frame-Height')
+            if width <= 0 or height <= 0:
+                raise HTTPError(400, f"Invalid frame size {width}x{height}")
+            if len(body) != width * height * 3:
+                raise HTTPError(400, f"Expected {width * height * 3} bytes for {width}x{height} BGR, got {len(body)}")
+            return np.frombuffer(body, dtype=np.uint8).reshape(height, width, 3)
+
+        raise HTTPError(415, f"Unsupported Content-Type: {content_type}")
+
+    def _run_inference(self, body: bytes, headers: Dict[str, str], queued_at: float) -> dict:
+        """Executor job: decode and infer on a borrowed detector."""
+        started_at = time.perf_counter()
+        frame = self._decode_frame(body, headers)
+
+        detector = self._pool.get()
+        try:
+            inference_start = time.perf_counter()
+            output = detector.predict(frame)
+            inference_ms = (time.perf_counter() - inference_start) * 1000
+        finally:
+            self._pool.put(detector)
+
+        scores = detector.class_scores(output)
+        return {
+            'detections': [
+                {'class': name, 'confidence': confidence, 'bbox': None if bbox is None else [float(v) for v in bbox]}
+                for name, confidence, bbox in detector.decode(output, self.threshold)
+            ],
+            'scores': {name: float(score) for name, score in zip(detector.class_names, scores)},
+            'queue_ms': round((started_at - queued_at) * 1000, 3),
+            'inference_ms': round(inference_ms, 3),
+        }
+
+    async def _handle_request(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Tuple[int, dict, str]:
+        path = path.split('?')[0]
+        if path == '/healthz':
+            if method != 'GET':
+                raise HTTPError(405)
+            return 200, {
+                'status': 'ok',
+                'in_flight': self.in_flight,
+                'capacity': self.capacity,
+                'uptime_s': round(time.monotonic() - self.started_at, 1),
+                **self.stats,
+            }, ''
+
+        if path == '/v1/models':
+            if method != 'GET':
+                raise HTTPError(405)
+            return 200, self.describe_model(), ''
+
+        if path != '/v1/infer':
+            raise HTTPError(404)
+        if method != 'POST':
+            raise HTTPError(405)
+
+        # Admission control: reject instead of queueing without bound
+        if self.in_flight >= self.capacity:
+            self.stats['rejected'] += 1
+            return 503, {'error': 'Server overloaded'}, 'Retry-After: 1\r\n'
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                self._executor, self._run_inference, body, headers, time.perf_counter()
+            )
+        finally:
+            self.in_flight -= 1
+        self.stats['ok'] += 1
+        return 200, result, ''
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEPALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    writer.write(_response(431, {'error': REASONS[431]}, False))
+                    await writer.drain()
+                    return
+
+                keep_alive = False
+                try:
+                    method, path, version, headers = _parse_head(head[:-4])
+                    connection = headers.get('connection', '').lower()
+                    keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+                    body = b''
+                    if 'transfer-encoding' in headers:
+                        keep_alive = False
+                        raise HTTPError(411, 'Chunked bodies are not supported; send Content-Length')
+                    try:
+                        length = int(headers.get('content-length', 0) or 0)
+                    except ValueError:
+                        keep_alive = False
+                        raise HTTPError(400, 'Invalid Content-Length')
+                    if length > MAX_BODY_BYTES:
+                        keep_alive = False
+                        raise HTTPError(413)
+                    if length:
+                        body = await reader.readexactly(length)
+
+                    self.stats['requests'] += 1
+                    status, payload, extra = await self._handle_request(method, path, headers, body)
+                except HTTPError as e:
+                    status, payload, extra = e.status, {'error': str(e)}, ''
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except Exception as e:
+                    logger.exception("Request failed")
+                    self.stats['errors'] += 1
+                    status, payload, extra = 500, {'error': str(e)}, ''
+
+                writer.write(_response(status, payload, keep_alive, extra))
+                await writer.drain()
+                if not keep_alive:
+                    return
+        finally:
+            writer.close()
+
+    async def start(self) -> None:
+        """Load models and start listening."""
+        if not self.detectors:
+            self.load_models()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='y2m-infer')
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port, limit=MAX_HEADER_BYTES
+        )
+        self.started_at = time.monotonic()
+        logger.info(f"[OK] Listening on http://{self.host}:{self.port} "
+                    f"({self.workers} workers, {self.capacity - self.workers} queued max)")
+
+    async def serve_forever(self) -> None:
+        """Start (if needed) and serve until cancelled."""
+        if self._server is None:
+            await self.start()
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            self._executor.shutdown(wait=False)
+
+    async def close(self) -> None:
+        """Stop listening and shut down the executor."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
@@ -0,0 +1,7 @@
+"""Compatibility alias: the smoothing module moved to y2m.runtime.smoothing."""
+
+import sys
+
+from .runtime import smoothing
+
+sys.modules[__name__] = smoothing
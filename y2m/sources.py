@@ -0,0 +1,7 @@
+"""Compatibility alias: the sources module moved to y2m.runtime.sources."""
+
+import sys
+
+from .runtime import sources
+
+sys.modules[__name__] = sources
@@ -0,0 +1,412 @@
+"""
+Y2M TFLite Inspect Module
+
+Static analysis of .tflite artifacts without TensorFlow or an interpreter:
+the flatbuffer is read directly with the `flatbuffers` runtime. Reports
+tensor shapes, dtypes and quantization, an op histogram, per-tensor
+weight bytes and an estimated MAC count (convolutions, fully connected
+and matmul ops) with a rough latency estimate.
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+from flatbuffers import encode, number_types as N, packer
+from flatbuffers.table import Table
+
+logger = logging.getLogger(__name__)
+
+FILE_IDENTIFIER = b'TFL3'
+
+# Rough single-core XNNPACK float throughput used for the latency
+# estimate; pass a measured value for the target device
+DEFAULT_GMACS_PER_S = 25.0
+
+# Weight tensors listed in reports, largest first
+TOP_TENSORS = 10
+
+TENSOR_TYPES = (
+    'float32', 'float16', 'int32', 'uint8', 'int64', 'string', 'bool', 'int16',
+    'complex64', 'int8', 'float64', 'complex128', 'uint64', 'resource', 'variant',
+    'uint32', 'uint16', 'int4', 'bfloat16', 'int2', 'uint4', 'float8_e4m3fn', 'float8_e5m2',
+)
+
+# Bits per element, for tensors without a buffer
+_TYPE_BITS = {
+    'float32': 32, 'float16': 16, 'int32': 32, 'uint8': 8, 'int64': 64, 'bool': 8,
+    'int16': 16, 'complex64': 64, 'int8': 8, 'float64': 64, 'complex128': 128,
+    'uint64': 64, 'uint32': 32, 'uint16': 16, 'int4': 4, 'bfloat16': 16, 'int2': 2,
+    'uint4': 4, 'float8_e4m3fn': 8, 'float8_e5m2': 8,
+}
+
+FLOAT_TYPES = ('float32', 'float16', 'float64', 'bfloat16')
+
+# BuiltinOperator enum (schema.fbs), indexed by code
+BUILTIN_OPS = """
+    ADD AVERAGE_POOL_2D CONCATENATION CONV_2D DEPTHWISE_CONV_2D DEPTH_TO_SPACE
+    DEQUANTIZE EMBEDDING_LOOKUP FLOOR FULLY_CONNECTED HASHTABLE_LOOKUP
+    L2_NORMALIZATION L2_POOL_2D LOCAL_RESPONSE_NORMALIZATION LOGISTIC
+    LSH_PROJECTION LSTM MAX_POOL_2D MUL RELU RELU_N1_TO_1 RELU6 RESHAPE
+    RESIZE_BILINEAR RNN SOFTMAX SPACE_TO_DEPTH SVDF TANH CONCAT_EMBEDDINGS
+    SKIP_GRAM CALL CUSTOM EMBEDDING_LOOKUP_SPARSE PAD
+    UNIDIRECTIONAL_SEQUENCE_RNN GATHER BATCH_TO_SPACE_ND SPACE_TO_BATCH_ND
+    TRANSPOSE MEAN SUB DIV SQUEEZE UNIDIRECTIONAL_SEQUENCE_LSTM STRIDED_SLICE
+    BIDIRECTIONAL_SEQUENCE_RNN EXP TOPK_V2 SPLIT LOG_SOFTMAX DELEGATE
+    BIDIRECTIONAL_SEQUENCE_LSTM CAST PRELU MAXIMUM ARG_MAX MINIMUM LESS NEG
+    PADV2 GREATER GREATER_EQUAL LESS_EQUAL SELECT SLICE SIN TRANSPOSE_CONV
+    SPARSE_TO_DENSE TILE EXPAND_DIMS EQUAL NOT_EQUAL LOG SUM SQRT RSQRT SHAPE
+    POW ARG_MIN FAKE_QUANT REDUCE_PROD REDUCE_MAX PACK LOGICAL_OR ONE_HOT
+    LOGICAL_AND LOGICAL_NOT UNPACK REDUCE_MIN FLOOR_DIV REDUCE_ANY SQUARE
+    ZEROS_LIKE FILL FLOOR_MOD RANGE RESIZE_NEAREST_NEIGHBOR LEAKY_RELU
+    SQUARED_DIFFERENCE MIRROR_PAD ABS SPLIT_V UNIQUE CEIL REVERSE_V2 ADD_N
+    GATHER_ND COS WHERE RANK ELU REVERSE_SEQUENCE MATRIX_DIAG QUANTIZE
+    MATRIX_SET_DIAG ROUND HARD_SWISH IF WHILE NON_MAX_SUPPRESSION_V4
+    NON_MAX_SUPPRESSION_V5 SCATTER_ND SELECT_V2 DENSIFY SEGMENT_SUM BATCH_MATMUL
+    PLACEHOLDER_FOR_GREATER_OP_CODES CUMSUM CALL_ONCE BROADCAST_TO RFFT2D
+    CONV_3D IMAG REAL COMPLEX_ABS HASHTABLE HASHTABLE_FIND HASHTABLE_IMPORT
+    HASHTABLE_SIZE REDUCE_ALL CONV_3D_TRANSPOSE VAR_HANDLE READ_VARIABLE
+    ASSIGN_VARIABLE BROADCAST_ARGS RANDOM_STANDARD_NORMAL BUCKETIZE
+    RANDOM_UNIFORM MULTINOMIAL GELU DYNAMIC_UPDATE_SLICE RELU_0_TO_1
+    UNSORTED_SEGMENT_PROD UNSORTED_SEGMENT_MAX UNSORTED_SEGMENT_SUM ATAN2
+    UNSORTED_SEGMENT_MIN SIGN BITCAST BITWISE_XOR RIGHT_SHIFT STABLEHLO_LOGISTIC
+    STABLEHLO_ADD STABLEHLO_DIVIDE STABLEHLO_MULTIPLY STABLEHLO_MAXIMUM
+    STABLEHLO_RESHAPE STABLEHLO_CLAMP STABLEHLO_CONCATENATE
+    STABLEHLO_BROADCAST_IN_DIM STABLEHLO_CONVOLUTION STABLEHLO_SLICE
+    STABLEHLO_CUSTOM_CALL STABLEHLO_REDUCE STABLEHLO_ABS STABLEHLO_AND
+    STABLEHLO_COSINE STABLEHLO_EXPONENTIAL STABLEHLO_FLOOR STABLEHLO_LOG
+    STABLEHLO_MINIMUM STABLEHLO_NEGATE STABLEHLO_OR STABLEHLO_POWER
+    STABLEHLO_REMAINDER STABLEHLO_RSQRT STABLEHLO_SELECT STABLEHLO_SUBTRACT
+    STABLEHLO_TANH STABLEHLO_SCATTER STABLEHLO_COMPARE STABLEHLO_CONVERT
+    STABLEHLO_DYNAMIC_SLICE STABLEHLO_DYNAMIC_UPDATE_SLICE STABLEHLO_PAD
+    STABLEHLO_IOTA STABLEHLO_DOT_GENERAL STABLEHLO_REDUCE_WINDOW STABLEHLO_SORT
+    STABLEHLO_WHILE STABLEHLO_GATHER STABLEHLO_TRANSPOSE DILATE
+    STABLEHLO_RNG_BIT_GENERATOR REDUCE_WINDOW STABLEHLO_COMPOSITE
+    STABLEHLO_SHIFT_LEFT STABLEHLO_CBRT STABLEHLO_CASE""".split()
+
+# Weight operand index and MAC formula per op (see _op_macs)
+_MAC_OPS = ('CONV_2D', 'DEPTHWISE_CONV_2D', 'FULLY_CONNECTED', 'TRANSPOSE_CONV', 'BATCH_MATMUL', 'CONV_3D')
+
+
+class _Table:
+    """Field access on a flatbuffer table by schema field index."""
+
+    def __init__(self, buf: bytes, pos: int):
+        self.buf = buf
+        self._tab = Table(buf, pos)
+
+    def _offset(self, field: int) -> int:
+        return self._tab.Offset(4 + 2 * field)
+
+    def scalar(self, field: int, flags, default=0):
+        o = self._offset(field)
+        return self._tab.Get(flags, o + self._tab.Pos) if o else default
+
+    def string(self, field: int) -> Optional[str]:
+        o = self._offset(field)
+        return self._tab.String(o + self._tab.Pos).decode('utf-8', 'replace') if o else None
+
+    def table(self, field: int) -> Optional['_Table']:
+        o = self._offset(field)
+        return _Table(self.buf, self._tab.Indirect(o + self._tab.Pos)) if o else None
+
+    def tables(self, field: int) -> List['_Table']:
+        o = self._offset(field)
+        if not o:
+            return []
+        start = self._tab.Vector(o)
+        return [
+            _Table(self.buf, self._tab.Indirect(start + 4 * i))
+            for i in range(self._tab.VectorLen(o))
+        ]
+
+    def array(self, field: int, dtype: str) -> np.ndarray:
+        o = self._offset(field)
+        if not o:
+            return np.empty(0, dtype=dtype)
+        return np.frombuffer(self.buf, dtype=dtype, count=self._tab.VectorLen(o), offset=self._tab.Vector(o))
+
+    def vector_len(self, field: int) -> int:
+        o = self._offset(field)
+        return self._tab.VectorLen(o) if o else 0
+
+
+def _buffer_bytes(buffer: _Table) -> int:
+    """Size of a Buffer: inline data, or external offset/size (models over 2 GB)."""
+    size = buffer.vector_len(0)
+    if not size and buffer.scalar(1, N.Uint64Flags) > 1:
+        size = buffer.scalar(2, N.Uint64Flags)
+    return size
+
+
+def _quantization(params: Optional[_Table]) -> Optional[Dict[str, Any]]:
+    if params is None:
+        return None
+    scale = params.array(2, '<f4')
+    zero_point = params.array(3, '<i8')
+    if not scale.size:
+        return None
+    if scale.size == 1:
+        return {'scale': float(scale[0]), 'zero_point': int(zero_point[0]) if zero_point.size else 0}
+    return {
+        'per_channel': int(scale.size),
+        'quantized_dimension': params.scalar(6, N.Int32Flags),
+        'scale_range': [float(scale.min()), float(scale.max())],
+    }
+
+
+def _op_name(code: _Table) -> str:
+    # deprecated_builtin_code (int8) holds codes < 127; builtin_code the rest
+    builtin = max(code.scalar(0, N.Int8Flags), code.scalar(3, N.Int32Flags))
+    if BUILTIN_OPS[builtin:builtin + 1] == ['CUSTOM']:
+        return f"CUSTOM:{code.string(1)}"
+    return BUILTIN_OPS[builtin] if builtin < len(BUILTIN_OPS) else f"BUILTIN_{builtin}"
+
+
+def _op_macs(op: str, inputs: List[Dict[str, Any]], outputs: List[Dict[str, Any]]) -> int:
+    """Multiply-accumulates of one op from its operand shapes (0 if not counted)."""
+    if op not in _MAC_OPS or len(inputs) < 2 or not outputs or inputs[1] is None or outputs[0] is None:
+        return 0
+    weights = inputs[1]['shape']
+    out_elements = int(np.prod(outputs[0]['shape'], dtype=np.int64))
+    if op == 'CONV_2D' and len(weights) == 4:
+        # [Cout, Kh, Kw, Cin]
+        return out_elements * int(np.prod(weights[1:]))
+    if op == 'DEPTHWISE_CONV_2D' and len(weights) == 4:
+        # [1, Kh, Kw, Cout]
+        return out_elements * weights[1] * weights[2]
+    if op == 'CONV_3D' and len(weights) == 5:
+        # [Kd, Kh, Kw, Cin, Cout]
+        return out_elements * int(np.prod(weights[:4]))
+    if op == 'FULLY_CONNECTED' and len(weights) == 2:
+        # [Cout, Cin]
+        return out_elements * weights[1]
+    if op == 'BATCH_MATMUL' and inputs[0] is not None and inputs[0]['shape']:
+        return out_elements * inputs[0]['shape'][-1]
+    if op == 'TRANSPOSE_CONV' and len(inputs) > 2 and inputs[2] is not None:
+        # inputs: output_shape, weights [Cout, Kh, Kw, Cin], input
+        weights = inputs[1]['shape']
+        return int(np.prod(inputs[2]['shape'], dtype=np.int64)) * weights[0] * weights[1] * weights[2]
+    return 0
+
+
+def _read_tensor(tensor: _Table, buffers: List[_Table]) -> Dict[str, Any]:
+    type_code = tensor.scalar(1, N.Int8Flags)
+    dtype = TENSOR_TYPES[type_code] if type_code < len(TENSOR_TYPES) else f"type_{type_code}"
+    buffer_index = tensor.scalar(2, N.Uint32Flags)
+    constant_bytes = _buffer_bytes(buffers[buffer_index]) if 0 < buffer_index < len(buffers) else 0
+
+    info = {
+        'name': tensor.string(3) or '',
+        'shape': [int(d) for d in tensor.array(0, '<i4')],
+        'dtype': dtype,
+        'bytes': constant_bytes,
+        'constant': constant_bytes > 0,
+    }
+    signature = tensor.array(7, '<i4')
+    if signature.size and (signature < 0).any():
+        info['shape_signature'] = [int(d) for d in signature]
+    if tensor.table(6) is not None:
+        info['sparse'] = True
+    quantization = _quantization(tensor.table(4))
+    if quantization:
+        info['quantization'] = quantization
+    if not constant_bytes:
+        elements = int(np.prod(info['shape'], dtype=np.int64))
+        info['activation_bytes'] = elements * _TYPE_BITS.get(dtype, 0) // 8
+    return info
+
+
+def read_model(source: Union[str, Path, bytes]) -> Dict[str, Any]:
+    """
+    Parse a .tflite flatbuffer.
+
+    Args:
+        source: Path to a .tflite file, or its content
+
+    Returns:
+        Dictionary with 'version', 'description', 'operator_codes' (op
+        names) and 'subgraphs' (tensors, inputs, outputs, operators)
+
+    Raises:
+        ValueError: If the data is not a TFLite flatbuffer
+    """
+    buf = source if isinstance(source, (bytes, bytearray)) else Path(source).read_bytes()
+    if len(buf) < 8 or buf[4:8] != FILE_IDENTIFIER:
+        raise ValueError("Not a TFLite flatbuffer (missing TFL3 identifier)")
+
+    model = _Table(buf, encode.Get(packer.uoffset, buf, 0))
+    buffers = model.tables(4)
+    op_names = [_op_name(code) for code in model.tables(1)]
+
+    subgraphs = []
+    for subgraph in model.tables(2):
+        tensors = [_read_tensor(tensor, buffers) for tensor in subgraph.tables(0)]
+        operators = []
+        for op in subgraph.tables(3):
+            opcode = op.scalar(0, N.Uint32Flags)
+            operators.append({
+                'op': op_names[opcode] if opcode < len(op_names) else f"opcode_{opcode}",
+                'inputs': [int(i) for i in op.array(1, '<i4')],
+                'outputs': [int(i) for i in op.array(2, '<i4')],
+            })
+        subgraphs.append({
+            'name': subgraph.string(4) or '',
+            'tensors': tensors,
+            'inputs': [int(i) for i in subgraph.array(1, '<i4')],
+            'outputs': [int(i) for i in subgraph.array(2, '<i4')],
+            'operators': operators,
+        })
+
+    return {
+        'version': model.scalar(0, N.Uint32Flags),
+        'description': model.string(3),
+        'file_bytes': len(buf),
+        'operator_codes': op_names,
+        'subgraphs': subgraphs,
+    }
+
+
+def _io(tensor: Dict[str, Any]) -> Dict[str, Any]:
+    keys = ('name', 'shape', 'shape_signature', 'dtype', 'quantization')
+    return {key: tensor[key] for key in keys if key in tensor}
+
+
+def inspect_model(
+    path: Union[str, Path],
+    gmacs_per_s: float = DEFAULT_GMACS_PER_S,
+    top: int = TOP_TENSORS
+) -> Dict[str, Any]:
+    """
+    Summarize a .tflite artifact.
+
+    Args:
+        path: Model path
+        gmacs_per_s: Throughput (GMAC/s) for the latency estimate
+        top: Largest weight tensors to list
+
+    Returns:
+        Report with inputs/outputs, op histogram, weight bytes by dtype,
+        float (non-quantized) weights, the largest weight tensors, MACs
+        per op type and the estimated latency
+    """
+    model = read_model(path)
+    ops: Dict[str, int] = {}
+    macs_by_op: Dict[str, int] = {}
+    weights_by_dtype: Dict[str, int] = {}
+    weights = []
+    sparse = 0
+
+    for subgraph in model['subgraphs']:
+        tensors = subgraph['tensors']
+        for op in subgraph['operators']:
+            ops[op['op']] = ops.get(op['op'], 0) + 1
+            macs = _op_macs(
+                op['op'],
+                [tensors[i] if i >= 0 else None for i in op['inputs']],
+                [tensors[i] if i >= 0 else None for i in op['outputs']]
+            )
+            if macs:
+                macs_by_op[op['op']] = macs_by_op.get(op['op'], 0) + macs
+        for tensor in tensors:
+            if not tensor['constant']:
+                continue
+            weights_by_dtype[tensor['dtype']] = weights_by_dtype.get(tensor['dtype'], 0) + tensor['bytes']
+            weights.append(tensor)
+            sparse += bool(tensor.get('sparse'))
+
+    main = model['subgraphs'][0] if model['subgraphs'] else {'tensors': [], 'inputs': [], 'outputs': []}
+    total_macs = sum(macs_by_op.values())
+    weight_bytes = sum(weights_by_dtype.values())
+    float_weights = [t for t in weights if t['dtype'] in FLOAT_TYPES]
+    quantized = any('quantization' in t for t in weights)
+    weights.sort(key=lambda t: t['bytes'], reverse=True)
+
+    return {
+        'model': Path(path).name,
+        'file_bytes': model['file_bytes'],
+        'schema_version': model['version'],
+        'subgraphs': len(model['subgraphs']),
+        'inputs': [_io(main['tensors'][i]) for i in main['inputs']],
+        'outputs': [_io(main['tensors'][i]) for i in main['outputs']],
+        'operators': sum(ops.values()),
+        'op_histogram': dict(sorted(ops.items(), key=lambda item: -item[1])),
+        'tensors': sum(len(s['tensors']) for s in model['subgraphs']),
+        'weight_bytes': weight_bytes,
+        'weight_bytes_by_dtype': weights_by_dtype,
+        'float_weight_bytes': sum(t['bytes'] for t in float_weights),
+        # Float weights in a model that is otherwise quantized
+        'non_quantized_weights': [t['name'] for t in float_weights] if quantized else [],
+        'sparse_tensors': sparse,
+        'largest_weights': [
+            {'name': t['name'], 'shape': t['shape'], 'dtype': t['dtype'], 'bytes': t['bytes']}
+            for t in weights[:top]
+        ],
+        'macs': total_macs,
+        'macs_by_op': macs_by_op,
+        'estimated_ms': round(total_macs / (gmacs_per_s * 1e9) * 1000, 3) if gmacs_per_s > 0 else None,
+        'gmacs_per_s': gmacs_per_s,
+    }
+
+
+def find_models(paths: Sequence[Union[str, Path]]) -> List[Path]:
+    """Expand files and directories (searched recursively) into .tflite paths."""
+    models = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            models.extend(sorted(path.rglob('*.tflite')))
+        else:
+            models.append(path)
+    return models
+
+
+def _mb(size: int) -> str:
+    return f"{size / 1024 / 1024:.2f} MB"
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Text report for one model."""
+    lines = [f"{report['model']}: {_mb(report['file_bytes'])}, {report['operators']} ops, "
+             f"{report['tensors']} tensors, {report['subgraphs']} subgraph(s)"]
+    for kind in ('inputs', 'outputs'):
+        for tensor in report[kind]:
+            shape = tensor.get('shape_signature', tensor['shape'])
+            quantization = tensor.get('quantization')
+            q = f"  scale={quantization['scale']:.6g} zp={quantization['zero_point']}" \
+                if quantization and 'scale' in quantization else ''
+            lines.append(f"  {kind[:-1]:<7} {tensor['name']:<32} {str(shape):<20} {tensor['dtype']}{q}")
+
+    estimate = f" (~{report['estimated_ms']:.1f} ms at {report['gmacs_per_s']:g} GMAC/s)" \
+        if report['estimated_ms'] is not None else ''
+    lines.append(f"  MACs    {report['macs'] / 1e9:.3f} G{estimate}")
+    for op, macs in sorted(report['macs_by_op'].items(), key=lambda item: -item[1]):
+        lines.append(f"          {op:<24} {macs / 1e9:>8.3f} G")
+
+    by_dtype = ', '.join(f"{dtype} {_mb(size)}" for dtype, size in report['weight_bytes_by_dtype'].items())
+    lines.append(f"  Weights {_mb(report['weight_bytes'])} ({by_dtype or 'none'})")
+    if report['sparse_tensors']:
+        lines.append(f"          {report['sparse_tensors']} sparse tensor(s)")
+    if report['non_quantized_weights']:
+        lines.append(f"          {len(report['non_quantized_weights'])} float tensor(s) in a quantized model")
+    for tensor in report['largest_weights']:
+        lines.append(f"          {tensor['bytes'] / 1024:>9.1f} KB  {tensor['dtype']:<8} "
+                     f"{str(tensor['shape']):<20} {tensor['name']}")
+
+    lines.append("  Ops     " + ', '.join(f"{op} x{count}" for op, count in report['op_histogram'].items()))
+    return '\n'.join(lines)
+
+
+def format_table(reports: List[Dict[str, Any]]) -> str:
+    """One line per model, for scanning many artifacts."""
+    lines = [f"{'Model':<40} {'Size':>10} {'Weights':>10} {'Float':>7} {'Ops':>5} {'GMACs':>7} {'Est ms':>8}  Input"]
+    for report in reports:
+        if 'error' in report:
+            lines.append(f"{report['model']:<40} ERROR: {report['error']}")
+            continue
+        float_share = report['float_weight_bytes'] / report['weight_bytes'] if report['weight_bytes'] else 0.0
+        estimate = f"{report['estimated_ms']:.1f}" if report['estimated_ms'] is not None else 'n/a'
+        inputs = ', '.join(f"{t['dtype']}{t.get('shape_signature', t['shape'])}" for t in report['inputs'])
+        lines.append(f"{report['model'][:40]:<40} {_mb(report['file_bytes']):>10} {_mb(report['weight_bytes']):>10} "
+                     f"{float_share:>7.0%} {report['operators']:>5} {report['macs'] / 1e9:>7.2f} {estimate:>8}  {inputs}")
+    return '\n'.join(lines)
@@ -0,0 +1,296 @@
+"""
+Y2M Trace Module
+
+Append-only per-frame trace recorder for post-incident analysis.
+
+Each frame becomes one fixed-width NumPy record (timestamp, raw class
+scores, smoothed state, stage latencies). Records are buffered in a
+preallocated chunk and flushed either to a memory-mappable .npy segment
+or to a Parquet part file (polars), one directory per day:
+
+    traces/
+        2026-01-08/
+            stream-0-083000-4121.npy
+            stream-1-083000-4121-0000.parquet
+"""
+
+import os
+import time
+import logging
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .runtime.decoding import DEFAULT_CLASS_NAMES
+from .npy_stream import NpyStreamWriter
+
+logger = logging.getLogger(__name__)
+
+FORMAT_NPY = 'npy'
+FORMAT_PARQUET = 'parquet'
+
+# Records converted per batch when scanning .npy segments
+SCAN_BATCH_SIZE = 65536
+
+# Default latency stages, in milliseconds
+STAGES = ('capture', 'preprocess', 'inference', 'postprocess', 'total')
+
+
+def trace_dtype(
+    class_names: Sequence[str] = DEFAULT_CLASS_NAMES,
+    stages: Sequence[str] = STAGES
+) -> np.dtype:
+    """Flat record layout: one scalar column per score and per stage."""
+    fields = [('timestamp', '<f8'), ('stream', '<u2'), ('frame', '<u4')]
+    fields += [(f"score_{name}", '<f4') for name in class_names]
+    fields += [('state', 'i1')]
+    fields += [(f"{stage}_ms", '<f4') for stage in stages]
+    return np.dtype(fields)
+
+
+def _day_bounds(timestamp: float) -> tuple:
+    day = datetime.fromtimestamp(timestamp).date()
+    start = datetime.combine(day, datetime.min.time()).timestamp()
+    end = datetime.combine(day + timedelta(days=1), datetime.min.time()).timestamp()
+    return day, start, end
+
+
+class TraceWriter:
+    """
+    Records per-frame traces for one stream.
+
+    record() only writes into a preallocated buffer; disk I/O happens
+    once per chunk. The .npy header is rewritten on every flush so a
+    crashed process still leaves readable traces up to the last chunk.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        stream_id: int = 0,
+        class_names: Sequence[str] = DEFAULT_CLASS_NAMES,
+        stages: Sequence[str] = STAGES,
+        chunk_size: int = 4096,
+        format: str = FORMAT_NPY
+    ):
+        """
+        Initialize the writer. Files are created on first flush.
+
+        Args:
+            root: Trace root directory
+            stream_id: Identifier of the camera/stream
+            class_names: Class names (one score column each)
+            stages: Latency stage names (one column each)
+            chunk_size: Records buffered between flushes
+            format: 'npy' (memory-mappable segments) or 'parquet'
+        """
+        if format not in (FORMAT_NPY, FORMAT_PARQUET):
+            raise ValueError(f"Unknown trace format: {format}")
+
+        self.root = Path(root)
+        self.stream_id = stream_id
+        self.class_names = list(class_names)
+        self.stages = list(stages)
+        self.format = format
+        self.dtype = trace_dtype(self.class_names, self.stages)
+
+        self._buffer = np.zeros(chunk_size, dtype=self.dtype)
+        self._num_stages = len(self.stages)
+        self._nan_stages = (float('nan'),) * self._num_stages
+        self._count = 0
+        self._frame = 0
+        self._day = None
+        self._day_end = 0.0
+        self._started = ''
+        self._segment = None
+        self._part = 0
+        self.records_written = 0
+
+    def record(
+        self,
+        scores: Sequence[float],
+        state: int,
+        latencies_ms: Sequence[float] = (),
+        timestamp: Optional[float] = None
+    ) -> None:
+        """
+        Append one frame.
+
+        Args:
+            scores: Raw class scores, in class_names order
+            state: Smoothed state (see y2m.smoothing)
+            latencies_ms: Stage latencies, in stages order (missing stages are NaN)
+            timestamp: Wall-clock time in seconds (time.time() if None)
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        if timestamp >= self._day_end:
+            self._rotate(timestamp)
+
+        # One tuple assignment is several times cheaper than per-field writes
+        latencies = tuple(latencies_ms)
+        if len(latencies) != self._num_stages:
+            latencies = (latencies + self._nan_stages)[:self._num_stages]
+        self._buffer[self._count] = (
+            (timestamp, self.stream_id, self._frame) + tuple(scores) + (state,) + latencies
+        )
+
+        self._frame += 1
+        self._count += 1
+        if self._count == len(self._buffer):
+            self.flush()
+
+    def _rotate(self, timestamp: float) -> None:
+        self.flush()
+        self._close_segment()
+        self._day, _, self._day_end = _day_bounds(timestamp)
+        self._started = datetime.fromtimestamp(timestamp).strftime('%H%M%S')
+        self._part = 0
+
+    def _segment_stem(self) -> str:
+        return f"stream-{self.stream_id}-{self._started}-{os.getpid()}"
+
+    def flush(self) -> None:
+        """Write buffered records to disk."""
+        if self._count == 0:
+            return
+
+        chunk = self._buffer[:self._count]
+        day_dir = self.root / self._day.isoformat()
+        day_dir.mkdir(parents=True, exist_ok=True)
+
+        if self.format == FORMAT_NPY:
+            if self._segment is None:
+                self._segment = NpyStreamWriter(day_dir / f"{self._segment_stem()}.npy", (), self.dtype)
+            self._segment.append(chunk)
+            self._segment.flush()
+        else:
+            import polars as pl
+
+            frame = pl.DataFrame({name: chunk[name] for name in self.dtype.names})
+            frame.write_parquet(day_dir / f"{self._segment_stem()}-{self._part:04d}.parquet")
+            self._part += 1
+
+        self.records_written += self._count
+        self._count = 0
+
+    def _close_segment(self) -> None:
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+
+    def close(self) -> None:
+        """Flush and close the current segment."""
+        self.flush()
+        self._close_segment()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _day_dir(root: str, day: Union[str, date, None]) -> Path:
+    if day is None:
+        day = date.today()
+    if isinstance(day, date):
+        day = day.isoformat()
+    return Path(root) / day
+
+
+def _stream_matches(path: Path, streams: Optional[Sequence[int]]) -> bool:
+    if streams is None:
+        return True
+    parts = path.stem.split('-')
+    return len(parts) > 1 and parts[1].isdigit() and int(parts[1]) in streams
+
+
+def iter_trace_segments(
+    root: str,
+    day: Union[str, date, None] = None,
+    streams: Optional[Sequence[int]] = None
+) -> Iterator[np.ndarray]:
+    """
+    Yield the .npy segments of a day as read-only memory maps.
+
+    Nothing is read from disk until the records are accessed.
+    """
+    for path in sorted(_day_dir(root, day).glob('stream-*.npy')):
+        if _stream_matches(path, streams):
+            yield np.load(path, mmap_mode='r')
+
+
+def _scan_segment(path: Path):
+    """
+    LazyFrame over one .npy segment.
+
+    Only the header is read here. At collect time the records are read
+    from a memory map in batches; each batch converts only the projected
+    columns and is filtered before the next one is read.
+    """
+    import polars as pl
+    from polars.io.plugins import register_io_source
+
+    schema = pl.from_numpy(np.load(path, mmap_mode='r')[:0]).schema
+
+    def source(with_columns, predicate, n_rows, batch_size):
+        records = np.load(path, mmap_mode='r')
+        columns = list(with_columns) if with_columns is not None else list(schema)
+        step = batch_size or SCAN_BATCH_SIZE
+        remaining = n_rows
+        for start in range(0, len(records), step):
+            chunk = records[start:start + step]
+            batch = pl.DataFrame({name: np.asarray(chunk[name]) for name in columns})
+            if predicate is not None:
+                batch = batch.filter(predicate)
+            if remaining is not None:
+                batch = batch.head(remaining)
+                remaining -= batch.height
+            yield batch
+            if remaining == 0:
+                return
+
+    return register_io_source(source, schema=schema)
+
+
+def scan_traces(
+    root: str,
+    day: Union[str, date, None] = None,
+    streams: Optional[Sequence[int]] = None
+):
+    """
+    Lazily scan a day of traces with polars.
+
+    Nothing is loaded until collect(). Parquet parts are scanned by
+    polars; .npy segments are read from memory maps in batches of
+    SCAN_BATCH_SIZE records, converting only the columns the query uses
+    and filtering each batch as it is read.
+
+    Args:
+        root: Trace root directory
+        day: 'YYYY-MM-DD', a date, or None for today
+        streams: Restrict to these stream ids
+
+    Returns:
+        polars LazyFrame sorted by timestamp
+    """
+    import polars as pl
+
+    day_dir = _day_dir(root, day)
+    frames: List = []
+
+    parquet_files = [p for p in sorted(day_dir.glob('stream-*.parquet')) if _stream_matches(p, streams)]
+    if parquet_files:
+        frames.append(pl.scan_parquet([str(p) for p in parquet_files]))
+
+    for path in sorted(day_dir.glob('stream-*.npy')):
+        if _stream_matches(path, streams) and len(np.load(path, mmap_mode='r')):
+            frames.append(_scan_segment(path))
+
+    if not frames:
+        raise FileNotFoundError(f"No traces found in {day_dir}")
+
+    return pl.concat(frames, how='diagonal_relaxed').sort('timestamp')
@@ -0,0 +1,297 @@
+"""
+Y2M Tuner Module
+
+Searches deployment configurations (input size, precision, thread count,
+delegate) on the local machine and picks the fastest one whose accuracy
+stays within a budget of the .pt reference.
+
+Frame skipping is not searched: calibration sets are independent images,
+not a time sequence, so the accuracy of a skipping loop cannot be scored
+on them.
+"""
+
+import os
+import time
+import json
+import logging
+import platform
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .calibration import load_calibration_set, sample_to_frame
+from .converter import YOLOConverter
+from .runtime.detector import DELEGATE_XNNPACK, TFLiteDetector
+from .runtime.stats import latency_stats
+from .optimizer import quantize_with_ultralytics
+from .utils import update_metadata
+
+logger = logging.getLogger(__name__)
+
+PRECISIONS = ('float32', 'float16', 'int8')
+
+
+def benchmark_model(
+    model_path: Path,
+    frames: Sequence[np.ndarray],
+    runs: int = 30,
+    num_threads: Optional[int] = None,
+    delegate: str = DELEGATE_XNNPACK
+) -> Dict[str, float]:
+    """Time preprocess + invoke of a .tflite on sample frames after warmup."""
+    detector = TFLiteDetector(str(model_path), num_threads=num_threads, delegate=delegate)
+    detector.warmup(3)
+    timings = []
+    for i in range(runs):
+        frame = frames[i % len(frames)]
+        start = time.perf_counter()
+        detector.predict(frame)
+        timings.append((time.perf_counter() - start) * 1000)
+    return latency_stats(timings)
+
+
+def predict_top1(model_path: Path, frames: Sequence[np.ndarray]) -> np.ndarray:
+    """Per-frame top-1 class ids of a .tflite."""
+    detector = TFLiteDetector(str(model_path))
+    return np.asarray(
+        [int(np.argmax(detector.class_scores(detector.predict(frame)))) for frame in frames],
+        dtype=np.int64
+    )
+
+
+def precision_of(model_path: Path) -> str:
+    """Infer precision from an artifact name like best_int8.tflite."""
+    for precision in PRECISIONS:
+        if precision in model_path.stem:
+            return precision
+    return 'float32'
+
+
+class DeploymentTuner:
+    """
+    Finds the fastest acceptable deployment configuration.
+
+    Search order and pruning:
+    - Artifacts (input size x precision) are visited fastest first.
+    - A configuration is skipped without evaluating accuracy when its
+      latency cannot beat the best found so far.
+    - Accuracy depends only on the artifact, so it is computed once per
+      artifact; the remaining configurations of an artifact that misses
+      the budget are not timed.
+    """
+
+    def __init__(
+        self,
+        weights: str,
+        samples_path: str,
+        output_dir: str,
+        input_sizes: Sequence[Tuple[int, int]] = ((640, 640),),
+        precisions: Sequence[str] = ('float32',),
+        threads: Sequence[Optional[int]] = (None,),
+        delegates: Sequence[str] = (DELEGATE_XNNPACK,),
+        max_accuracy_drop: float = 0.01,
+        latency_runs: int = 30,
+        extra_models: Sequence[str] = ()
+    ):
+        """
+        Initialize the tuner.
+
+        Args:
+            weights: Reference .pt model
+            samples_path: Labeled calibration .npy from `y2m calib build`
+                (unlabeled sets are scored by agreement with the .pt)
+            output_dir: Directory whose metadata.json receives the result;
+                exported candidates go to output_dir/tune
+            input_sizes: Candidate export sizes (height, width)
+            precisions: Candidate precisions (float32, float16, int8)
+            threads: Candidate interpreter thread counts
+            delegates: Candidate delegates (see create_interpreter)
+            max_accuracy_drop: Allowed accuracy drop vs the reference
+            latency_runs: Timed inferences per configuration
+            extra_models: Existing .tflite artifacts to include as candidates
+        """
+        self.weights = Path(weights)
+        self.samples_path = samples_path
+        self.output_dir = Path(output_dir)
+        self.input_sizes = [tuple(size) for size in input_sizes]
+        self.precisions = list(precisions)
+        self.threads = list(threads)
+        self.delegates = list(delegates)
+        self.max_accuracy_drop = max_accuracy_drop
+        self.latency_runs = latency_runs
+        self.extra_models = [Path(p) for p in extra_models]
+
+        self.frames: List[np.ndarray] = []
+        self.labels: Optional[np.ndarray] = None
+        self.reference_predictions: Optional[np.ndarray] = None
+        self.candidates: List[dict] = []
+
+    def load_samples(self) -> None:
+        """Load the sample set as BGR frames."""
+        data, labels, _ = load_calibration_set(self.samples_path)
+        self.frames = [sample_to_frame(sample) for sample in data]
+        if labels is not None and len(labels) == len(self.frames) and (labels >= 0).all():
+            self.labels = labels.astype(np.int64)
+        logger.info(f"Loaded {len(self.frames)} samples "
+                    f"({'labeled' if self.labels is not None else 'unlabeled'})")
+
+    def reference_accuracy(self) -> float:
+        """Score the .pt reference; also caches its per-frame predictions."""
+        from ultralytics import YOLO
+
+        model = YOLO(str(self.weights))
+        predictions = []
+        for start in range(0, len(self.frames), 32):
+            batch = self.frames[start:start + 32]
+            results = model(batch, verbose=False)
+            predictions.extend(int(r.probs.top1) for r in results)
+        self.reference_predictions = np.asarray(predictions, dtype=np.int64)
+        return self.accuracy(self.reference_predictions)
+
+    def accuracy(self, predictions: np.ndarray) -> float:
+        """Accuracy vs labels, or agreement with the reference if unlabeled."""
+        target = self.labels if self.labels is not None else self.reference_predictions
+        return float((predictions == target).mean())
+
+    def prepare_artifacts(self) -> List[Tuple[Path, Tuple[int, int], str]]:
+        """Export every (input size, precision) candidate that is not cached."""
+        artifacts = []
+        converter = None
+        for size in self.input_sizes:
+            size_dir = self.output_dir / 'tune' / f"{size[0]}x{size[1]}"
+            for precision in self.precisions:
+                path = size_dir / f"{self.weights.stem}_{precision}.tflite"
+                if not path.exists():
+                    logger.info(f"Exporting candidate: {precision} {size}")
+                    if precision == 'int8':
+                        path = quantize_with_ultralytics(str(self.weights), str(size_dir), input_size=size)
+                    else:
+                        if converter is None:
+                            converter = YOLOConverter(str(self.weights), str(size_dir))
+                            if not converter.load_model():
+                                raise RuntimeError("Failed to load reference model")
+                        converter.output_dir = size_dir
+                        path = converter.export_to_tflite(input_size=size, half=precision == 'float16')
+                if path is None:
+                    logger.warning(f"Skipping candidate {precision} {size}: export failed")
+                    continue
+                artifacts.append((Path(path), size, precision))
+
+        for path in self.extra_models:
+            detector = TFLiteDetector(str(path))
+            size = (int(detector.input_height), int(detector.input_width))
+            artifacts.append((path, size, precision_of(path)))
+
+        return artifacts
+
+    def measure_latency(self, path: Path, num_threads: Optional[int], delegate: str) -> Dict[str, float]:
+        """Time preprocess + invoke on sample frames after warmup."""
+        return benchmark_model(path, self.frames, self.latency_runs, num_threads, delegate)
+
+    def predict_all(self, path: Path) -> np.ndarray:
+        """Per-frame top-1 predictions of an artifact."""
+        return predict_top1(path, self.frames)
+
+    def tune(self) -> Optional[dict]:
+        """
+        Run the search.
+
+        Returns:
+            Winning configuration, or None if nothing met the budget
+        """
+        self.load_samples()
+        if not self.frames:
+            raise ValueError("Sample set is empty")
+
+        reference = self.reference_accuracy()
+        logger.info(f"Reference accuracy ({self.weights.name}): {reference:.4f}")
+
+        artifacts = self.prepare_artifacts()
+
+        # Quick single-config latency to order artifacts fastest first
+        quick = {}
+        for path, _, _ in artifacts:
+            quick[path] = self.measure_latency(path, self.threads[0], self.delegates[0])['p50']
+        artifacts.sort(key=lambda a: quick[a[0]])
+
+        best = None
+        best_latency = float('inf')
+
+        for path, size, precision in artifacts:
+            base = {'model': str(path), 'input_size': list(size), 'precision': precision}
+            accuracy = None
+            for num_threads in self.threads:
+                for delegate in self.delegates:
+                    config = {**base, 'num_threads': num_threads, 'delegate': delegate}
+                    if accuracy is not None and reference - accuracy > self.max_accuracy_drop:
+                        self.candidates.append({**config, 'status': 'rejected: accuracy'})
+                        continue
+
+                    latency = self.measure_latency(path, num_threads, delegate)
+                    if latency['p50'] >= best_latency:
+                        self.candidates.append({**config, 'latency_ms': latency,
+                                                'status': 'pruned: dominated'})
+                        continue
+
+                    if accuracy is None:
+                        accuracy = self.accuracy(self.predict_all(path))
+                    drop = reference - accuracy
+                    candidate = {
+                        **config,
+                        'latency_ms': latency,
+                        'accuracy': round(accuracy, 4),
+                        'accuracy_drop': round(drop, 4),
+                    }
+
+                    if drop > self.max_accuracy_drop:
+                        self.candidates.append({**candidate, 'status': 'rejected: accuracy'})
+                        continue
+
+                    self.candidates.append({**candidate, 'status': 'accepted'})
+                    best, best_latency = candidate, latency['p50']
+                    logger.info(f"  New best: {precision} {size} threads={num_threads} "
+                                f"delegate={delegate} -> {latency['p50']:.2f} ms, acc {accuracy:.4f}")
+
+        self._save(best, reference)
+        return best
+
+    def _save(self, best: Optional[dict], reference: float) -> None:
+        report = {
+            'reference_model': self.weights.name,
+            'reference_accuracy': round(reference, 4),
+            'max_accuracy_drop': self.max_accuracy_drop,
+            'samples': len(self.frames),
+            'labeled': self.labels is not None,
+            'best': best,
+            'candidates': self.candidates,
+        }
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.output_dir / 'tune_report.json', 'w') as f:
+            json.dump(report, f, indent=2)
+
+        if best is None:
+            return
+
+        # Relative to the metadata when the artifact lives under output_dir
+        model = Path(best['model']).resolve()
+        try:
+            model_file = str(model.relative_to(self.output_dir.resolve()))
+        except ValueError:
+            model_file = str(model)
+
+        deployment = {
+            'model_file': model_file,
+            'input_size': best['input_size'],
+            'precision': best['precision'],
+            'num_threads': best['num_threads'],
+            'delegate': best['delegate'],
+            'latency_ms': best['latency_ms'],
+            'accuracy': best['accuracy'],
+            'reference_accuracy': round(reference, 4),
+            'max_accuracy_drop': self.max_accuracy_drop,
+            'tuned_at': datetime.now().isoformat(),
+            'host': {'machine': platform.machine(), 'cpu_count': os.cpu_count()},
+        }
+        update_metadata(self.output_dir, {'deployment': deployment})
@@ -84,7 +84,8 @@ def create_metadata(
     class_names: Optional[list] = None,
     input_size: Tuple[int, int] = (640, 640),
     quantized: bool = False,
-    extra_info: Optional[Dict[str, Any]] = None
+    extra_info: Optional[Dict[str, Any]] = None,
+    uint8_input: bool = False
 ) -> Path:
     """
     Generate metadata.json with model information.
@@ -96,6 +97,7 @@ def create_metadata(
         input_size: Input dimensions (height, width)
         quantized: Whether Int8 quantization was applied
         extra_info: Additional metadata to include
+        uint8_input: Whether the uint8 input model was exported
         
     Returns:
         Path to the created metadata.json file
@@ -115,6 +117,10 @@ def create_metadata(
     if quantized:
         metadata["output_files"]["int8"] = f"{Path(model_name).stem}_int8.tflite"
     
+    if uint8_input:
+        # Takes uint8 RGB pixels; the /255 normalization is part of the graph
+        metadata["output_files"]["uint8"] = f"{Path(model_name).stem}_uint8.tflite"
+    
     if class_names:
         metadata["class_names"] = class_names
         metadata["num_classes"] = len(class_names)
@@ -130,6 +136,32 @@ def create_metadata(
     return metadata_path
 
 
+def update_metadata(output_dir: Path, updates: Dict[str, Any]) -> Path:
+    """
+    Merge keys into an existing metadata.json (created if missing).
+    
+    Args:
+        output_dir: Directory containing metadata.json
+        updates: Top-level keys to add or replace
+        
+    Returns:
+        Path to the updated metadata.json file
+    """
+    metadata_path = Path(output_dir) / "metadata.json"
+    metadata = {}
+    if metadata_path.exists():
+        with open(metadata_path) as f:
+            metadata = json.load(f)
+    
+    metadata.update(updates)
+    
+    with open(metadata_path, 'w') as f:
+        json.dump(metadata, f, indent=2)
+    
+    logger.info(f"[OK] Metadata updated: {metadata_path}")
+    return metadata_path
+
+
 def cleanup_intermediate_files(directory: Path, extensions: list = ['.onnx']) -> int:
     """
     Remove intermediate files to save disk space.